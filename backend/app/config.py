@@ -16,7 +16,107 @@ class Config:
     # Configuration Base de données
     SQLALCHEMY_DATABASE_URI = os.environ.get('DATABASE_URL')
     SQLALCHEMY_TRACK_MODIFICATIONS = False
+    # Pool de connexions (ignoré pour SQLite)
+    DB_POOL_SIZE = int(os.environ.get('DB_POOL_SIZE', 10))  # connexions conservées par processus
+    DB_MAX_OVERFLOW = int(os.environ.get('DB_MAX_OVERFLOW', 5))  # connexions supplémentaires en pic
+    DB_POOL_TIMEOUT = float(os.environ.get('DB_POOL_TIMEOUT', 10))  # secondes d'attente d'une connexion libre
+    DB_POOL_RECYCLE = int(os.environ.get('DB_POOL_RECYCLE', 280))  # secondes, inférieur au wait_timeout MySQL
+    DB_POOL_PRE_PING = os.environ.get('DB_POOL_PRE_PING', 'true').lower() == 'true'
+    DB_STATEMENT_TIMEOUT = int(os.environ.get('DB_STATEMENT_TIMEOUT', 0))  # millisecondes par requête, 0 = sans limite
     
     # Configuration JWT
     JWT_SECRET_KEY = os.environ.get('JWT_SECRET_KEY')
-    JWT_ACCESS_TOKEN_EXPIRES = 24 * 3600  # 24 heures en secondes 
\ No newline at end of file
+    JWT_ACCESS_TOKEN_EXPIRES = 24 * 3600  # 24 heures en secondes
+    JWT_VERIFY_CACHE = os.environ.get('JWT_VERIFY_CACHE', 'true').lower() == 'true'
+
+    # Origines autorisées (CORS) séparées par des virgules, * pour toutes
+    CORS_ORIGINS = [origin.strip() for origin in os.environ.get('CORS_ORIGINS', '*').split(',') if origin.strip()]
+    JWT_VERIFY_CACHE_SIZE = int(os.environ.get('JWT_VERIFY_CACHE_SIZE', 4096))  # tokens vérifiés gardés en mémoire
+
+    # Configuration du hachage des mots de passe
+    BCRYPT_ROUNDS = int(os.environ.get('BCRYPT_ROUNDS', 12))  # coût des nouveaux hashs (2^12 itérations)
+    PASSWORD_HASH_WORKERS = int(os.environ.get('PASSWORD_HASH_WORKERS', 2))  # hachages simultanés par processus
+    PASSWORD_HASH_QUEUE_SIZE = int(os.environ.get('PASSWORD_HASH_QUEUE_SIZE', 32))  # au-delà : réponse 503
+    PASSWORD_HASH_TIMEOUT = float(os.environ.get('PASSWORD_HASH_TIMEOUT', 10))  # secondes d'attente maximale
+
+    # Configuration des flux open data Vélib
+    VELIB_STATION_INFORMATION_URL = os.environ.get(
+        'VELIB_STATION_INFORMATION_URL',
+        'https://velib-metropole-opendata.smovengo.cloud/opendata/Velib_Metropole/station_information.json'
+    )
+    STATION_CATALOGUE_TTL = int(os.environ.get('STATION_CATALOGUE_TTL', 3600))  # 1 heure en secondes
+    VELIB_STATION_STATUS_URL = os.environ.get(
+        'VELIB_STATION_STATUS_URL',
+        'https://velib-metropole-opendata.smovengo.cloud/opendata/Velib_Metropole/station_status.json'
+    )
+    STATION_STATUS_TTL = int(os.environ.get('STATION_STATUS_TTL', 60))  # secondes
+    STATION_STATUS_HISTORY = int(os.environ.get('STATION_STATUS_HISTORY', 30))  # versions servies par ?since=
+    STATUS_STREAM_HEARTBEAT = float(os.environ.get('STATUS_STREAM_HEARTBEAT', 15))  # secondes entre deux messages de maintien
+    STATUS_STREAM_POLL_INTERVAL = float(os.environ.get('STATUS_STREAM_POLL_INTERVAL', 1))  # secondes entre deux lectures du flux
+    STATUS_STREAM_MAX_SUBSCRIBERS = int(os.environ.get('STATUS_STREAM_MAX_SUBSCRIBERS', 5000))  # par processus (ASGI)
+    # En WSGI chaque abonné occupe un thread du worker : rester sous GUNICORN_THREADS
+    STATUS_STREAM_MAX_THREADED_SUBSCRIBERS = int(os.environ.get('STATUS_STREAM_MAX_THREADED_SUBSCRIBERS', 2))
+    ASGI_THREADS = int(os.environ.get('ASGI_THREADS', 16))  # requêtes Flask simultanées par processus ASGI
+    FEED_MIN_POLL_INTERVAL = int(os.environ.get('FEED_MIN_POLL_INTERVAL', 5))  # secondes entre deux appels au flux
+    STATION_BATCH_MAX_IDS = int(os.environ.get('STATION_BATCH_MAX_IDS', 2000))
+    STATION_NEARBY_MAX_K = int(os.environ.get('STATION_NEARBY_MAX_K', 50))
+
+    # Configuration de la recherche de stations
+    SEARCH_CANDIDATES = int(os.environ.get('SEARCH_CANDIDATES', 5))
+    SEARCH_FUZZY_THRESHOLD = float(os.environ.get('SEARCH_FUZZY_THRESHOLD', 0.6))  # coefficient de Dice minimal
+    SEARCH_SUGGEST_MAX = int(os.environ.get('SEARCH_SUGGEST_MAX', 20))
+    SEARCH_HISTORY_PAGE_SIZE = int(os.environ.get('SEARCH_HISTORY_PAGE_SIZE', 50))  # recherches par page par défaut
+    SEARCH_HISTORY_MAX_PAGE_SIZE = int(os.environ.get('SEARCH_HISTORY_MAX_PAGE_SIZE', 200))
+
+    # Configuration de l'historique des réservations
+    RESERVATION_HISTORY_PAGE_SIZE = int(os.environ.get('RESERVATION_HISTORY_PAGE_SIZE', 50))  # réservations par page par défaut
+    RESERVATION_HISTORY_MAX_PAGE_SIZE = int(os.environ.get('RESERVATION_HISTORY_MAX_PAGE_SIZE', 200))
+    # Lance Nominatim en parallèle de la recherche de station (POST /api/search/)
+    SEARCH_SPECULATIVE_GEOCODE = os.environ.get('SEARCH_SPECULATIVE_GEOCODE', 'false').lower() == 'true'
+    # Enregistrement différé de l'historique : GET /api/search/ peut avoir jusqu'à un lot de retard
+    SEARCH_WRITE_BEHIND = os.environ.get('SEARCH_WRITE_BEHIND', 'false').lower() == 'true'
+    SEARCH_WRITE_BEHIND_QUEUE_SIZE = int(os.environ.get('SEARCH_WRITE_BEHIND_QUEUE_SIZE', 10000))  # au-delà : écriture directe
+    SEARCH_WRITE_BEHIND_BATCH_SIZE = int(os.environ.get('SEARCH_WRITE_BEHIND_BATCH_SIZE', 200))  # lignes par INSERT
+    SEARCH_WRITE_BEHIND_FLUSH_MS = int(os.environ.get('SEARCH_WRITE_BEHIND_FLUSH_MS', 200))  # millisecondes
+    SEARCH_WRITE_BEHIND_FALLBACK_PATH = os.environ.get('SEARCH_WRITE_BEHIND_FALLBACK_PATH')  # défaut : instance/
+    SEARCH_WRITE_BEHIND_DEAD_LETTER_PATH = os.environ.get('SEARCH_WRITE_BEHIND_DEAD_LETTER_PATH')  # lignes refusées, défaut : instance/
+
+    # Configuration du géocodage Nominatim et de son cache
+    NOMINATIM_URL = os.environ.get('NOMINATIM_URL', 'https://nominatim.openstreetmap.org/search')
+    GEOCODE_CACHE_SIZE = int(os.environ.get('GEOCODE_CACHE_SIZE', 2048))  # entrées en mémoire
+    GEOCODE_CACHE_TTL = int(os.environ.get('GEOCODE_CACHE_TTL', 30 * 24 * 3600))  # 30 jours en secondes
+    GEOCODE_CACHE_NEGATIVE_TTL = int(os.environ.get('GEOCODE_CACHE_NEGATIVE_TTL', 24 * 3600))  # 24 heures en secondes
+    GEOCODE_CACHE_PERSISTENT = os.environ.get('GEOCODE_CACHE_PERSISTENT', 'true').lower() == 'true'
+
+    # Compression des réponses (brotli si le paquet est installé, sinon gzip)
+    COMPRESSION_ENABLED = os.environ.get('COMPRESSION_ENABLED', 'true').lower() == 'true'
+    COMPRESSION_MIN_SIZE = int(os.environ.get('COMPRESSION_MIN_SIZE', 1024))  # octets, en dessous : pas de compression
+    COMPRESSION_BROTLI_QUALITY = int(os.environ.get('COMPRESSION_BROTLI_QUALITY', 4))  # réponses dynamiques
+    COMPRESSION_GZIP_LEVEL = int(os.environ.get('COMPRESSION_GZIP_LEVEL', 6))
+    # Corps des instantanés du flux, compressés une fois par rafraîchissement (11 : ~0,3 s par corps)
+    COMPRESSION_STATIC_BROTLI_QUALITY = int(os.environ.get('COMPRESSION_STATIC_BROTLI_QUALITY', 9))
+    COMPRESSION_STATIC_GZIP_LEVEL = int(os.environ.get('COMPRESSION_STATIC_GZIP_LEVEL', 9))
+
+    # Mesures exposées sur /metrics (format Prometheus)
+    METRICS_ENABLED = os.environ.get('METRICS_ENABLED', 'true').lower() == 'true'
+    # /metrics et /api/monitoring : en-tête Authorization: Bearer <METRICS_TOKEN>
+    METRICS_TOKEN = os.environ.get('METRICS_TOKEN')
+    METRICS_PUBLIC = os.environ.get('METRICS_PUBLIC', 'false').lower() == 'true'  # accès sans token (réseau privé)
+
+    # Profilage des requêtes : en-tête X-Profile-Token ou tirage au sort (désactivé par défaut)
+    PROFILE_ADMIN_TOKEN = os.environ.get('PROFILE_ADMIN_TOKEN')
+    PROFILE_SAMPLE_RATE = float(os.environ.get('PROFILE_SAMPLE_RATE', 0))  # 0.01 = 1 requête sur 100
+    PROFILE_INTERVAL_MS = float(os.environ.get('PROFILE_INTERVAL_MS', 5))  # millisecondes entre deux relevés de piles
+    PROFILE_MIN_DURATION_MS = float(os.environ.get('PROFILE_MIN_DURATION_MS', 0))  # profils plus courts non enregistrés
+    PROFILE_DIR = os.environ.get('PROFILE_DIR')  # défaut : instance/profiles
+
+    # Configuration du client HTTP des services externes
+    UPSTREAM_CONNECT_TIMEOUT = float(os.environ.get('UPSTREAM_CONNECT_TIMEOUT', 3.05))  # secondes
+    UPSTREAM_READ_TIMEOUT = float(os.environ.get('UPSTREAM_READ_TIMEOUT', 10))  # secondes, hôtes non listés
+    VELIB_HTTP_TIMEOUT = float(os.environ.get('VELIB_HTTP_TIMEOUT', 10))  # secondes
+    NOMINATIM_HTTP_TIMEOUT = float(os.environ.get('NOMINATIM_HTTP_TIMEOUT', 5))  # secondes
+    UPSTREAM_POOL_SIZE = int(os.environ.get('UPSTREAM_POOL_SIZE', 10))  # connexions conservées par hôte
+    UPSTREAM_RETRIES = int(os.environ.get('UPSTREAM_RETRIES', 2))
+    UPSTREAM_BACKOFF_FACTOR = float(os.environ.get('UPSTREAM_BACKOFF_FACTOR', 0.3))  # 0.3 s, 0.6 s, ...
+    UPSTREAM_BREAKER_THRESHOLD = int(os.environ.get('UPSTREAM_BREAKER_THRESHOLD', 5))  # échecs consécutifs
+    UPSTREAM_BREAKER_RESET = float(os.environ.get('UPSTREAM_BREAKER_RESET', 30))  # secondes avant un essai
\ No newline at end of file
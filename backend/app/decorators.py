@@ -1,18 +1,47 @@
 """
 Décorateurs pour l'application
 """
+import time
 from functools import wraps
-from flask import request, jsonify
+from flask import current_app, request, jsonify
+from .services.metrics import AUTH_DURATION, authorized
 from .services.token_service import TokenService
 
+def monitoring_access_required(f):
+    """
+    Décorateur pour les endpoints de supervision (/metrics, /api/monitoring)
+    Exige l'en-tête Authorization: Bearer <METRICS_TOKEN>, ou METRICS_PUBLIC actif
+    """
+    @wraps(f)
+    def decorated(*args, **kwargs):
+        if not authorized():
+            if not current_app.config.get('METRICS_TOKEN'):
+                return jsonify({
+                    'success': False,
+                    'message': "Supervision non accessible : METRICS_TOKEN non défini"
+                }), 403
+            return jsonify({
+                'success': False,
+                'message': 'Token de supervision manquant ou invalide'
+            }), 401
+        return f(*args, **kwargs)
+
+    return decorated
+
 def token_required(f):
     """
     Décorateur pour protéger les routes qui nécessitent une authentification
     Vérifie la présence et la validité du token JWT
     Vérifie OBLIGATOIREMENT que l'ID utilisateur fourni dans la requête correspond à celui du token
     """
-    @wraps(f)
-    def decorated(*args, **kwargs):
+    def authenticate():
+        """Retourne (user_id, None) si la requête est autorisée, sinon (None, réponse d'erreur)"""
+        start = time.perf_counter()
+        token_user_id, error_response = check_request()
+        AUTH_DURATION.observe(time.perf_counter() - start, 'ok' if error_response is None else str(error_response[1]))
+        return token_user_id, error_response
+
+    def check_request():
         token = None
         request_user_id = None
         
@@ -22,24 +51,24 @@ def token_required(f):
             try:
                 token = auth_header.split(" ")[1]  # Format: "Bearer <token>"
             except IndexError:
-                return jsonify({
+                return None, (jsonify({
                     'success': False,
                     'message': 'Token invalide'
-                }), 401
+                }), 401)
         
         if not token:
-            return jsonify({
+            return None, (jsonify({
                 'success': False,
                 'message': 'Token manquant'
-            }), 401
+            }), 401)
         
         # Décodage simple du token pour récupérer le user_id qu'il contient
         is_valid_token, token_payload = TokenService.verify_token(token)
         if not is_valid_token:
-            return jsonify({
+            return None, (jsonify({
                 'success': False,
                 'message': token_payload.get('error', 'Token invalide')
-            }), 401
+            }), 401)
             
         token_user_id = token_payload.get('user_id')
         
@@ -52,10 +81,10 @@ def token_required(f):
 
         # Si aucun ID utilisateur n'est fourni dans la requête, renvoyer une erreur
         if not request_user_id:
-            return jsonify({
+            return None, (jsonify({
                 'success': False,
                 'message': "L'ID utilisateur est obligatoire"
-            }), 400
+            }), 400)
         
         # Convertir en entier si nécessaire
         if isinstance(request_user_id, str) and request_user_id.isdigit():
@@ -63,10 +92,18 @@ def token_required(f):
         
         # Vérifier que l'ID utilisateur de la requête correspond à celui du token
         if token_user_id != request_user_id:
-            return jsonify({
+            return None, (jsonify({
                 'success': False,
                 'message': "Accès non autorisé pour cet utilisateur T"
-            }), 403
+            }), 403)
+            
+        return token_user_id, None
+    
+    @wraps(f)
+    def decorated(*args, **kwargs):
+        token_user_id, error_response = authenticate()
+        if error_response is not None:
+            return error_response
             
         # Ajouter l'ID de l'utilisateur aux arguments de la fonction
         kwargs['user_id'] = token_user_id
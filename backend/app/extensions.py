@@ -3,5 +3,49 @@ Extensions pour l'application Flask
 """
 from flask_sqlalchemy import SQLAlchemy
 
+from .services.compression import ResponseCompressor
+from .services.db_pool import PoolMonitor
+from .services.feed_cache import StationCatalogue, StationStatus
+from .services.geocode_cache import GeocodeCache
+from .services.http_client import UpstreamClient
+from .services.password_hasher import PasswordHasher
+from .services.profiler import RequestProfiler
+from .services.search_history import SearchHistoryWriter
+from .services.status_stream import StatusBroadcaster
+from .services.token_cache import VerifiedTokenCache
+
 # Initialisation de l'extension SQLAlchemy
-db = SQLAlchemy() 
\ No newline at end of file
+db = SQLAlchemy()
+
+# Configuration et état du pool de connexions à la base de données
+db_pool = PoolMonitor()
+
+# Client HTTP partagé pour tous les appels aux services externes
+upstream = UpstreamClient()
+
+# Catalogue des stations Vélib partagé par tout le processus
+station_catalogue = StationCatalogue(upstream)
+
+# Disponibilité des stations Vélib partagée par tout le processus
+station_status = StationStatus(upstream)
+
+# Diffusion en direct des changements de disponibilité (flux SSE)
+status_stream = StatusBroadcaster(station_status, station_catalogue)
+
+# Cache des géocodages Nominatim (mémoire puis base de données)
+geocode_cache = GeocodeCache()
+
+# File d'écriture différée de l'historique des recherches
+search_history = SearchHistoryWriter()
+
+# Tokens JWT déjà vérifiés (évite de recontrôler la signature à chaque requête)
+token_cache = VerifiedTokenCache()
+
+# Pool borné de hachage bcrypt des mots de passe
+password_hasher = PasswordHasher()
+
+# Compression des réponses (brotli, gzip)
+response_compressor = ResponseCompressor()
+
+# Profilage à la demande des requêtes (graphes de flammes et requêtes SQL)
+request_profiler = RequestProfiler()
\ No newline at end of file
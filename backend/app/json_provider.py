@@ -0,0 +1,68 @@
+"""
+Sérialisation JSON de l'application (jsonify, request.get_json)
+
+Avec orjson installé, l'encodage et le décodage passent par son implémentation C,
+qui écrit directement des bytes UTF-8 et sérialise nativement les dates au format
+ISO 8601 : les to_dict des modèles renvoient donc les datetime tels quels. Sans
+orjson, le module json standard est utilisé avec le même format de dates.
+"""
+import json
+from datetime import date
+from typing import Any
+
+from flask.json.provider import DefaultJSONProvider
+
+try:
+    import orjson
+except ImportError:  # pragma: no cover - dépendance optionnelle
+    orjson = None
+
+
+def _default(obj: Any) -> Any:
+    # Dates en ISO 8601 (le fournisseur par défaut de Flask les écrit au format HTTP)
+    if isinstance(obj, date):
+        return obj.isoformat()
+    return DefaultJSONProvider.default(obj)
+
+
+def encode(obj: Any, sort_keys: bool = False, indent: bool = False) -> bytes:
+    """Encode en JSON UTF-8 (compact, ou indenté de 2 espaces), utilisé aussi pour les réponses mises en cache"""
+    if orjson is not None:
+        option = orjson.OPT_NON_STR_KEYS
+        if sort_keys:
+            option |= orjson.OPT_SORT_KEYS
+        if indent:
+            option |= orjson.OPT_INDENT_2
+        return orjson.dumps(obj, default=_default, option=option)
+    return json.dumps(obj, default=_default, ensure_ascii=False, sort_keys=sort_keys,
+                      indent=2 if indent else None, separators=None if indent else (',', ':')).encode('utf-8')
+
+
+class FastJSONProvider(DefaultJSONProvider):
+    """Fournisseur JSON de Flask basé sur orjson (json standard à défaut)"""
+
+    default = staticmethod(_default)
+    # Les clés restent dans l'ordre de construction des dictionnaires (pas de tri à chaque réponse)
+    sort_keys = False
+    ensure_ascii = False
+
+    def dumps(self, obj: Any, **kwargs: Any) -> str:
+        if orjson is not None and not kwargs:
+            return encode(obj, self.sort_keys).decode('utf-8')
+        kwargs.setdefault('default', self.default)
+        kwargs.setdefault('ensure_ascii', self.ensure_ascii)
+        kwargs.setdefault('sort_keys', self.sort_keys)
+        return json.dumps(obj, **kwargs)
+
+    def loads(self, s, **kwargs: Any) -> Any:
+        if orjson is not None and not kwargs:
+            return orjson.loads(s)
+        return json.loads(s, **kwargs)
+
+    def response(self, *args: Any, **kwargs: Any):
+        """Comme jsonify, sans repasser par une chaîne Python : les bytes encodés forment le corps"""
+        obj = self._prepare_response_obj(args, kwargs)
+        # Indenté en mode debug, comme le fournisseur par défaut
+        indent = self._app.debug if self.compact is None else not self.compact
+        body = encode(obj, self.sort_keys, indent)
+        return self._app.response_class(body + b'\n', mimetype=self.mimetype)
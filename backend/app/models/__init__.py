@@ -9,6 +9,7 @@ from .reservation_model import Reservation
 from .station_model import Station
 from .velo_model import Velo
 from .recherche_model import Recherche
+from .geocode_model import Geocode
 
 # Exporter tous les modèles pour un import plus facile
-__all__ = ['User', 'Reservation', 'Station', 'Velo', 'Recherche']
\ No newline at end of file
+__all__ = ['User', 'Reservation', 'Station', 'Velo', 'Recherche', 'Geocode']
\ No newline at end of file
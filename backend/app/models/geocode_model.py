@@ -0,0 +1,30 @@
+from ..extensions import db
+from sqlalchemy import Column, String, Float, DateTime
+from sqlalchemy.sql import func
+
+
+class Geocode(db.Model):
+    """Modèle pour la table geocodes (cache persistant des réponses Nominatim)"""
+    
+    __tablename__ = 'geocodes'
+    
+    # Terme de recherche normalisé
+    terme = Column(String(255), primary_key=True)
+    # lat/lon NULL : adresse introuvable (cache négatif)
+    lat = Column(Float, nullable=True)
+    lon = Column(Float, nullable=True)
+    created_at = Column(DateTime, default=func.now())
+    expires_at = Column(DateTime, nullable=False)
+    
+    def __repr__(self):
+        return f"<Geocode {self.terme}: {self.lat}, {self.lon}>"
+    
+    def to_dict(self):
+        """Convertit l'objet en dictionnaire pour les réponses API"""
+        return {
+            'terme': self.terme,
+            'lat': self.lat,
+            'lon': self.lon,
+            'created_at': self.created_at,
+            'expires_at': self.expires_at
+        }
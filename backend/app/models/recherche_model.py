@@ -7,11 +7,15 @@ class Recherche(db.Model):
     Modèle pour stocker les recherches effectuées par les utilisateurs
     """
     __tablename__ = 'recherches'
+    __table_args__ = (
+        # Historique d'un utilisateur trié par date (pagination par curseur, cf. SearchService)
+        db.Index('ix_recherches_client_created', 'client_id', 'created_at'),
+    )
 
     id = db.Column(db.Integer, primary_key=True, autoincrement=True)
     client_id = db.Column(db.Integer, db.ForeignKey('users.id', ondelete='CASCADE'), nullable=False)
     recherche = db.Column(db.String(255))
-    created_at = db.Column(db.TIMESTAMP, default=datetime.utcnow)
+    created_at = db.Column(db.TIMESTAMP, nullable=False, default=datetime.utcnow)
     resultat = db.Column(db.Boolean)  # TINYINT(1) est équivalent à BOOLEAN dans SQLAlchemy
     station_id = db.Column(db.BigInteger, db.ForeignKey('stations.station_id', ondelete='CASCADE'))
 
@@ -30,7 +34,7 @@ class Recherche(db.Model):
             'id': self.id,
             'client_id': self.client_id,
             'recherche': self.recherche,
-            'created_at': self.created_at.isoformat() if self.created_at else None,
+            'created_at': self.created_at,
             'resultat': self.resultat,
             'station_id': self.station_id
         }
\ No newline at end of file
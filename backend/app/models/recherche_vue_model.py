@@ -33,7 +33,7 @@ class RechercheVue(db.Model):
             'id': self.id,
             'client_id': self.client_id,
             'recherche': self.recherche,
-            'created_at': self.created_at.isoformat() if self.created_at else None,
+            'created_at': self.created_at,
             'resultat': self.resultat,
             'station_id': self.station_id,
             'lat': self.lat,
@@ -47,9 +47,16 @@ class RechercheVue(db.Model):
         """
         Détermine le texte du résultat de recherche en fonction des données
         """
-        if not self.resultat and self.station_id is None:
+        return self.resultat_label(self.resultat, self.station_id)
+
+    @staticmethod
+    def resultat_label(resultat, station_id):
+        """
+        Texte du résultat de recherche pour des colonnes lues sans objet ORM
+        """
+        if not resultat and station_id is None:
             return "Pas de resultat de recherche"
-        elif self.resultat and self.station_id is None:
+        elif resultat and station_id is None:
             return "Adresse trouvée"
         else:
             return "Station trouvée"
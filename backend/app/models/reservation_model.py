@@ -1,5 +1,5 @@
 from ..extensions import db
-from sqlalchemy import Column, Integer, String, DateTime, BigInteger, ForeignKey
+from sqlalchemy import Column, Integer, String, DateTime, BigInteger, ForeignKey, Index
 from sqlalchemy.sql import func
 
 
@@ -7,12 +7,18 @@ class Reservation(db.Model):
     """Modèle pour la table reservations"""
     
     __tablename__ = 'reservations'
+    __table_args__ = (
+        # Historique d'un client trié par date (pagination par curseur, cf. ReservationService)
+        Index('ix_reservations_client_create_time', 'client_id', 'create_time'),
+        # Recherche d'une réservation par son numéro de confirmation
+        Index('ix_reservations_confirmation', 'confirmationID'),
+    )
     
     id = Column(Integer, primary_key=True, autoincrement=True)
     confirmationID = Column(String(255), nullable=False)
     id_velo = Column(Integer, ForeignKey('velo.id_velo', ondelete='CASCADE'), nullable=False)
     client_id = Column(Integer, ForeignKey('users.id', ondelete='CASCADE'), nullable=False)
-    create_time = Column(DateTime, default=func.now())
+    create_time = Column(DateTime, nullable=False, default=func.now())
     station_id = Column(BigInteger, ForeignKey('stations.station_id', ondelete='CASCADE'), nullable=True)
     
     def __repr__(self):
@@ -25,6 +31,6 @@ class Reservation(db.Model):
             'confirmationID': self.confirmationID,
             'id_velo': self.id_velo,
             'client_id': self.client_id,
-            'create_time': self.create_time.isoformat() if self.create_time else None,
+            'create_time': self.create_time,
             'station_id': self.station_id
         }
\ No newline at end of file
@@ -34,7 +34,7 @@ class ReservationVue(db.Model):
             'confirmationID': self.confirmationID,
             'id_velo': self.id_velo,
             'client_id': self.client_id,
-            'create_time': self.create_time.isoformat() if self.create_time else None,
+            'create_time': self.create_time,
             'station_id': self.station_id,
             'lat': self.lat,
             'lon': self.lon,
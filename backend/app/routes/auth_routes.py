@@ -9,6 +9,10 @@ from ..services.token_service import TokenService
 # Créer un blueprint pour les routes d'authentification
 auth_bp = Blueprint('auth', __name__)
 
+def _retry_after(status_code):
+    """En-tête Retry-After des réponses 503 (pool de hachage des mots de passe saturé)"""
+    return {'Retry-After': '1'} if status_code == 503 else {}
+
 @auth_bp.route('/register', methods=['POST'])
 def register():
     """
@@ -44,7 +48,7 @@ def register():
         return jsonify({
             'success': False,
             'message': message
-        }), status_code
+        }), status_code, _retry_after(status_code)
 
 @auth_bp.route('/login', methods=['POST'])
 def login():
@@ -80,7 +84,7 @@ def login():
         return jsonify({
             'success': False,
             'message': message
-        }), status_code
+        }), status_code, _retry_after(status_code)
 
 @auth_bp.route('/verify-token', methods=['POST'])
 def verify_token():
@@ -0,0 +1,35 @@
+"""
+Routes de supervision du serveur
+"""
+from flask import Blueprint, jsonify
+
+from ..decorators import monitoring_access_required
+from ..extensions import db, db_pool, password_hasher, token_cache
+
+# Créer un blueprint pour les routes de supervision
+monitoring_bp = Blueprint('monitoring', __name__)
+
+@monitoring_bp.route('/db-pool', methods=['GET'])
+@monitoring_access_required
+def get_db_pool():
+    """
+    État du pool de connexions à la base de données du processus
+    (connexions prises, débordement, attentes et timeouts)
+    """
+    return jsonify(db_pool.stats(db.engine))
+
+@monitoring_bp.route('/token-cache', methods=['GET'])
+@monitoring_access_required
+def get_token_cache():
+    """
+    Taux de succès et taille du cache des tokens JWT vérifiés du processus
+    """
+    return jsonify(token_cache.stats())
+
+@monitoring_bp.route('/password-hasher', methods=['GET'])
+@monitoring_access_required
+def get_password_hasher():
+    """
+    Profondeur de la file d'attente et demandes refusées du pool de hachage des mots de passe
+    """
+    return jsonify(password_hasher.stats())
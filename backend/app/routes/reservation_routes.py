@@ -58,6 +58,11 @@ def post_reservation(*args, **kwargs):
 @reservation_bp.route('/', methods=['GET'])
 @token_required
 def get_reservations(*args, **kwargs):
+    """
+    Récupère une page de l'historique des réservations de l'utilisateur
+    Paramètres optionnels : limit, cursor (next_cursor de la page précédente)
+    et since (date ISO 8601, pour ne recevoir que les nouvelles réservations)
+    """
     try:
         # Vérification que user_id est présent et valide
         user_id = kwargs.get('user_id')
@@ -65,7 +70,12 @@ def get_reservations(*args, **kwargs):
             return jsonify({"success": False, "message": "ID utilisateur invalide ou manquant"}), 400
         
         # Appel au service avec gestion complète des retours
-        success, message, data, status = ReservationService.get_order(user_id)
+        success, message, data, status = ReservationService.get_order(
+            user_id,
+            cursor=request.args.get('cursor'),
+            limit=request.args.get('limit', type=int),
+            since=request.args.get('since')
+        )
 
         if not success:
             return jsonify({
@@ -78,7 +88,8 @@ def get_reservations(*args, **kwargs):
         return jsonify({
             "success": True,
             "message": message,
-            "data": data
+            "data": data['items'],
+            "next_cursor": data['next_cursor']
         }), status
         
     except Exception as e:
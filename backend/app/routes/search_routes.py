@@ -67,6 +67,7 @@ def search_station(*args, **kwargs):
             return jsonify({
                 'lat': response_data.get('lat'),
                 'lon': response_data.get('lon'),
+                'candidates': response_data.get('candidates', []),
                 'message': message
             }), 200
 
@@ -127,29 +128,56 @@ def delete_search(*args, **kwargs):
             'token': False
         }), 500
     
+@search_bp.route('/suggest', methods=['GET'])
+def suggest_stations():
+    """
+    Endpoint d'autocomplétion des noms de stations
+    ---
+    Requiert le paramètre q, limit optionnel (8 par défaut)
+    Ne nécessite pas de token : seules des données publiques du catalogue sont renvoyées
+    """
+    search_term = request.args.get('q', '')
+    limit = request.args.get('limit', default=8, type=int)
+
+    success, message, data, status_code = SearchService.suggest_stations(search_term, limit)
+    if success:
+        return jsonify({
+            'success': True,
+            'data': data
+        }), status_code
+    else:
+        return jsonify(data), status_code
+
+
 @search_bp.route('/', methods=['GET'])
 @token_required
 def get_user_searches(*args, **kwargs):
      """
      Endpoint pour récupérer les recherches de l'utilisateur authentifié
      Requiert un token JWT valide
+     ---
+     Paramètres optionnels : limit (taille de la page) et cursor (next_cursor de la page précédente)
      """
      try:
          user_id = kwargs.get('user_id')  # fourni par le décorateur token_required
+         cursor = request.args.get('cursor')
+         limit = request.args.get('limit', type=int)
  
-         # Appel au service pour récupérer les recherches
-         success, message, data, status_code = SearchService.get_searches_by_user(user_id)
+         # Appel au service pour récupérer une page de recherches
+         success, message, data, status_code = SearchService.get_searches_by_user(user_id, cursor, limit)
          
          if success:
              return jsonify({
                  'success': True,
                  'message': message,
-                 'data': data
+                 'data': data['items'],
+                 'next_cursor': data['next_cursor']
              }), status_code
          else:
              return jsonify({
                  'success': False,
-                 'message': message
+                 'message': message,
+                 'error_code': data.get('error_code')
              }), status_code
  
      except Exception as e:
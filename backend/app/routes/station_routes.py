@@ -1,57 +1,161 @@
-from flask import Blueprint, jsonify, request
-import requests
+from flask import Blueprint, Response, jsonify, request
+
+from ..extensions import response_compressor, station_catalogue, station_status, status_stream
+from ..services.compression import FrozenBody
+from ..services.spatial_index import valid_position
+from ..services.station_service import StationService
 
 station_bp = Blueprint('station', __name__)
 
 @station_bp.route('/stations', methods=['GET'])
 def get_stations():
-    # Effectuer une requête GET pour obtenir les informations des stations
-    response = requests.get("https://velib-metropole-opendata.smovengo.cloud/opendata/Velib_Metropole/station_information.json")
-    
-    # Vérifier si la requête a réussi
-    if response.status_code == 200:
-        # Convertir la réponse JSON en dictionnaire Python
-        data = response.json()
-        formatted_data = []
-
-        # Filtrer et structurer les données des stations
-        for station in data.get('data', {}).get('stations', []):
-            # Ajouter la station avec les champs formatés dans la liste finale
-            formatted_station = {
-                "station_id": station.get('station_id'),
-                "stationCode": station.get('stationCode'),
-                "name": station.get('name'),
-                "lat": station.get('lat'),
-                "lon": station.get('lon'),
-                "capacity": station.get('capacity')
-            }
-            formatted_data.append(formatted_station)
-
-        # Retourner les données formatées en JSON
-        return jsonify(formatted_data)
-    else:
-        # Retourner une erreur si la requête a échoué
-        return jsonify({"error": f"Erreur lors de la requête: {response.status_code}"}), response.status_code
+    # Lire le catalogue des stations depuis le cache partagé (déjà sérialisé en JSON)
+    snapshot = station_catalogue.get()
+
+    # Vérifier qu'au moins un téléchargement du flux a réussi
+    if snapshot is None:
+        # Retourner une erreur si le flux amont n'a jamais pu être récupéré
+        return jsonify({"error": station_catalogue.last_error}), 502
+
+    # Retourner les données formatées en JSON (compressées une seule fois par rafraîchissement)
+    return response_compressor.frozen_response(snapshot.body)
 
 @station_bp.route('/stations/<int:station_id>', methods=['GET'])
 def get_station_info(station_id):
-    # Effectuer une requête GET pour obtenir les informations de statut des stations
-    response = requests.get("https://velib-metropole-opendata.smovengo.cloud/opendata/Velib_Metropole/station_status.json")
-    
-    # Vérifier si la requête a réussi
-    if response.status_code == 200:
-        # Convertir la réponse JSON en dictionnaire Python
-        data = response.json()
-        
-        # Trouver la station avec le station_id donné
-        station_info = next((station for station in data['data']['stations'] if station['station_id'] == station_id), None)
-        
-        # Si la station est trouvée, retourner ses informations
-        if station_info:
-            return jsonify(station_info)
-        else:
-            # Retourner une réponse vide si la station n'est pas trouvée
-            return jsonify(None)
+    # Lire le statut des stations depuis le cache partagé
+    snapshot = station_status.get()
+
+    # Vérifier qu'au moins un téléchargement du flux a réussi
+    if snapshot is None:
+        # Retourner une erreur si le flux amont n'a jamais pu être récupéré
+        return jsonify({"error": station_status.last_error}), 502
+
+    # Trouver la station avec le station_id donné (accès direct par index)
+    station_info = snapshot.by_id.get(station_id)
+
+    # Si la station est trouvée, retourner ses informations avec la date du flux
+    if station_info:
+        return jsonify(dict(station_info, last_updated=snapshot.last_updated))
     else:
-        # Retourner une erreur si la requête a échoué
-        return jsonify({"error": f"Erreur lors de la requête: {response.status_code}"}), response.status_code
\ No newline at end of file
+        # Retourner une réponse vide si la station n'est pas trouvée
+        return jsonify(None)
+
+@station_bp.route('/stations/status', methods=['POST'])
+def get_stations_status():
+    """
+    Endpoint pour récupérer la disponibilité de plusieurs stations en un seul appel
+    ---
+    Requiert un JSON avec station_ids (liste d'identifiants)
+    ou bbox ([min_lat, min_lon, max_lat, max_lon])
+    """
+    data = request.get_json(silent=True) or {}
+
+    success, message, response_data, status_code = StationService.get_status_batch(
+        station_ids=data.get('station_ids'),
+        bbox=data.get('bbox')
+    )
+
+    return jsonify(response_data), status_code
+
+
+@station_bp.route('/status', methods=['GET'])
+def get_status_changes():
+    """
+    Endpoint pour récupérer uniquement les stations dont la disponibilité a changé
+    ---
+    Paramètre since optionnel : version renvoyée par l'appel précédent. Sans since,
+    ou si la version est trop ancienne ou inconnue, toutes les stations sont renvoyées (full = true)
+    """
+    since = request.args.get('since')
+    if since is not None:
+        try:
+            since = int(since)
+        except ValueError:
+            return jsonify({
+                'error': "Le paramètre 'since' doit être une version entière",
+                'error_code': 'INVALID_PARAMETER'
+            }), 400
+
+    success, message, response_data, status_code = StationService.get_status_changes(since)
+    if isinstance(response_data, FrozenBody):
+        return response_compressor.frozen_response(response_data)
+    return jsonify(response_data), status_code
+
+
+@station_bp.route('/stream', methods=['GET'])
+def stream_status_changes():
+    """
+    Flux Server-Sent Events des changements de disponibilité
+    ---
+    Paramètres optionnels : bbox (min_lat,min_lon,max_lat,max_lon) ou station_ids (1,2,3).
+    Premier message « snapshot » avec toutes les stations suivies, puis un message
+    « changes » par nouvelle version du flux. En production, servir cette route via
+    create_asgi_app : en WSGI, chaque abonné occupe un thread.
+    """
+    subscription, error, status_code = status_stream.subscribe(
+        request.args, request.headers.get('Last-Event-ID'), threaded=True
+    )
+    if subscription is None:
+        headers = {'Retry-After': '5'} if status_code == 503 else {}
+        return jsonify(error), status_code, headers
+
+    response = Response(status_stream.events(subscription), mimetype='text/event-stream', headers={
+        'Cache-Control': 'no-cache',
+        'X-Accel-Buffering': 'no'
+    })
+    # Client parti avant le premier message : le générateur n'a jamais démarré
+    response.call_on_close(lambda: status_stream.unsubscribe(subscription))
+    return response
+
+
+@station_bp.route('/nearby', methods=['GET'])
+def get_nearby_stations():
+    """
+    Endpoint pour récupérer les stations les plus proches d'une position
+    ---
+    Requiert les paramètres lat et lon, k optionnel (10 par défaut)
+    """
+    lat = request.args.get('lat', type=float)
+    lon = request.args.get('lon', type=float)
+    k = request.args.get('k', default=10, type=int)
+
+    if lat is None or lon is None:
+        return jsonify({
+            'error': "Paramètres 'lat' et 'lon' manquants ou invalides",
+            'error_code': 'MISSING_PARAMETER'
+        }), 400
+
+    if not valid_position(lat, lon):
+        return jsonify({
+            'error': "Les paramètres 'lat' et 'lon' doivent être compris entre -90 et 90 et entre -180 et 180",
+            'error_code': 'INVALID_PARAMETER'
+        }), 400
+
+    success, message, response_data, status_code = StationService.get_nearby(lat, lon, k)
+    return jsonify(response_data), status_code
+
+
+@station_bp.route('/bbox', methods=['GET'])
+def get_bbox_stations():
+    """
+    Endpoint pour récupérer les stations situées dans une zone de la carte
+    ---
+    Requiert les paramètres min_lat, min_lon, max_lat et max_lon
+    """
+    bounds = [request.args.get(key, type=float) for key in ('min_lat', 'min_lon', 'max_lat', 'max_lon')]
+
+    if any(bound is None for bound in bounds):
+        return jsonify({
+            'error': "Paramètres 'min_lat', 'min_lon', 'max_lat' et 'max_lon' manquants ou invalides",
+            'error_code': 'MISSING_PARAMETER'
+        }), 400
+
+    min_lat, min_lon, max_lat, max_lon = bounds
+    if not (valid_position(min_lat, min_lon) and valid_position(max_lat, max_lon)):
+        return jsonify({
+            'error': "Les latitudes doivent être comprises entre -90 et 90 et les longitudes entre -180 et 180",
+            'error_code': 'INVALID_PARAMETER'
+        }), 400
+
+    success, message, response_data, status_code = StationService.get_in_bbox(*bounds)
+    return jsonify(response_data), status_code
@@ -1,11 +1,11 @@
 """
 Service d'authentification pour gérer l'inscription et la connexion des utilisateurs
 """
-import bcrypt
 from sqlalchemy.exc import IntegrityError
 from typing import Tuple, Optional, Dict, Any
 from ..models.user_model import User
-from ..extensions import db
+from ..extensions import db, password_hasher
+from .password_hasher import HasherBusy
 from .token_service import TokenService
 
 class AuthService:
@@ -32,14 +32,14 @@ class AuthService:
             if existing_user:
                 return None, "Un utilisateur avec cet email existe déjà", 409
             
-            # Hasher le mot de passe
-            hashed_password = bcrypt.hashpw(password.encode('utf-8'), bcrypt.gensalt())
+            # Hasher le mot de passe (dans le pool bcrypt dédié)
+            hashed_password = password_hasher.hash(password)
             
             # Créer le nouvel utilisateur
             new_user = User(
                 username=username,
                 email=email,
-                password=hashed_password.decode('utf-8')  # Stocker le hash en string
+                password=hashed_password  # Stocker le hash en string
             )
             
             # Enregistrer dans la base de données
@@ -55,6 +55,9 @@ class AuthService:
             
             return user_data, "Compte créé avec succès", 201
             
+        except HasherBusy:
+            db.session.rollback()
+            return None, "Service temporairement surchargé, veuillez réessayer", 503
         except IntegrityError:
             db.session.rollback()
             return None, "Une erreur est survenue lors de l'inscription", 500
@@ -82,8 +85,8 @@ class AuthService:
             if not user:
                 return None, "Email ou mot de passe incorrect", 401
             
-            # Vérifier le mot de passe
-            if not bcrypt.checkpw(password.encode('utf-8'), user.password.encode('utf-8')):
+            # Vérifier le mot de passe (dans le pool bcrypt dédié)
+            if not password_hasher.verify(password, user.password):
                 return None, "Email ou mot de passe incorrect", 401
             
             # Générer le token
@@ -99,5 +102,7 @@ class AuthService:
             
             return user_data, "Connexion réussie", 200
                 
+        except HasherBusy:
+            return None, "Service temporairement surchargé, veuillez réessayer", 503
         except Exception as e:
             return None, f"Erreur lors de la connexion: {str(e)}", 500 
\ No newline at end of file
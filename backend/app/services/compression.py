@@ -0,0 +1,128 @@
+"""
+Compression des réponses HTTP (brotli et gzip, selon Accept-Encoding)
+
+Les réponses dynamiques au-dessus de min_size octets sont compressées dans un
+after_request. Les corps figés d'un instantané du flux (catalogue des stations,
+disponibilité complète) sont des FrozenBody : chaque encodage n'est calculé qu'une
+fois par instantané, avec un niveau plus élevé, puis réutilisé par toutes les requêtes.
+Les réponses en streaming (flux SSE) ne sont pas compressées.
+"""
+import gzip
+import threading
+from typing import Dict, Optional
+
+from flask import Response, request
+
+try:
+    import brotli
+except ImportError:  # pragma: no cover - dépendance optionnelle
+    brotli = None
+
+COMPRESSIBLE_MIMETYPES = ('application/json', 'text/', 'application/javascript')
+
+
+class FrozenBody:
+    """Corps de réponse immuable et ses versions compressées, calculées à la première demande"""
+
+    __slots__ = ('data', '_encoded', '_lock')
+
+    def __init__(self, data: bytes):
+        self.data = data
+        self._encoded: Dict[str, bytes] = {}
+        self._lock = threading.Lock()
+
+    def encoded(self, encoding: str, level: int) -> bytes:
+        body = self._encoded.get(encoding)
+        if body is None:
+            # Une seule compression par instantané, même si plusieurs requêtes arrivent ensemble
+            with self._lock:
+                body = self._encoded.get(encoding)
+                if body is None:
+                    body = self._encoded[encoding] = compress(self.data, encoding, level)
+        return body
+
+
+def compress(data: bytes, encoding: str, level: int) -> bytes:
+    if encoding == 'br':
+        return brotli.compress(data, quality=level)
+    # mtime fixe : le même corps donne toujours les mêmes octets
+    return gzip.compress(data, compresslevel=level, mtime=0)
+
+
+class ResponseCompressor:
+    """Négocie l'encodage des réponses et compresse celles qui en valent la peine"""
+
+    def __init__(self):
+        self.enabled = True
+        self.min_size = 1024
+        self.levels = {'br': 4, 'gzip': 6}
+        self.static_levels = {'br': 9, 'gzip': 9}
+        self._lock = threading.Lock()
+        self._counters = {'compressed': 0, 'precompressed': 0, 'bytes_in': 0, 'bytes_out': 0}
+
+    def init_app(self, app) -> None:
+        """Lit l'activation, le seuil de taille et les niveaux de compression depuis la configuration"""
+        self.enabled = app.config.get('COMPRESSION_ENABLED', self.enabled)
+        self.min_size = app.config.get('COMPRESSION_MIN_SIZE', self.min_size)
+        self.levels = {
+            'br': app.config.get('COMPRESSION_BROTLI_QUALITY', self.levels['br']),
+            'gzip': app.config.get('COMPRESSION_GZIP_LEVEL', self.levels['gzip'])
+        }
+        self.static_levels = {
+            'br': app.config.get('COMPRESSION_STATIC_BROTLI_QUALITY', self.static_levels['br']),
+            'gzip': app.config.get('COMPRESSION_STATIC_GZIP_LEVEL', self.static_levels['gzip'])
+        }
+        if self.enabled:
+            app.after_request(self._after_request)
+
+    def frozen_response(self, body: FrozenBody, mimetype: str = 'application/json') -> Response:
+        """Réponse servie depuis les versions compressées mises en cache dans le FrozenBody"""
+        encoding = self._negotiate(len(body.data))
+        if encoding is None:
+            response = Response(body.data, mimetype=mimetype)
+        else:
+            data = body.encoded(encoding, self.static_levels[encoding])
+            response = Response(data, mimetype=mimetype)
+            response.headers['Content-Encoding'] = encoding
+            self._count('precompressed', len(body.data), len(data))
+        response.vary.add('Accept-Encoding')
+        return response
+
+    def stats(self) -> Dict[str, int]:
+        """Réponses compressées et octets avant/après compression"""
+        with self._lock:
+            return dict(self._counters)
+
+    def _negotiate(self, size: int) -> Optional[str]:
+        """Meilleur encodage accepté par le client (brotli de préférence), ou None"""
+        if not self.enabled or size < self.min_size:
+            return None
+        offered = ['br', 'gzip'] if brotli is not None else ['gzip']
+        return request.accept_encodings.best_match(offered)
+
+    def _after_request(self, response: Response) -> Response:
+        if (response.status_code < 200 or response.status_code in (204, 304) or response.direct_passthrough
+                or response.is_streamed or 'Content-Encoding' in response.headers
+                or not (response.mimetype or '').startswith(COMPRESSIBLE_MIMETYPES)):
+            return response
+
+        response.vary.add('Accept-Encoding')
+        data = response.get_data()
+        encoding = self._negotiate(len(data))
+        if encoding is None:
+            return response
+
+        compressed = compress(data, encoding, self.levels[encoding])
+        if len(compressed) >= len(data):
+            return response
+
+        response.set_data(compressed)
+        response.headers['Content-Encoding'] = encoding
+        self._count('compressed', len(data), len(compressed))
+        return response
+
+    def _count(self, counter: str, bytes_in: int, bytes_out: int) -> None:
+        with self._lock:
+            self._counters[counter] += 1
+            self._counters['bytes_in'] += bytes_in
+            self._counters['bytes_out'] += bytes_out
@@ -0,0 +1,113 @@
+"""
+Pool de connexions SQLAlchemy configurable et instrumenté
+"""
+import threading
+import time
+from typing import Any, Dict
+
+from sqlalchemy import event
+from sqlalchemy.exc import TimeoutError as PoolTimeoutError
+from sqlalchemy.pool import QueuePool
+
+
+class InstrumentedQueuePool(QueuePool):
+    """QueuePool qui mesure l'attente des requêtes lorsque toutes les connexions sont prises"""
+
+    def __init__(self, *args, **kwargs):
+        super().__init__(*args, **kwargs)
+        self.wait_stats = {'checkouts': 0, 'wait_total': 0.0, 'wait_max': 0.0, 'timeouts': 0}
+        self._stats_lock = threading.Lock()
+
+    def _do_get(self):
+        start = time.perf_counter()
+        try:
+            return super()._do_get()
+        except PoolTimeoutError:
+            with self._stats_lock:
+                self.wait_stats['timeouts'] += 1
+            raise
+        finally:
+            waited = time.perf_counter() - start
+            with self._stats_lock:
+                self.wait_stats['checkouts'] += 1
+                self.wait_stats['wait_total'] += waited
+                self.wait_stats['wait_max'] = max(self.wait_stats['wait_max'], waited)
+
+
+class PoolMonitor:
+    """Applique la configuration DB_* au moteur SQLAlchemy et expose l'état du pool"""
+
+    def __init__(self):
+        self.statement_timeout = 0
+
+    def init_app(self, app) -> None:
+        """
+        Construit SQLALCHEMY_ENGINE_OPTIONS à partir de la configuration
+
+        Doit être appelé avant db.init_app. SQLite garde son pool par défaut (les
+        options de taille n'ont pas de sens pour une base locale ou en mémoire).
+        """
+        uri = app.config.get('SQLALCHEMY_DATABASE_URI') or ''
+        if uri.startswith('sqlite'):
+            return
+
+        options = app.config.setdefault('SQLALCHEMY_ENGINE_OPTIONS', {})
+        options.setdefault('poolclass', InstrumentedQueuePool)
+        options.setdefault('pool_size', app.config['DB_POOL_SIZE'])
+        options.setdefault('max_overflow', app.config['DB_MAX_OVERFLOW'])
+        options.setdefault('pool_timeout', app.config['DB_POOL_TIMEOUT'])
+        options.setdefault('pool_recycle', app.config['DB_POOL_RECYCLE'])
+        options.setdefault('pool_pre_ping', app.config['DB_POOL_PRE_PING'])
+
+        # Limite la durée des requêtes côté serveur (millisecondes, 0 = sans limite)
+        self.statement_timeout = int(app.config['DB_STATEMENT_TIMEOUT'])
+        if uri.startswith('mysql') and self.statement_timeout and not event.contains(
+                InstrumentedQueuePool, 'connect', self._set_statement_timeout):
+            event.listen(InstrumentedQueuePool, 'connect', self._set_statement_timeout)
+
+    def _set_statement_timeout(self, dbapi_connection, connection_record) -> None:
+        """
+        Fixe la durée maximale des requêtes de chaque nouvelle connexion
+
+        MySQL (max_execution_time, en millisecondes) ne limite que les SELECT ;
+        MariaDB n'a pas cette variable et utilise max_statement_time, en secondes,
+        qui s'applique à toutes les requêtes.
+        """
+        if not self.statement_timeout:
+            return
+        server = dbapi_connection.get_server_info() if hasattr(dbapi_connection, 'get_server_info') else ''
+        if 'mariadb' in server.lower():
+            statement = f"SET SESSION max_statement_time = {self.statement_timeout / 1000:g}"
+        else:
+            statement = f"SET SESSION max_execution_time = {self.statement_timeout}"
+
+        cursor = dbapi_connection.cursor()
+        try:
+            cursor.execute(statement)
+        finally:
+            cursor.close()
+
+    @staticmethod
+    def stats(engine) -> Dict[str, Any]:
+        """État courant du pool : connexions prises, débordement et temps d'attente"""
+        pool = engine.pool
+        stats: Dict[str, Any] = {'pool': type(pool).__name__}
+
+        if isinstance(pool, QueuePool):
+            stats.update({
+                'size': pool.size(),
+                'checked_out': pool.checkedout(),
+                'checked_in': pool.checkedin(),
+                'overflow': max(pool.overflow(), 0)
+            })
+
+        wait_stats = getattr(pool, 'wait_stats', None)
+        if wait_stats is not None:
+            checkouts = wait_stats['checkouts']
+            stats.update({
+                'checkouts': checkouts,
+                'timeouts': wait_stats['timeouts'],
+                'wait_avg_ms': round(wait_stats['wait_total'] / checkouts * 1000, 3) if checkouts else 0.0,
+                'wait_max_ms': round(wait_stats['wait_max'] * 1000, 3)
+            })
+        return stats
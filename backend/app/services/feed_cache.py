@@ -0,0 +1,382 @@
+"""
+Cache en mémoire des flux open data Vélib (GBFS)
+
+Les flux sont téléchargés une fois par période de rafraîchissement puis partagés
+entre toutes les requêtes du processus.
+"""
+import hashlib
+import logging
+import os
+import threading
+import time
+from typing import Any, Dict, List, Optional, Tuple
+
+from ..json_provider import encode
+from .compression import FrozenBody
+from .name_index import NameIndex
+from .spatial_index import GridIndex
+
+
+class FeedCache:
+    """
+    Cache d'un flux JSON distant rafraîchi selon un TTL.
+
+    Le premier appel à get() télécharge le flux de manière bloquante. Ensuite, un
+    instantané périmé continue d'être servi pendant qu'un thread d'arrière-plan le
+    rafraîchit. Si le flux amont échoue, le dernier instantané valide est conservé.
+
+    Les rafraîchissements sont des GET conditionnels (ETag / Last-Modified) : une
+    réponse 304 prolonge l'instantané sans téléchargement ni décodage. La date du
+    prochain rafraîchissement suit les champs GBFS last_updated + ttl du flux, bornée
+    par min_interval et par le TTL configuré.
+    """
+
+    # Clés de configuration lues par init_app (définies par les sous-classes)
+    url_config_key = None
+    ttl_config_key = None
+
+    # Délai avant une nouvelle tentative après un échec du flux amont (secondes)
+    retry_delay = 15
+
+    def __init__(self, client, url: Optional[str] = None, ttl: int = 60, min_interval: int = 5):
+        self.client = client
+        self.url = url
+        self.ttl = ttl
+        self.min_interval = min_interval
+        self.last_error: Optional[str] = None
+        self._snapshot = None
+        self._etag: Optional[str] = None
+        self._last_modified: Optional[str] = None
+        self._pending_validators = (None, None)
+        self._feed_ttl = None
+        self._counters = {'downloads': 0, 'not_modified': 0, 'failures': 0}
+        self._expires_at = 0.0
+        self._refreshing = False
+        self._fetch_lock = threading.Lock()
+        self._state_lock = threading.Lock()
+
+        # Un fork pendant un rafraîchissement laisserait les verrous pris dans le worker
+        os.register_at_fork(after_in_child=self._after_fork)
+
+    def _after_fork(self) -> None:
+        self._refreshing = False
+        self._fetch_lock = threading.Lock()
+        self._state_lock = threading.Lock()
+
+    def init_app(self, app) -> None:
+        """Lit l'URL et le TTL du flux depuis la configuration de l'application"""
+        self.url = app.config.get(self.url_config_key, self.url)
+        self.ttl = app.config.get(self.ttl_config_key, self.ttl)
+        self.min_interval = app.config.get('FEED_MIN_POLL_INTERVAL', self.min_interval)
+
+    def get(self):
+        """
+        Retourne l'instantané courant du flux
+
+        Returns:
+            L'instantané construit par _build, ou None si aucun téléchargement n'a encore réussi
+        """
+        snapshot = self._snapshot
+        if snapshot is None:
+            return self.refresh()
+
+        if time.monotonic() >= self._expires_at:
+            self._refresh_in_background()
+        return snapshot
+
+    def refresh(self, force: bool = False):
+        """
+        Télécharge le flux de manière synchrone et remplace l'instantané
+
+        Args:
+            force (bool): Ignore le TTL et télécharge même si l'instantané est frais
+
+        Returns:
+            Le dernier instantané valide (éventuellement l'ancien en cas d'échec)
+        """
+        with self._fetch_lock:
+            # Un autre thread a pu rafraîchir le flux pendant l'attente du verrou
+            if not force and self._snapshot is not None and time.monotonic() < self._expires_at:
+                return self._snapshot
+
+            try:
+                payload = self._fetch()
+                if payload is None:
+                    # 304 : le flux n'a pas changé, l'instantané courant reste valable
+                    self._counters['not_modified'] += 1
+                else:
+                    self._snapshot = self._build(payload)
+                    self._etag, self._last_modified = self._pending_validators
+                    self._feed_ttl = payload.get('ttl')
+                    self._counters['downloads'] += 1
+                self._expires_at = time.monotonic() + self._poll_delay(payload)
+                self.last_error = None
+            except Exception as e:
+                self.last_error = str(e)
+                self._counters['failures'] += 1
+                self._expires_at = time.monotonic() + min(self.ttl, self.retry_delay)
+                logging.error(f"Erreur lors du rafraîchissement du flux {self.url}: {str(e)}")
+
+            return self._snapshot
+
+    def _refresh_in_background(self) -> None:
+        """Lance un rafraîchissement dans un thread si aucun n'est déjà en cours"""
+        with self._state_lock:
+            if self._refreshing:
+                return
+            self._refreshing = True
+
+        thread = threading.Thread(target=self._background_refresh, name=f"{type(self).__name__}-refresh", daemon=True)
+        thread.start()
+
+    def _background_refresh(self) -> None:
+        try:
+            self.refresh(force=True)
+        finally:
+            with self._state_lock:
+                self._refreshing = False
+
+    def stats(self) -> Dict[str, Any]:
+        """Compteurs de téléchargements et âge de l'instantané courant"""
+        snapshot = self._snapshot
+        stats = dict(self._counters)
+        stats['age'] = time.time() - snapshot.fetched_at if snapshot is not None else None
+        return stats
+
+    def _poll_delay(self, payload: Optional[Dict[str, Any]]) -> float:
+        """Délai avant le prochain rafraîchissement, d'après les champs GBFS last_updated et ttl"""
+        feed_ttl = self._feed_ttl
+        last_updated = payload.get('last_updated') if payload is not None else None
+
+        if isinstance(feed_ttl, (int, float)) and isinstance(last_updated, (int, float)):
+            delay = last_updated + feed_ttl - time.time()
+        elif isinstance(feed_ttl, (int, float)):
+            delay = feed_ttl
+        else:
+            delay = self.ttl
+        return max(self.min_interval, min(delay, self.ttl))
+
+    def _fetch(self) -> Optional[Dict[str, Any]]:
+        """
+        Télécharge et décode le flux amont
+
+        Returns:
+            Le flux décodé, ou None si le serveur répond 304 (flux inchangé)
+        """
+        headers = {'Accept-Encoding': 'gzip, deflate'}
+        if self._snapshot is not None:
+            if self._etag:
+                headers['If-None-Match'] = self._etag
+            if self._last_modified:
+                headers['If-Modified-Since'] = self._last_modified
+
+        response = self.client.get(self.url, headers=headers)
+        if response.status_code == 304 and self._snapshot is not None:
+            return None
+        if response.status_code != 200:
+            raise RuntimeError(f"Erreur lors de la requête: {response.status_code}")
+
+        # Validateurs enregistrés par refresh() une fois l'instantané construit
+        self._pending_validators = (response.headers.get('ETag'), response.headers.get('Last-Modified'))
+        return response.json()
+
+    def _build(self, payload: Dict[str, Any]):
+        """Construit l'instantané immuable à partir du flux décodé"""
+        raise NotImplementedError
+
+
+class CatalogueSnapshot:
+    """Instantané du catalogue des stations (station_information.json)"""
+
+    __slots__ = ('stations', 'by_id', 'located', 'spatial_index', 'name_index', 'body', 'last_updated', 'fetched_at')
+
+    def __init__(self, stations: List[Dict[str, Any]], last_updated: Optional[int],
+                 previous: Optional['CatalogueSnapshot'] = None):
+        self.stations = stations
+        self.by_id = {station['station_id']: station for station in stations}
+        # Index spatial sur les stations géolocalisées, réutilisé si aucune station n'a bougé
+        self.located = [station for station in stations if station['lat'] is not None and station['lon'] is not None]
+        self.spatial_index = GridIndex.build(
+            [(station['lat'], station['lon']) for station in self.located],
+            previous.spatial_index if previous is not None else None
+        )
+        # Index des noms normalisés pour la recherche approchée
+        self.name_index = NameIndex.build(
+            [station['name'] for station in stations],
+            previous.name_index if previous is not None else None
+        )
+        # Réponse de /api/station/stations sérialisée (et compressée) une seule fois par rafraîchissement
+        self.body = FrozenBody(encode(stations))
+        self.last_updated = last_updated
+        self.fetched_at = time.time()
+
+    def nearby(self, lat: float, lon: float, k: int) -> List[Dict[str, Any]]:
+        """Retourne les k stations les plus proches, avec leur distance en mètres"""
+        return [
+            dict(self.located[position], distance=round(distance))
+            for position, distance in self.spatial_index.nearest(lat, lon, k)
+        ]
+
+    def within(self, min_lat: float, min_lon: float, max_lat: float, max_lon: float) -> List[Dict[str, Any]]:
+        """Retourne les stations situées dans le rectangle donné"""
+        return [self.located[position] for position in self.spatial_index.within(min_lat, min_lon, max_lat, max_lon)]
+
+    def match(self, query: str, k: int) -> List[Tuple[Dict[str, Any], float, bool]]:
+        """Retourne les k stations dont le nom correspond le mieux au terme recherché"""
+        return [(self.stations[position], score, contained) for position, score, contained in self.name_index.search(query, k)]
+
+    def suggest(self, prefix: str, limit: int) -> List[Dict[str, Any]]:
+        """Retourne les stations dont le nom (ou un mot du nom) commence par le terme saisi"""
+        return [self.stations[position] for position in self.name_index.complete(prefix, limit)]
+
+
+class StationCatalogue(FeedCache):
+    """Catalogue des stations Vélib partagé par les routes et les services"""
+
+    url_config_key = 'VELIB_STATION_INFORMATION_URL'
+    ttl_config_key = 'STATION_CATALOGUE_TTL'
+
+    def _build(self, payload: Dict[str, Any]) -> CatalogueSnapshot:
+        stations = []
+
+        # Filtrer et structurer les données des stations
+        for station in payload.get('data', {}).get('stations', []):
+            stations.append({
+                "station_id": station.get('station_id'),
+                "stationCode": station.get('stationCode'),
+                "name": station.get('name'),
+                "lat": station.get('lat'),
+                "lon": station.get('lon'),
+                "capacity": station.get('capacity')
+            })
+
+        return CatalogueSnapshot(stations, payload.get('last_updated'), previous=self._snapshot)
+
+
+class StatusSnapshot:
+    """
+    Instantané de la disponibilité des stations (station_status.json)
+
+    Chaque instantané porte un numéro de version et l'historique des stations
+    modifiées par les history_size dernières versions, ce qui permet de ne renvoyer
+    que les différences. La version ne dépend que du flux (empreinte de last_updated
+    et des statuts compacts) : deux workers qui ont lu le même flux annoncent la même
+    version, et un worker qui ne connaît pas la version d'un client renvoie tout.
+    Les versions ne sont pas ordonnées, seule leur égalité a un sens.
+    """
+
+    __slots__ = ('by_id', 'compact_by_id', 'last_updated', 'fetched_at', 'version', 'history', '_full_body')
+
+    def __init__(self, stations: List[Dict[str, Any]], last_updated: Optional[int],
+                 previous: Optional['StatusSnapshot'] = None, history_size: int = 30):
+        # Index par station_id pour des recherches en temps constant
+        self.by_id = {station['station_id']: station for station in stations}
+        # Projection réduite utilisée par les réponses groupées
+        self.compact_by_id = {station['station_id']: compact_status(station) for station in stations}
+        self.last_updated = last_updated
+        self.fetched_at = time.time()
+        self._full_body = None
+
+        self.version = feed_version(last_updated, self.compact_by_id)
+
+        # (version, stations modifiées ou ajoutées, stations retirées) depuis la version précédente
+        if previous is None:
+            self.history: Tuple[Tuple[int, frozenset, frozenset], ...] = ((self.version, frozenset(), frozenset()),)
+        elif previous.version == self.version:
+            # Même flux (rafraîchissement sans changement) : pas de nouvelle version
+            self.history = previous.history
+        else:
+            previous_by_id = previous.compact_by_id
+            changed = frozenset(
+                station_id for station_id, compact in self.compact_by_id.items()
+                if previous_by_id.get(station_id) != compact
+            )
+            removed = frozenset(previous_by_id.keys() - self.compact_by_id.keys())
+            self.history = (previous.history + ((self.version, changed, removed),))[-max(history_size, 1):]
+
+    def changes_since(self, version: int) -> Optional[Tuple[List[Dict[str, Any]], List[Any]]]:
+        """
+        Stations modifiées depuis une version antérieure
+
+        Args:
+            version (int): Version déjà connue du client
+
+        Returns:
+            tuple: (statuts compacts des stations modifiées, identifiants des stations retirées),
+            ou None si la version n'est plus (ou pas) dans l'historique
+        """
+        versions = [entry[0] for entry in self.history]
+        if version not in versions:
+            return None
+
+        changed, removed = set(), set()
+        for _, entry_changed, entry_removed in self.history[versions.index(version) + 1:]:
+            changed |= entry_changed
+            removed |= entry_removed
+
+        compact_by_id = self.compact_by_id
+        stations = [compact_by_id[station_id] for station_id in changed if station_id in compact_by_id]
+        return stations, [station_id for station_id in removed if station_id not in compact_by_id]
+
+    def full_body(self) -> FrozenBody:
+        """Réponse complète de /api/station/status, sérialisée (et compressée) une seule fois par instantané"""
+        body = self._full_body
+        if body is None:
+            body = self._full_body = FrozenBody(encode({
+                'version': self.version,
+                'last_updated': self.last_updated,
+                'full': True,
+                'stations': list(self.compact_by_id.values()),
+                'removed': []
+            }))
+        return body
+
+
+def feed_version(last_updated: Optional[int], compact_by_id: Dict[Any, Dict[str, Any]]) -> int:
+    """
+    Version d'un instantané, calculée uniquement à partir du contenu du flux
+
+    Returns:
+        int: Empreinte sur 53 bits (entier exact en JavaScript) de last_updated et des statuts compacts
+    """
+    digest = hashlib.blake2b(encode([last_updated, compact_by_id], sort_keys=True), digest_size=8).digest()
+    return int.from_bytes(digest, 'big') >> 11
+
+
+def compact_status(station: Dict[str, Any]) -> Dict[str, Any]:
+    """Ne garde que les compteurs utiles à l'affichage de la disponibilité d'une station"""
+    bike_types = {}
+    for bike_type in station.get('num_bikes_available_types') or []:
+        bike_types.update(bike_type)
+
+    return {
+        'station_id': station.get('station_id'),
+        'num_bikes_available': station.get('num_bikes_available'),
+        'mechanical': bike_types.get('mechanical', 0),
+        'ebike': bike_types.get('ebike', 0),
+        'num_docks_available': station.get('num_docks_available'),
+        'is_renting': station.get('is_renting'),
+        'is_returning': station.get('is_returning')
+    }
+
+
+class StationStatus(FeedCache):
+    """Disponibilité des vélos et des bornes, rafraîchie selon le TTL du flux GBFS"""
+
+    url_config_key = 'VELIB_STATION_STATUS_URL'
+    ttl_config_key = 'STATION_STATUS_TTL'
+
+    # Nombre de versions conservées pour les réponses différentielles
+    history_size = 30
+
+    def init_app(self, app) -> None:
+        super().init_app(app)
+        self.history_size = app.config.get('STATION_STATUS_HISTORY', self.history_size)
+
+    def _build(self, payload: Dict[str, Any]) -> StatusSnapshot:
+        return StatusSnapshot(
+            payload.get('data', {}).get('stations', []),
+            payload.get('last_updated'),
+            previous=self._snapshot,
+            history_size=self.history_size
+        )
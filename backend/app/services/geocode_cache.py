@@ -0,0 +1,165 @@
+"""
+Cache des géocodages Nominatim
+
+Deux niveaux : un LRU en mémoire propre au processus, puis la table geocodes de la
+base de données partagée par tous les processus. Les adresses introuvables sont
+aussi mises en cache (cache négatif) avec une durée de vie plus courte.
+
+La table geocodes est créée par la migration 0002 (python -m migrations upgrade).
+Le cache y accède par une session qui lui est propre : la session de la requête,
+et sa transaction en cours, ne sont ni validées ni fermées par le cache.
+"""
+import hashlib
+import logging
+import threading
+import time
+from collections import OrderedDict
+from datetime import datetime, timedelta
+from typing import Dict, Optional, Tuple
+
+from sqlalchemy.exc import SQLAlchemyError
+from sqlalchemy.orm import Session
+
+from .name_index import normalize
+
+Location = Optional[Tuple[float, float]]
+
+# En dessous, une clé normalisée est trop peu discriminante (« 5 », « a »)
+MIN_KEY_LENGTH = 3
+
+
+class GeocodeCache:
+    """Cache à deux niveaux (mémoire puis base de données) des positions géocodées"""
+
+    def __init__(self, max_entries: int = 2048, ttl: int = 30 * 24 * 3600, negative_ttl: int = 24 * 3600,
+                 persistent: bool = True):
+        self.max_entries = max_entries
+        self.ttl = ttl
+        self.negative_ttl = negative_ttl
+        self.persistent = persistent
+        self._entries: "OrderedDict[str, Tuple[float, Location]]" = OrderedDict()
+        self._lock = threading.RLock()
+        self._counters = {'memory_hits': 0, 'persistent_hits': 0, 'negative_hits': 0, 'misses': 0, 'errors': 0}
+
+    def init_app(self, app) -> None:
+        """Lit la taille, les durées de vie et l'activation du niveau persistant depuis la configuration"""
+        self.max_entries = app.config.get('GEOCODE_CACHE_SIZE', self.max_entries)
+        self.ttl = app.config.get('GEOCODE_CACHE_TTL', self.ttl)
+        self.negative_ttl = app.config.get('GEOCODE_CACHE_NEGATIVE_TTL', self.negative_ttl)
+        self.persistent = app.config.get('GEOCODE_CACHE_PERSISTENT', self.persistent)
+
+    @staticmethod
+    def key(search_term: str) -> str:
+        """
+        Clé de cache : terme normalisé (casse, accents et ponctuation ignorés)
+
+        Si la normalisation perd des caractères (alphabets non latins), laisse une clé
+        trop courte ou trop longue pour la colonne, la clé est l'empreinte SHA-256 du
+        terme brut en minuscules : deux recherches différentes ne partagent pas d'entrée.
+        """
+        normalized = normalize(search_term)
+        kept = len(normalized.replace(' ', ''))
+        if kept < MIN_KEY_LENGTH or kept < sum(char.isalnum() for char in search_term) or len(normalized) > 255:
+            raw = ' '.join(search_term.lower().split())
+            return 'sha256:' + hashlib.sha256(raw.encode('utf-8')).hexdigest()
+        return normalized
+
+    def get(self, search_term: str) -> Tuple[bool, Location]:
+        """
+        Cherche un géocodage en cache
+
+        Returns:
+            Tuple[bool, Location]: (trouvé_en_cache, (lat, lon) ou None si l'adresse est introuvable)
+        """
+        key = self.key(search_term)
+        now = time.time()
+
+        with self._lock:
+            entry = self._entries.get(key)
+            if entry is not None:
+                expires_at, location = entry
+                if expires_at > now:
+                    self._entries.move_to_end(key)
+                    self._count('memory_hits', negative=location is None)
+                    return True, location
+                del self._entries[key]
+
+        if self.persistent:
+            found, expires_at, location = self._load(key)
+            if found:
+                self._remember(key, expires_at, location)
+                self._count('persistent_hits', negative=location is None)
+                return True, location
+
+        self._count('misses')
+        return False, None
+
+    def set(self, search_term: str, location: Location) -> None:
+        """Enregistre le résultat d'un géocodage (None pour une adresse introuvable)"""
+        key = self.key(search_term)
+        ttl = self.ttl if location is not None else self.negative_ttl
+        expires_at = time.time() + ttl
+
+        self._remember(key, expires_at, location)
+        if self.persistent:
+            self._store(key, expires_at, location)
+
+    def stats(self) -> Dict[str, int]:
+        """Compteurs de succès et d'échecs du cache"""
+        with self._lock:
+            stats = dict(self._counters)
+            stats['size'] = len(self._entries)
+        return stats
+
+    def _count(self, counter: str, negative: bool = False) -> None:
+        with self._lock:
+            self._counters[counter] += 1
+            if negative:
+                self._counters['negative_hits'] += 1
+
+    def _remember(self, key: str, expires_at: float, location: Location) -> None:
+        with self._lock:
+            self._entries[key] = (expires_at, location)
+            self._entries.move_to_end(key)
+            while len(self._entries) > self.max_entries:
+                self._entries.popitem(last=False)
+
+    def _load(self, key: str) -> Tuple[bool, float, Location]:
+        """Lit une entrée non expirée dans la base de données"""
+        # Import local : les modèles dépendent de app.extensions, qui instancie ce cache
+        from ..extensions import db
+        from ..models.geocode_model import Geocode
+
+        try:
+            # Connexion rendue au pool dès la lecture, avant un éventuel appel à Nominatim
+            with Session(db.engine) as session:
+                row = session.get(Geocode, key)
+            if row is None or row.expires_at <= datetime.utcnow():
+                return False, 0.0, None
+
+            expires_at = time.time() + (row.expires_at - datetime.utcnow()).total_seconds()
+            location = (row.lat, row.lon) if row.lat is not None and row.lon is not None else None
+            return True, expires_at, location
+
+        except SQLAlchemyError as e:
+            self._count('errors')
+            logging.error(f"Erreur lors de la lecture du cache de géocodage : {str(e)}")
+            return False, 0.0, None
+
+    def _store(self, key: str, expires_at: float, location: Location) -> None:
+        """Écrit (ou remplace) une entrée dans la base de données"""
+        from ..extensions import db
+        from ..models.geocode_model import Geocode
+
+        try:
+            with Session(db.engine) as session, session.begin():
+                session.merge(Geocode(
+                    terme=key,
+                    lat=location[0] if location else None,
+                    lon=location[1] if location else None,
+                    expires_at=datetime.utcnow() + timedelta(seconds=expires_at - time.time())
+                ))
+
+        except SQLAlchemyError as e:
+            self._count('errors')
+            logging.error(f"Erreur lors de l'écriture du cache de géocodage : {str(e)}")
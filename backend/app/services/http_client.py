@@ -0,0 +1,183 @@
+"""
+Client HTTP partagé pour les appels aux services externes (Vélib, Nominatim)
+
+Toutes les requêtes sortantes passent par une même session requests : les connexions
+sont conservées (keep-alive) et réutilisées, chaque hôte a ses propres timeouts, les
+erreurs transitoires sont réessayées avec un délai croissant et un disjoncteur coupe
+les appels vers un hôte tant qu'il est en panne.
+"""
+import logging
+import os
+import threading
+import time
+from typing import Dict, Tuple
+from urllib.parse import urlsplit
+
+import requests
+from requests.adapters import HTTPAdapter
+from urllib3.util.retry import Retry
+
+from .metrics import UPSTREAM_REQUEST_DURATION
+
+
+class UpstreamUnavailable(RuntimeError):
+    """Levée sans appel réseau lorsque le disjoncteur d'un hôte est ouvert"""
+
+
+class CircuitBreaker:
+    """
+    Disjoncteur d'un hôte externe.
+
+    Après failure_threshold échecs consécutifs, le circuit s'ouvre pendant
+    reset_timeout secondes ; un seul appel d'essai est ensuite autorisé et
+    referme le circuit s'il réussit.
+    """
+
+    def __init__(self, failure_threshold: int = 5, reset_timeout: float = 30):
+        self.failure_threshold = failure_threshold
+        self.reset_timeout = reset_timeout
+        self.failures = 0
+        self.opened_at = None
+        self._trial_in_progress = False
+        self._lock = threading.Lock()
+
+    @property
+    def state(self) -> str:
+        if self.opened_at is None:
+            return 'closed'
+        if time.monotonic() - self.opened_at >= self.reset_timeout:
+            return 'half-open'
+        return 'open'
+
+    def allow(self) -> bool:
+        """Indique si un appel peut être tenté"""
+        with self._lock:
+            state = self.state
+            if state == 'closed':
+                return True
+            if state == 'half-open' and not self._trial_in_progress:
+                self._trial_in_progress = True
+                return True
+            return False
+
+    def record_success(self) -> None:
+        with self._lock:
+            self.failures = 0
+            self.opened_at = None
+            self._trial_in_progress = False
+
+    def record_failure(self) -> None:
+        with self._lock:
+            self.failures += 1
+            self._trial_in_progress = False
+            if self.opened_at is not None or self.failures >= self.failure_threshold:
+                self.opened_at = time.monotonic()
+
+
+class UpstreamClient:
+    """Session HTTP partagée avec pool de connexions, timeouts par hôte, réessais et disjoncteurs"""
+
+    def __init__(self):
+        self.default_timeout: Tuple[float, float] = (3.05, 10)
+        self.timeouts: Dict[str, Tuple[float, float]] = {}
+        self.pool_size = 10
+        self.retries = 2
+        self.backoff_factor = 0.3
+        self.failure_threshold = 5
+        self.reset_timeout = 30.0
+        self.user_agent = 'VelibSearchApp/1.0'
+        self._breakers: Dict[str, CircuitBreaker] = {}
+        self._session = None
+        self._session_pid = None
+        self._lock = threading.Lock()
+
+    def init_app(self, app) -> None:
+        """Lit les timeouts par hôte, la taille du pool, les réessais et le disjoncteur depuis la configuration"""
+        connect_timeout = app.config.get('UPSTREAM_CONNECT_TIMEOUT', self.default_timeout[0])
+        self.default_timeout = (connect_timeout, app.config.get('UPSTREAM_READ_TIMEOUT', self.default_timeout[1]))
+        self.timeouts = {
+            urlsplit(app.config['VELIB_STATION_INFORMATION_URL']).netloc: (connect_timeout, app.config['VELIB_HTTP_TIMEOUT']),
+            urlsplit(app.config['VELIB_STATION_STATUS_URL']).netloc: (connect_timeout, app.config['VELIB_HTTP_TIMEOUT']),
+            urlsplit(app.config['NOMINATIM_URL']).netloc: (connect_timeout, app.config['NOMINATIM_HTTP_TIMEOUT'])
+        }
+        self.pool_size = app.config.get('UPSTREAM_POOL_SIZE', self.pool_size)
+        self.retries = app.config.get('UPSTREAM_RETRIES', self.retries)
+        self.backoff_factor = app.config.get('UPSTREAM_BACKOFF_FACTOR', self.backoff_factor)
+        self.failure_threshold = app.config.get('UPSTREAM_BREAKER_THRESHOLD', self.failure_threshold)
+        self.reset_timeout = app.config.get('UPSTREAM_BREAKER_RESET', self.reset_timeout)
+
+    @property
+    def session(self) -> requests.Session:
+        """Session du processus courant (recréée après un fork pour ne pas partager les sockets)"""
+        if self._session is None or self._session_pid != os.getpid():
+            with self._lock:
+                if self._session is None or self._session_pid != os.getpid():
+                    self._session = self._build_session()
+                    self._session_pid = os.getpid()
+        return self._session
+
+    def _build_session(self) -> requests.Session:
+        retry = Retry(
+            total=self.retries,
+            backoff_factor=self.backoff_factor,
+            status_forcelist=(500, 502, 503, 504),
+            allowed_methods=frozenset(['GET', 'HEAD']),
+            raise_on_status=False
+        )
+        adapter = HTTPAdapter(pool_connections=self.pool_size, pool_maxsize=self.pool_size, max_retries=retry)
+
+        session = requests.Session()
+        session.mount('https://', adapter)
+        session.mount('http://', adapter)
+        session.headers['User-Agent'] = self.user_agent
+        return session
+
+    def breaker(self, host: str) -> CircuitBreaker:
+        breaker = self._breakers.get(host)
+        if breaker is None:
+            with self._lock:
+                breaker = self._breakers.setdefault(host, CircuitBreaker(self.failure_threshold, self.reset_timeout))
+        return breaker
+
+    def get(self, url: str, **kwargs) -> requests.Response:
+        """
+        Effectue une requête GET vers un service externe
+
+        Raises:
+            UpstreamUnavailable: Si le disjoncteur de l'hôte est ouvert
+            requests.RequestException: Si l'appel échoue malgré les réessais
+        """
+        host = urlsplit(url).netloc
+        breaker = self.breaker(host)
+        if not breaker.allow():
+            raise UpstreamUnavailable(f"Service externe indisponible: {host}")
+
+        kwargs.setdefault('timeout', self.timeouts.get(host, self.default_timeout))
+        start = time.perf_counter()
+        recorded = False
+        try:
+            try:
+                response = self.session.get(url, **kwargs)
+            except requests.RequestException as e:
+                UPSTREAM_REQUEST_DURATION.observe(time.perf_counter() - start, host, 'exception')
+                breaker.record_failure()
+                recorded = True
+                logging.error(f"Erreur lors de l'appel à {host}: {str(e)}")
+                raise
+
+            UPSTREAM_REQUEST_DURATION.observe(time.perf_counter() - start, host, f"{response.status_code // 100}xx")
+            if response.status_code >= 500:
+                breaker.record_failure()
+            else:
+                breaker.record_success()
+            recorded = True
+            return response
+        finally:
+            # Toute autre exception compte comme un échec : l'appel d'essai du disjoncteur
+            # est libéré, sinon le circuit resterait ouvert indéfiniment
+            if not recorded:
+                breaker.record_failure()
+
+    def stats(self) -> Dict[str, Dict[str, object]]:
+        """État des disjoncteurs par hôte"""
+        return {host: {'state': breaker.state, 'failures': breaker.failures} for host, breaker in self._breakers.items()}
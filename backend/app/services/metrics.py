@@ -0,0 +1,271 @@
+"""
+Métriques du serveur au format texte Prometheus (endpoint /metrics)
+
+Histogrammes de latence par endpoint, par hôte externe et par requête SQL,
+nombre de requêtes SQL par requête HTTP, et état des caches et des pools lu à la
+demande dans leurs méthodes stats(). Les valeurs sont propres au processus :
+avec plusieurs workers gunicorn, chaque worker expose les siennes.
+
+/metrics et /api/monitoring/* exigent l'en-tête Authorization: Bearer <METRICS_TOKEN> ;
+sans METRICS_TOKEN, ils ne répondent que si METRICS_PUBLIC est actif.
+"""
+import bisect
+import hmac
+import threading
+import time
+from contextlib import contextmanager
+from typing import Callable, Dict, Iterable, List, Optional, Tuple
+
+from flask import current_app, g, has_app_context, request
+from sqlalchemy import event
+from sqlalchemy.engine import Engine
+
+# Bornes en secondes, de 1 ms à 10 s
+LATENCY_BUCKETS = (0.001, 0.0025, 0.005, 0.01, 0.025, 0.05, 0.1, 0.25, 0.5, 1, 2.5, 5, 10)
+COUNT_BUCKETS = (0, 1, 2, 3, 5, 10, 20, 50, 100)
+
+
+def _escape(value) -> str:
+    return str(value).replace('\\', '\\\\').replace('"', '\\"').replace('\n', '\\n')
+
+
+def _format_labels(labels: Dict[str, str]) -> str:
+    if not labels:
+        return ''
+    return '{' + ','.join(f'{name}="{_escape(value)}"' for name, value in labels.items()) + '}'
+
+
+def _format_value(value: float) -> str:
+    if value == float('inf'):
+        return '+Inf'
+    return repr(float(value)) if isinstance(value, float) else str(value)
+
+
+class Histogram:
+    """Histogramme cumulatif à étiquettes (buckets, somme et nombre d'observations)"""
+
+    def __init__(self, name: str, documentation: str, labelnames: Tuple[str, ...] = (),
+                 buckets: Tuple[float, ...] = LATENCY_BUCKETS):
+        self.name = name
+        self.documentation = documentation
+        self.labelnames = labelnames
+        self.buckets = tuple(buckets)
+        self._series: Dict[Tuple[str, ...], List[float]] = {}
+        self._lock = threading.Lock()
+
+    def observe(self, value: float, *labelvalues: str) -> None:
+        # Une série = compteurs par bucket (le dernier pour +Inf), puis somme et nombre
+        index = bisect.bisect_left(self.buckets, value)
+        with self._lock:
+            series = self._series.get(labelvalues)
+            if series is None:
+                series = self._series[labelvalues] = [0] * (len(self.buckets) + 1) + [0.0, 0]
+            series[index] += 1
+            series[-2] += value
+            series[-1] += 1
+
+    @contextmanager
+    def time(self, *labelvalues: str):
+        """Mesure la durée du bloc"""
+        start = time.perf_counter()
+        try:
+            yield
+        finally:
+            self.observe(time.perf_counter() - start, *labelvalues)
+
+    def render(self) -> Iterable[str]:
+        yield f"# HELP {self.name} {self.documentation}"
+        yield f"# TYPE {self.name} histogram"
+        with self._lock:
+            series = {labels: list(values) for labels, values in self._series.items()}
+
+        for labelvalues, values in sorted(series.items()):
+            labels = dict(zip(self.labelnames, labelvalues))
+            cumulative = 0
+            for bound, count in zip(self.buckets + (float('inf'),), values):
+                cumulative += count
+                yield f"{self.name}_bucket{_format_labels({**labels, 'le': _format_value(bound)})} {cumulative}"
+            yield f"{self.name}_sum{_format_labels(labels)} {_format_value(values[-2])}"
+            yield f"{self.name}_count{_format_labels(labels)} {values[-1]}"
+
+
+class MetricsRegistry:
+    """Histogrammes du processus et sources de valeurs instantanées (méthodes stats())"""
+
+    def __init__(self):
+        self.enabled = True
+        self.histograms: List[Histogram] = []
+        self.collectors: List[Tuple[str, Callable[[], Dict], Optional[str]]] = []
+
+    def histogram(self, *args, **kwargs) -> Histogram:
+        histogram = Histogram(*args, **kwargs)
+        self.histograms.append(histogram)
+        return histogram
+
+    def register_stats(self, component: str, stats: Callable[[], Dict], label: Optional[str] = None) -> None:
+        """
+        Expose chaque valeur numérique renvoyée par stats() comme une jauge velib_<component>_<clé>
+
+        Avec label, stats() renvoie un dictionnaire par valeur de l'étiquette (par exemple par hôte).
+        Les valeurs textuelles deviennent une série velib_<component>_<clé>_info{<clé>="..."} 1.
+        """
+        self.collectors.append((component, stats, label))
+
+    def render(self) -> str:
+        lines = []
+        for histogram in self.histograms:
+            lines.extend(histogram.render())
+
+        # Regrouper les séries par nom : une seule ligne TYPE par métrique
+        families: Dict[str, List[Tuple[Dict[str, str], float]]] = {}
+        for component, stats, label in self.collectors:
+            try:
+                values = stats()
+            except Exception as e:
+                lines.append(f"# velib_{component} indisponible : {str(e)}")
+                continue
+
+            groups = values.items() if label else [(None, values)]
+            for label_value, group in groups:
+                labels = {label: label_value} if label else {}
+                for key, value in group.items():
+                    name = f"velib_{component}_{key}".replace('-', '_')
+                    if isinstance(value, str):
+                        families.setdefault(f"{name}_info", []).append(({**labels, key: value}, 1))
+                    elif isinstance(value, (int, float)):
+                        families.setdefault(name, []).append((labels, int(value) if isinstance(value, bool) else value))
+
+        for name, samples in families.items():
+            lines.append(f"# TYPE {name} gauge")
+            lines.extend(f"{name}{_format_labels(labels)} {_format_value(value)}" for labels, value in samples)
+        return '\n'.join(lines) + '\n'
+
+
+registry = MetricsRegistry()
+
+HTTP_REQUEST_DURATION = registry.histogram(
+    'velib_http_request_duration_seconds', "Durée des requêtes HTTP par endpoint",
+    ('blueprint', 'endpoint', 'method', 'status')
+)
+HTTP_REQUEST_DB_QUERIES = registry.histogram(
+    'velib_http_request_db_queries', "Nombre de requêtes SQL par requête HTTP",
+    ('endpoint',), COUNT_BUCKETS
+)
+HTTP_REQUEST_DB_DURATION = registry.histogram(
+    'velib_http_request_db_duration_seconds', "Temps passé en requêtes SQL par requête HTTP", ('endpoint',)
+)
+DB_QUERY_DURATION = registry.histogram(
+    'velib_db_query_duration_seconds', "Durée des requêtes SQL par type d'instruction", ('statement',)
+)
+DB_COMMIT_DURATION = registry.histogram(
+    'velib_db_commit_duration_seconds', "Durée des commits par opération", ('operation',)
+)
+UPSTREAM_REQUEST_DURATION = registry.histogram(
+    'velib_upstream_request_duration_seconds', "Durée des appels aux services externes par hôte",
+    ('host', 'outcome')
+)
+AUTH_DURATION = registry.histogram(
+    'velib_auth_duration_seconds', "Durée de la vérification du token (token_required)", ('outcome',)
+)
+# Connexions au flux de disponibilité servies hors de Flask (create_asgi_app), de quelques secondes à quelques heures
+STREAM_CONNECTION_DURATION = registry.histogram(
+    'velib_stream_connection_duration_seconds', "Durée des connexions au flux de disponibilité (ASGI) par statut",
+    ('status',), (1, 10, 60, 300, 900, 3600, 14400)
+)
+
+
+def _before_request() -> None:
+    g.metrics_start = time.perf_counter()
+    g.metrics_db_queries = 0
+    g.metrics_db_time = 0.0
+
+
+def _after_request(response):
+    _observe_request(response.status_code)
+    return response
+
+
+def _teardown_request(exception) -> None:
+    # Requête interrompue par une exception avant after_request : comptée en erreur 500
+    if exception is not None:
+        _observe_request(500)
+
+
+def _observe_request(status_code: int) -> None:
+    start = g.pop('metrics_start', None)
+    if start is not None:
+        endpoint = request.endpoint or 'not_found'
+        HTTP_REQUEST_DURATION.observe(
+            time.perf_counter() - start,
+            request.blueprint or '', endpoint, request.method, str(status_code)
+        )
+        HTTP_REQUEST_DB_QUERIES.observe(g.get('metrics_db_queries', 0), endpoint)
+        HTTP_REQUEST_DB_DURATION.observe(g.get('metrics_db_time', 0.0), endpoint)
+
+
+def authorized() -> bool:
+    """Indique si la requête courante peut lire /metrics et /api/monitoring"""
+    token = current_app.config.get('METRICS_TOKEN')
+    if not token:
+        return current_app.config.get('METRICS_PUBLIC', False)
+    header = request.headers.get('Authorization', '')
+    return header.startswith('Bearer ') and hmac.compare_digest(header[7:].encode(), token.encode())
+
+
+def _before_cursor_execute(conn, cursor, statement, parameters, context, executemany):
+    conn.info.setdefault('metrics_query_start', []).append(time.perf_counter())
+
+
+def _after_cursor_execute(conn, cursor, statement, parameters, context, executemany):
+    _observe_query(conn, statement)
+
+
+def _handle_error(exception_context) -> None:
+    # Requête en échec : after_cursor_execute n'est pas appelé, retirer sa date de début de la pile
+    if exception_context.connection is not None and exception_context.statement is not None:
+        _observe_query(exception_context.connection, exception_context.statement)
+
+
+def _observe_query(conn, statement: str) -> None:
+    starts = conn.info.get('metrics_query_start')
+    if not starts:
+        return
+    duration = time.perf_counter() - starts.pop()
+    DB_QUERY_DURATION.observe(duration, (statement.split(None, 1) or ['?'])[0].upper())
+
+    # Cumul par requête HTTP (les threads de fond ont un contexte d'application sans requête)
+    if has_app_context() and 'metrics_db_queries' in g:
+        g.metrics_db_queries += 1
+        g.metrics_db_time += duration
+
+
+def init_app(app) -> None:
+    """Installe la mesure des requêtes HTTP et SQL et déclare les stats() exposées, si METRICS_ENABLED est actif"""
+    # Import local : les extensions importent les services, dont ce module
+    from ..extensions import (db, db_pool, geocode_cache, password_hasher, response_compressor, search_history,
+                              station_catalogue, station_status, status_stream, token_cache, upstream)
+
+    registry.enabled = app.config.get('METRICS_ENABLED', True)
+    if not registry.enabled:
+        return
+
+    app.before_request(_before_request)
+    app.after_request(_after_request)
+    app.teardown_request(_teardown_request)
+    if not event.contains(Engine, 'before_cursor_execute', _before_cursor_execute):
+        event.listen(Engine, 'before_cursor_execute', _before_cursor_execute)
+        event.listen(Engine, 'after_cursor_execute', _after_cursor_execute)
+        event.listen(Engine, 'handle_error', _handle_error)
+
+    registry.collectors = []
+    registry.register_stats('station_catalogue', station_catalogue.stats)
+    registry.register_stats('station_status', station_status.stats)
+    registry.register_stats('status_stream', status_stream.stats)
+    registry.register_stats('geocode_cache', geocode_cache.stats)
+    registry.register_stats('token_cache', token_cache.stats)
+    registry.register_stats('search_history', search_history.stats)
+    registry.register_stats('password_hasher', password_hasher.stats)
+    registry.register_stats('compression', response_compressor.stats)
+    registry.register_stats('upstream_breaker', upstream.stats, label='host')
+    # Appelé pendant la requête /metrics, donc dans un contexte d'application
+    registry.register_stats('db_pool', lambda: db_pool.stats(db.engine))
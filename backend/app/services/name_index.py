@@ -0,0 +1,149 @@
+"""
+Index des noms de stations pour la recherche approchée
+
+Les noms sont normalisés (minuscules, sans accents ni ponctuation) et découpés en
+trigrammes une seule fois par rafraîchissement du catalogue. Une recherche ne
+parcourt ensuite que les stations qui partagent au moins un trigramme avec le terme.
+"""
+import bisect
+import heapq
+import re
+import unicodedata
+from collections import Counter
+from typing import Dict, List, Optional, Sequence, Tuple
+
+_NON_ALNUM = re.compile(r'[^a-z0-9]+')
+
+
+def normalize(text: Optional[str]) -> str:
+    """Met un texte en minuscules, retire les accents et remplace la ponctuation par des espaces"""
+    if not text:
+        return ''
+    decomposed = unicodedata.normalize('NFKD', text)
+    folded = ''.join(char for char in decomposed if not unicodedata.combining(char)).lower()
+    return _NON_ALNUM.sub(' ', folded).strip()
+
+
+def trigrams(normalized: str) -> frozenset:
+    """Trigrammes d'un texte normalisé, bornés par des espaces pour marquer le début et la fin"""
+    padded = f" {normalized} "
+    return frozenset(padded[i:i + 3] for i in range(len(padded) - 2))
+
+
+class NameIndex:
+    """Index inversé trigramme -> positions des noms dans la liste du catalogue"""
+
+    def __init__(self, names: Sequence[Optional[str]]):
+        self.names = tuple(names)
+        self.normalized = [normalize(name) for name in self.names]
+        self._trigrams = [trigrams(name) for name in self.normalized]
+
+        self.postings: Dict[str, List[int]] = {}
+        for position, grams in enumerate(self._trigrams):
+            for gram in grams:
+                self.postings.setdefault(gram, []).append(position)
+
+        # Noms concaténés pour chercher les termes trop courts pour avoir des trigrammes
+        self._joined = '\n'.join(self.normalized)
+        self._offsets = []
+        offset = 0
+        for name in self.normalized:
+            self._offsets.append(offset)
+            offset += len(name) + 1
+
+        # Tableaux triés pour l'autocomplétion : noms complets, puis noms à partir de chaque mot
+        self._sorted_names = sorted((name, position) for position, name in enumerate(self.normalized) if name)
+        self._sorted_words = sorted(
+            (name[index + 1:], position)
+            for position, name in enumerate(self.normalized)
+            for index, char in enumerate(name) if char == ' '
+        )
+
+    @classmethod
+    def build(cls, names: Sequence[Optional[str]], previous: Optional['NameIndex'] = None) -> 'NameIndex':
+        """Réutilise l'index précédent si aucun nom de station n'a changé"""
+        names = tuple(names)
+        if previous is not None and previous.names == names:
+            return previous
+        return cls(names)
+
+    def search(self, query: str, k: int = 5) -> List[Tuple[int, float, bool]]:
+        """
+        Recherche les noms les plus proches d'un terme
+
+        Les noms qui contiennent le terme normalisé sont classés en premier (et
+        d'autant mieux que le terme débute le nom ou un mot), puis viennent les noms
+        proches au sens du coefficient de Dice sur les trigrammes, ce qui tolère les
+        fautes de frappe.
+
+        Returns:
+            List[Tuple[int, float, bool]]: (position, score, contient_le_terme) par score décroissant
+        """
+        normalized_query = normalize(query)
+        if not normalized_query or k <= 0:
+            return []
+
+        query_grams = trigrams(normalized_query)
+        shared = Counter()
+        for gram in query_grams:
+            shared.update(self.postings.get(gram, ()))
+
+        # Un nom qui contient le terme partage au moins tous ses trigrammes internes
+        min_shared_if_contained = len(query_grams) - 2
+
+        # Un terme très court n'a pas de trigramme interne : on cherche ses occurrences
+        candidates = shared if len(normalized_query) >= 3 else self._occurrences(normalized_query)
+
+        scored = []
+        for position in candidates:
+            name = self.normalized[position]
+            score = 2.0 * shared[position] / (len(query_grams) + len(self._trigrams[position]))
+            contained = shared[position] >= min_shared_if_contained and normalized_query in name
+            if contained:
+                score += 1.0
+                if name.startswith(normalized_query) or f" {normalized_query}" in name:
+                    score += 0.5
+            elif score == 0:
+                continue
+            # À score égal, l'ordre du flux départage les stations
+            scored.append((score, -position, contained))
+
+        return [(-neg_position, score, contained) for score, neg_position, contained in heapq.nlargest(k, scored)]
+
+    def complete(self, prefix: str, limit: int = 8) -> List[int]:
+        """
+        Complète un début de saisie par recherche dichotomique dans les tableaux triés
+
+        Les noms qui commencent par le terme passent avant ceux dont un mot commence par le terme.
+
+        Returns:
+            List[int]: Positions des noms complétés, sans doublon
+        """
+        normalized_prefix = normalize(prefix)
+        if not normalized_prefix or limit <= 0:
+            return []
+
+        positions: List[int] = []
+        seen = set()
+        for sorted_keys in (self._sorted_names, self._sorted_words):
+            index = bisect.bisect_left(sorted_keys, (normalized_prefix, -1))
+            while index < len(sorted_keys) and len(positions) < limit:
+                key, position = sorted_keys[index]
+                if not key.startswith(normalized_prefix):
+                    break
+                if position not in seen:
+                    seen.add(position)
+                    positions.append(position)
+                index += 1
+        return positions
+
+    def _occurrences(self, normalized_query: str) -> List[int]:
+        """Positions des noms contenant le terme, trouvées dans la chaîne concaténée"""
+        positions = []
+        start = self._joined.find(normalized_query)
+        while start != -1:
+            position = bisect.bisect_right(self._offsets, start) - 1
+            positions.append(position)
+            # Passer directement au nom suivant
+            start = self._joined.find(normalized_query, self._offsets[position] + len(self.normalized[position]) + 1)
+        return positions
@@ -0,0 +1,51 @@
+"""
+Pagination par curseur (keyset) sur (created_at, id)
+
+Le curseur est une chaîne opaque qui désigne la dernière ligne de la page
+précédente. La page suivante est lue par un parcours d'intervalle de l'index
+(utilisateur, date) qui démarre à la date du curseur, au lieu d'un OFFSET qui
+relit toutes les lignes des pages précédentes. La colonne de date est NOT NULL
+(migration 0003) : aucune condition IS NULL n'empêche ce parcours.
+"""
+import base64
+from datetime import datetime
+from typing import Tuple
+
+from sqlalchemy import and_, or_
+
+
+def encode_cursor(created_at: datetime, row_id: int) -> str:
+    """Curseur de la ligne (created_at, id)"""
+    raw = f"{created_at.isoformat()}|{row_id}"
+    return base64.urlsafe_b64encode(raw.encode()).decode().rstrip('=')
+
+
+def decode_cursor(cursor: str) -> Tuple[datetime, int]:
+    """
+    Décode un curseur produit par encode_cursor
+
+    Raises:
+        ValueError: Si le curseur est mal formé
+    """
+    try:
+        raw = base64.urlsafe_b64decode(cursor + '=' * (-len(cursor) % 4)).decode()
+        created_at, row_id = raw.rsplit('|', 1)
+        return datetime.fromisoformat(created_at), int(row_id)
+    except (ValueError, UnicodeDecodeError) as e:
+        raise ValueError(f"Curseur invalide: {cursor}") from e
+
+
+def after_cursor(created_at_column, id_column, cursor: str):
+    """
+    Condition SQL des lignes situées après le curseur dans l'ordre (created_at DESC, id DESC)
+
+    Raises:
+        ValueError: Si le curseur est mal formé
+    """
+    created_at, row_id = decode_cursor(cursor)
+    # Équivalent à (created_at, id) < (:created_at, :id) ; la borne created_at <= :created_at
+    # est une condition d'intervalle sur l'index, que MySQL et SQLite utilisent comme point de départ
+    return and_(
+        created_at_column <= created_at,
+        or_(created_at_column < created_at, id_column < row_id)
+    )
@@ -0,0 +1,109 @@
+"""
+Hachage et vérification des mots de passe bcrypt hors des threads de requête
+
+bcrypt libère le GIL pendant le calcul : un petit pool de threads dédié suffit à
+borner le nombre de hachages simultanés, de sorte qu'une rafale de connexions ne
+monopolise pas les CPU au détriment des autres endpoints. Au-delà de max_queue
+demandes en attente, les nouvelles demandes sont refusées (HasherBusy, 503).
+"""
+import os
+import threading
+from concurrent.futures import ThreadPoolExecutor, TimeoutError as FutureTimeout
+from typing import Dict
+
+import bcrypt
+
+
+class HasherBusy(RuntimeError):
+    """Levée lorsque la file d'attente des hachages est pleine ou que l'attente du résultat expire"""
+
+
+class PasswordHasher:
+    """Pool borné de threads bcrypt avec délestage quand la file est pleine"""
+
+    def __init__(self, rounds: int = 12, workers: int = 2, max_queue: int = 32, timeout: float = 10):
+        self.rounds = rounds
+        self.workers = workers
+        self.max_queue = max_queue
+        self.timeout = timeout
+        self._executor = None
+        self._executor_pid = None
+        self._slots = threading.BoundedSemaphore(workers + max_queue)
+        self._lock = threading.Lock()
+        self._counters = {'submitted': 0, 'rejected': 0, 'in_flight': 0}
+
+    def init_app(self, app) -> None:
+        """Lit le coût bcrypt, la taille du pool, la longueur de la file et le délai d'attente depuis la configuration"""
+        self.rounds = app.config.get('BCRYPT_ROUNDS', self.rounds)
+        self.workers = app.config.get('PASSWORD_HASH_WORKERS', self.workers)
+        self.max_queue = app.config.get('PASSWORD_HASH_QUEUE_SIZE', self.max_queue)
+        self.timeout = app.config.get('PASSWORD_HASH_TIMEOUT', self.timeout)
+        self._slots = threading.BoundedSemaphore(self.workers + self.max_queue)
+
+    def hash(self, password: str) -> str:
+        """
+        Hache un mot de passe avec le coût configuré
+
+        Raises:
+            HasherBusy: Si la file d'attente est pleine ou le délai d'attente dépassé
+        """
+        salt = bcrypt.gensalt(rounds=self.rounds)
+        return self._run(bcrypt.hashpw, password.encode('utf-8'), salt).decode('utf-8')
+
+    def verify(self, password: str, hashed: str) -> bool:
+        """
+        Vérifie un mot de passe (le coût est celui enregistré dans le hash)
+
+        Raises:
+            HasherBusy: Si la file d'attente est pleine ou le délai d'attente dépassé
+        """
+        return self._run(bcrypt.checkpw, password.encode('utf-8'), hashed.encode('utf-8'))
+
+    def stats(self) -> Dict[str, int]:
+        """Taille du pool, profondeur de la file d'attente et nombre de demandes refusées"""
+        with self._lock:
+            stats = dict(self._counters)
+        stats['workers'] = self.workers
+        stats['queued'] = max(stats['in_flight'] - self.workers, 0)
+        stats['max_queue'] = self.max_queue
+        return stats
+
+    @property
+    def executor(self) -> ThreadPoolExecutor:
+        """Pool du processus courant (recréé après un fork : les threads ne sont pas hérités)"""
+        if self._executor is None or self._executor_pid != os.getpid():
+            with self._lock:
+                if self._executor is None or self._executor_pid != os.getpid():
+                    self._executor = ThreadPoolExecutor(max_workers=self.workers, thread_name_prefix='bcrypt')
+                    self._executor_pid = os.getpid()
+        return self._executor
+
+    def _run(self, function, *args):
+        if not self._slots.acquire(blocking=False):
+            with self._lock:
+                self._counters['rejected'] += 1
+            raise HasherBusy("File d'attente des mots de passe pleine")
+
+        with self._lock:
+            self._counters['submitted'] += 1
+            self._counters['in_flight'] += 1
+        try:
+            future = self.executor.submit(function, *args)
+            future.add_done_callback(self._release)
+        except BaseException:
+            self._release(None)
+            raise
+
+        # Le thread de requête attend sans consommer de CPU ; la place dans la file est
+        # rendue à la fin du calcul, même si l'attente expire avant
+        try:
+            return future.result(timeout=self.timeout)
+        except FutureTimeout:
+            with self._lock:
+                self._counters['rejected'] += 1
+            raise HasherBusy("Délai de hachage du mot de passe dépassé")
+
+    def _release(self, _future) -> None:
+        with self._lock:
+            self._counters['in_flight'] -= 1
+        self._slots.release()
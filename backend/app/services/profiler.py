@@ -0,0 +1,212 @@
+"""
+Profilage à la demande d'une requête (échantillonnage de piles et requêtes SQL)
+
+Une requête est profilée si elle porte l'en-tête X-Profile-Token égal à
+PROFILE_ADMIN_TOKEN, ou si elle est tirée au sort (PROFILE_SAMPLE_RATE). Un thread
+relève les piles d'appels toutes les PROFILE_INTERVAL_MS millisecondes pendant la
+requête ; à la fin, deux fichiers sont écrits dans PROFILE_DIR :
+
+- <id>.folded : piles repliées (une ligne « cadre;cadre;... nombre »), lisibles par
+  flamegraph.pl, speedscope ou inferno ;
+- <id>.json : route, durée, statut et requêtes SQL émises avec leur durée.
+
+Seule la pile du thread de la requête est relevée : les autres requêtes servies
+par le processus n'apparaissent pas dans le profil (le géocodage spéculatif, qui
+s'exécute sur un autre thread, n'y figure que par l'attente de son résultat).
+Les paramètres des requêtes SQL ne sont pas enregistrés (mots de passe hachés,
+données personnelles), ni le message des erreurs SQL, qui peut les reprendre.
+Les fichiers sont écrits par un thread à part, hors du temps de la requête.
+Un seul profil est relevé à la fois.
+"""
+import hmac
+import json
+import os
+import random
+import re
+import sys
+import threading
+import time
+from collections import Counter
+from datetime import datetime
+from typing import Dict, List, Optional
+
+from flask import g, has_app_context, request
+from sqlalchemy import event
+from sqlalchemy.engine import Engine
+
+
+class StackSampler(threading.Thread):
+    """Thread qui relève périodiquement la pile du thread de la requête"""
+
+    def __init__(self, interval: float, request_thread_id: int):
+        super().__init__(name='profiler', daemon=True)
+        self.interval = interval
+        self.request_thread_id = request_thread_id
+        self.stacks: Counter = Counter()
+        self.samples = 0
+        self._stop_event = threading.Event()
+
+    def run(self) -> None:
+        while not self._stop_event.wait(self.interval):
+            self.sample()
+
+    def stop(self) -> None:
+        self._stop_event.set()
+        self.join()
+
+    def sample(self) -> None:
+        frame = sys._current_frames().get(self.request_thread_id)
+        if frame is None:
+            return
+
+        stack = []
+        while frame is not None:
+            code = frame.f_code
+            stack.append(f"{code.co_name} ({os.path.basename(code.co_filename)}:{code.co_firstlineno})")
+            frame = frame.f_back
+
+        self.stacks[';'.join(reversed(stack))] += 1
+        self.samples += 1
+
+
+class RequestProfiler:
+    """Déclenche le profilage des requêtes et écrit les graphes de flammes"""
+
+    header = 'X-Profile-Token'
+
+    def __init__(self):
+        self.admin_token: Optional[str] = None
+        self.sample_rate = 0.0
+        self.interval = 0.005
+        self.min_duration = 0.0
+        self.output_dir: Optional[str] = None
+        self._busy = threading.Lock()
+
+    def init_app(self, app) -> None:
+        """Lit le jeton d'administration, le taux d'échantillonnage et le dossier de sortie depuis la configuration"""
+        self.admin_token = app.config.get('PROFILE_ADMIN_TOKEN')
+        self.sample_rate = app.config.get('PROFILE_SAMPLE_RATE', self.sample_rate)
+        self.interval = app.config.get('PROFILE_INTERVAL_MS', self.interval * 1000) / 1000
+        self.min_duration = app.config.get('PROFILE_MIN_DURATION_MS', self.min_duration * 1000) / 1000
+        self.output_dir = app.config.get('PROFILE_DIR') or os.path.join(app.instance_path, 'profiles')
+
+        if not self.admin_token and self.sample_rate <= 0:
+            return
+
+        app.before_request(self._before_request)
+        app.after_request(self._after_request)
+        app.teardown_request(self._teardown_request)
+        if not event.contains(Engine, 'before_cursor_execute', _before_cursor_execute):
+            event.listen(Engine, 'before_cursor_execute', _before_cursor_execute)
+            event.listen(Engine, 'after_cursor_execute', _after_cursor_execute)
+            event.listen(Engine, 'handle_error', _handle_error)
+
+    def requested(self) -> bool:
+        """Indique si la requête courante doit être profilée"""
+        token = request.headers.get(self.header)
+        # compare_digest n'accepte que des str ASCII : comparer les octets (en-tête non ASCII)
+        if token and self.admin_token and hmac.compare_digest(token.encode(), self.admin_token.encode()):
+            return True
+        return self.sample_rate > 0 and random.random() < self.sample_rate
+
+    def _before_request(self) -> None:
+        if not self.requested() or not self._busy.acquire(blocking=False):
+            return
+
+        sampler = StackSampler(self.interval, threading.get_ident())
+        g.profile = {'sampler': sampler, 'start': time.perf_counter(), 'sql': []}
+        sampler.start()
+
+    def _after_request(self, response):
+        profile = self._finish()
+        if profile is not None:
+            duration = time.perf_counter() - profile['start']
+            if duration >= self.min_duration:
+                response.headers['X-Profile-Id'] = self._save(profile, duration, response.status_code)
+        return response
+
+    def _teardown_request(self, _exception) -> None:
+        # Requête interrompue par une exception avant after_request
+        self._finish()
+
+    def _finish(self) -> Optional[Dict]:
+        profile = g.pop('profile', None)
+        if profile is None:
+            return None
+        try:
+            profile['sampler'].stop()
+        finally:
+            self._busy.release()
+        return profile
+
+    def _save(self, profile: Dict, duration: float, status_code: int) -> str:
+        """Lance l'écriture du profil en arrière-plan et renvoie son identifiant"""
+        sampler = profile['sampler']
+        endpoint = request.endpoint or 'not_found'
+        profile_id = f"{datetime.utcnow():%Y%m%dT%H%M%S%f}_{re.sub(r'[^A-Za-z0-9_.-]', '_', endpoint)}_{int(duration * 1000)}ms"
+        summary = {
+            'endpoint': endpoint,
+            'method': request.method,
+            'path': request.path,
+            'status': status_code,
+            'duration_ms': round(duration * 1000, 3),
+            'interval_ms': round(self.interval * 1000, 3),
+            'samples': sampler.samples,
+            'sql': profile['sql']
+        }
+        threading.Thread(
+            target=self._write, args=(profile_id, sampler.stacks, summary), name='profiler-writer', daemon=True
+        ).start()
+        return profile_id
+
+    def _write(self, profile_id: str, stacks: Counter, summary: Dict) -> None:
+        try:
+            os.makedirs(self.output_dir, exist_ok=True)
+
+            with open(os.path.join(self.output_dir, f"{profile_id}.folded"), 'w', encoding='utf-8') as f:
+                for stack, count in stacks.most_common():
+                    f.write(f"{stack} {count}\n")
+
+            with open(os.path.join(self.output_dir, f"{profile_id}.json"), 'w', encoding='utf-8') as f:
+                json.dump(summary, f, ensure_ascii=False, indent=2)
+        except OSError as e:
+            print(f"[ERROR] Profil {profile_id} non enregistré : {str(e)}")
+
+
+def _profile_sql() -> Optional[List[Dict]]:
+    if has_app_context():
+        profile = g.get('profile')
+        if profile is not None:
+            return profile['sql']
+    return None
+
+
+def _before_cursor_execute(conn, cursor, statement, parameters, context, executemany):
+    if _profile_sql() is not None:
+        conn.info.setdefault('profile_query_start', []).append(time.perf_counter())
+
+
+def _after_cursor_execute(conn, cursor, statement, parameters, context, executemany):
+    _record_query(conn, statement)
+
+
+def _handle_error(exception_context) -> None:
+    # Requête en échec : after_cursor_execute n'est pas appelé, retirer sa date de début de la pile
+    if exception_context.connection is not None and exception_context.statement is not None:
+        # Seul le type de l'erreur est gardé : le message du pilote peut citer les valeurs
+        _record_query(exception_context.connection, exception_context.statement,
+                      type(exception_context.original_exception).__name__)
+
+
+def _record_query(conn, statement: str, error: Optional[str] = None) -> None:
+    queries = _profile_sql()
+    starts = conn.info.get('profile_query_start')
+    if queries is None or not starts:
+        return
+    query = {
+        'statement': statement,
+        'duration_ms': round((time.perf_counter() - starts.pop()) * 1000, 3)
+    }
+    if error is not None:
+        query['error'] = error
+    queries.append(query)
@@ -1,5 +1,7 @@
 from sqlalchemy.exc import SQLAlchemyError
-from typing import Tuple, Any, List, Dict
+from typing import Tuple, Any, List, Dict, Optional
+from datetime import datetime
+from flask import current_app
 from ..extensions import db
 import logging
 from ..models.reservation_model import Reservation
@@ -7,38 +9,75 @@ from ..models.user_model import User
 from ..models.velo_model import Velo
 from ..models.station_model import Station
 from ..models.reservation_vue_model import ReservationVue
+from .metrics import DB_COMMIT_DURATION
+from .pagination import after_cursor, encode_cursor
 
 class ReservationService:
     """Service pour gérer les réservations"""
 
     @staticmethod
-    def get_order(client_id: int) -> Tuple[bool, str, List[Dict[str, Any]], int]:
+    def get_order(client_id: int, cursor: Optional[str] = None, limit: Optional[int] = None,
+                  since: Optional[str] = None) -> Tuple[bool, str, Dict[str, Any], int]:
         """
-        Récupère les réservations d'un client avec toutes les informations associées (station, velo)
+        Récupère une page des réservations d'un client avec toutes les informations associées (station, velo),
+        des plus récentes aux plus anciennes
 
         Args:
             client_id (int): ID du client
+            cursor (Optional[str]): Curseur renvoyé par la page précédente (None pour la première page)
+            limit (Optional[int]): Nombre de réservations par page
+            since (Optional[str]): Date ISO 8601 ; seules les réservations créées après sont renvoyées
 
         Returns:
-            Tuple[bool, str, List[Dict[str, Any]], int]: (succès, message, données, code_statut)
+            Tuple[bool, str, Dict[str, Any], int]: (succès, message, {'items': [...], 'next_cursor': str ou None}, code_statut)
         """
         try:
             # Validation de l'ID client
             if not client_id or not isinstance(client_id, int):
                 return False, "ID client invalide", {"error": "L'ID client doit être un entier valide"}, 400
-                
-            # Utilisation du modèle ORM de la vue pour récupérer les réservations avec les détails complets
-            reservations = ReservationVue.query.filter_by(client_id=client_id).order_by(ReservationVue.create_time.desc()).all()
-            
-            # Conversion en dictionnaire
-            reservations_list = [reservation.to_dict() for reservation in reservations]
+
+            max_limit = current_app.config['RESERVATION_HISTORY_MAX_PAGE_SIZE']
+            if limit is None:
+                limit = current_app.config['RESERVATION_HISTORY_PAGE_SIZE']
+            if limit < 1 or limit > max_limit:
+                return False, "Paramètre invalide", {"error": f"Le paramètre 'limit' doit être compris entre 1 et {max_limit}"}, 400
+
+            since_date = None
+            if since:
+                try:
+                    since_date = datetime.fromisoformat(since)
+                except ValueError:
+                    return False, "Paramètre invalide", {"error": f"Date 'since' invalide (ISO 8601 attendu): {since}"}, 400
+            try:
+                query = ReservationService.history_query(client_id, limit, cursor, since_date)
+            except ValueError as e:
+                return False, "Paramètre invalide", {"error": str(e)}, 400
+
+            rows = query.all()
+            has_more = len(rows) > limit
+            rows = rows[:limit]
+
+            # Conversion en dictionnaire (mêmes clés que ReservationVue.to_dict)
+            reservations_list = [{
+                'id': row.id,
+                'confirmationID': row.confirmationID,
+                'id_velo': row.id_velo,
+                'client_id': client_id,
+                'create_time': row.create_time,
+                'station_id': row.station_id,
+                'lat': row.lat,
+                'lon': row.lon,
+                'station': row.station,
+                'type_velo': row.type
+            } for row in rows]
+            next_cursor = encode_cursor(rows[-1].create_time, rows[-1].id) if has_more else None
             
             message = "Réservations récupérées avec succès"
             if not reservations_list:
                 message = "Aucune réservation trouvée pour cet utilisateur"
                 
             # Retour standardisé avec message
-            return True, message, reservations_list, 200
+            return True, message, {'items': reservations_list, 'next_cursor': next_cursor}, 200
 
         except SQLAlchemyError as e:
             db.session.rollback()
@@ -52,6 +91,43 @@ class ReservationService:
             logging.error(error_msg)
             return False, "Erreur inattendue", {"error": str(e)}, 500
 
+    @staticmethod
+    def history_query(client_id: int, limit: int, cursor: Optional[str] = None, since: Optional[datetime] = None):
+        """
+        Requête d'une page de l'historique des réservations (vérifiée par python -m migrations check)
+
+        Args:
+            client_id (int): ID du client
+            limit (int): Nombre de réservations par page
+            cursor (Optional[str]): Curseur renvoyé par la page précédente
+            since (Optional[datetime]): Seules les réservations créées après cette date sont lues
+
+        Returns:
+            Query: limit + 1 lignes, pour savoir s'il existe une page suivante
+
+        Raises:
+            ValueError: Si le curseur est mal formé
+        """
+        # Seules les colonnes renvoyées sont lues, sous forme de tuples (pas d'objets ORM)
+        query = db.session.query(
+            ReservationVue.id,
+            ReservationVue.confirmationID,
+            ReservationVue.id_velo,
+            ReservationVue.create_time,
+            ReservationVue.station_id,
+            ReservationVue.lat,
+            ReservationVue.lon,
+            ReservationVue.station,
+            ReservationVue.type
+        ).filter(ReservationVue.client_id == client_id)
+
+        if since is not None:
+            query = query.filter(ReservationVue.create_time > since)
+        if cursor:
+            query = query.filter(after_cursor(ReservationVue.create_time, ReservationVue.id, cursor))
+
+        return query.order_by(ReservationVue.create_time.desc(), ReservationVue.id.desc()).limit(limit + 1)
+
     @staticmethod
     def create_reservation(reservation_data: Dict[str, Any]) -> Tuple[bool, str, Dict[str, Any], int]:
         """
@@ -86,7 +162,8 @@ class ReservationService:
             
             # Enregistrement de la réservation
             db.session.add(new_reservation)
-            db.session.commit()
+            with DB_COMMIT_DURATION.time('create_reservation'):
+                db.session.commit()
             
             return True, "Réservation créée avec succès", new_reservation.to_dict(), 201
             
@@ -0,0 +1,319 @@
+"""
+Enregistrement différé (write-behind) de l'historique des recherches
+
+Les lignes de la table recherches sont placées dans une file bornée propre au
+processus ; un thread les insère par lots (INSERT multi-lignes) toutes les
+flush_interval secondes ou dès que batch_size lignes sont en attente. Quand la
+file est pleine, l'appelant enregistre lui-même la recherche (contre-pression).
+
+Les lignes qui n'ont pas pu être écrites (base injoignable, arrêt du processus)
+sont ajoutées à un fichier de secours, rejoué au démarrage du thread d'écriture
+puis dès qu'un lot est de nouveau écrit (au plus une fois par replay_interval
+secondes), sans attendre le redémarrage du processus. Un lot refusé
+par la base est réessayé ligne par ligne : les lignes refusées une à une partent
+dans un fichier de rejets, qui n'est jamais rejoué automatiquement.
+"""
+import atexit
+import json
+import logging
+import os
+import queue
+import threading
+import time
+from datetime import datetime
+from typing import Any, Dict, List, Optional
+
+from sqlalchemy.exc import InterfaceError, OperationalError, SQLAlchemyError
+
+
+def _is_transient(error: SQLAlchemyError) -> bool:
+    """Erreur de connexion ou de disponibilité de la base (par opposition à une ligne refusée)"""
+    return isinstance(error, (OperationalError, InterfaceError)) or getattr(error, 'connection_invalidated', False)
+
+
+class SearchHistoryWriter:
+    """File d'attente des recherches à enregistrer, vidée par lots dans un thread de fond"""
+
+    # Délai minimal entre deux rejeux du fichier de secours après une panne (secondes)
+    replay_interval = 5.0
+
+    def __init__(self, enabled: bool = False, max_queue: int = 10000, batch_size: int = 200,
+                 flush_interval: float = 0.2, fallback_path: Optional[str] = None,
+                 dead_letter_path: Optional[str] = None):
+        self.enabled = enabled
+        self.max_queue = max_queue
+        self.batch_size = batch_size
+        self.flush_interval = flush_interval
+        self.fallback_path = fallback_path
+        self.dead_letter_path = dead_letter_path
+        self._app = None
+        self._queue: Optional[queue.Queue] = None
+        self._worker: Optional[threading.Thread] = None
+        self._worker_pid = None
+        self._last_replay = 0.0
+        self._stopping = threading.Event()
+        self._lock = threading.Lock()
+        self._counters = {'queued': 0, 'written': 0, 'batches': 0, 'rejected': 0, 'failures': 0, 'spilled': 0,
+                          'replayed': 0, 'dead_lettered': 0}
+
+    def init_app(self, app) -> None:
+        """Lit l'activation, la taille de la file, la taille des lots et les fichiers de secours et de rejets depuis la configuration"""
+        self._app = app
+        self.enabled = app.config.get('SEARCH_WRITE_BEHIND', self.enabled)
+        self.max_queue = app.config.get('SEARCH_WRITE_BEHIND_QUEUE_SIZE', self.max_queue)
+        self.batch_size = app.config.get('SEARCH_WRITE_BEHIND_BATCH_SIZE', self.batch_size)
+        self.flush_interval = app.config.get('SEARCH_WRITE_BEHIND_FLUSH_MS', self.flush_interval * 1000) / 1000
+        self.fallback_path = app.config.get('SEARCH_WRITE_BEHIND_FALLBACK_PATH') or os.path.join(
+            app.instance_path, 'search_history_pending.jsonl'
+        )
+        self.dead_letter_path = app.config.get('SEARCH_WRITE_BEHIND_DEAD_LETTER_PATH') or os.path.join(
+            app.instance_path, 'search_history_rejected.jsonl'
+        )
+        if self.enabled:
+            atexit.register(self.close)
+
+    def enqueue(self, row: Dict[str, Any]) -> bool:
+        """
+        Place une ligne de la table recherches dans la file
+
+        Returns:
+            bool: False si la file est pleine ou le mode différé désactivé (l'appelant écrit alors lui-même)
+        """
+        if not self.enabled or self._stopping.is_set():
+            return False
+
+        self._ensure_worker()
+        row.setdefault('created_at', datetime.utcnow())
+        try:
+            self._queue.put_nowait(row)
+        except queue.Full:
+            self._count('rejected')
+            return False
+
+        self._count('queued')
+        return True
+
+    def close(self, timeout: float = 5.0) -> None:
+        """Vide la file puis arrête le thread ; ce qui reste est écrit dans le fichier de secours"""
+        self._stopping.set()
+        worker = self._worker
+        if worker is not None and self._worker_pid == os.getpid():
+            worker.join(timeout)
+
+        remaining = self._drain(self.max_queue)
+        if remaining:
+            self._spill(remaining)
+
+    def stats(self) -> Dict[str, int]:
+        """Compteurs de la file d'écriture différée"""
+        with self._lock:
+            stats = dict(self._counters)
+        stats['pending'] = self._queue.qsize() if self._queue is not None else 0
+        return stats
+
+    def _count(self, counter: str, amount: int = 1) -> None:
+        with self._lock:
+            self._counters[counter] += amount
+
+    def _ensure_worker(self) -> None:
+        """Démarre le thread d'écriture du processus courant (une fois par processus, après un fork)"""
+        if self._worker_pid == os.getpid():
+            return
+        with self._lock:
+            if self._worker_pid == os.getpid():
+                return
+            self._queue = queue.Queue(maxsize=self.max_queue)
+            self._stopping.clear()
+            self._worker = threading.Thread(target=self._run, name='search-history-writer', daemon=True)
+            self._worker_pid = os.getpid()
+            self._worker.start()
+
+    def _run(self) -> None:
+        self._replay_safely()
+
+        while not self._stopping.is_set():
+            rows = self._collect()
+            # Base de nouveau disponible : rejouer les lignes mises de côté pendant la panne
+            if rows and self._flush_safely(rows) and self._replay_due():
+                self._replay_safely()
+
+        # Arrêt demandé : écrire ce qui reste avant de rendre la main à close()
+        rows = self._drain(self.max_queue)
+        if rows:
+            self._flush_safely(rows)
+
+    def _flush_safely(self, rows: List[Dict[str, Any]]) -> bool:
+        """Comme _flush, sans laisser une erreur inattendue arrêter le thread d'écriture"""
+        try:
+            return self._flush(rows)
+        except Exception as e:
+            logging.exception(f"Erreur inattendue lors de l'enregistrement différé de {len(rows)} recherches : {str(e)}")
+            self._dead_letter(rows, str(e))
+            return False
+
+    def _replay_due(self) -> bool:
+        """Un fichier de secours attend et le dernier rejeu date d'au moins replay_interval secondes"""
+        return (time.monotonic() - self._last_replay >= self.replay_interval
+                and bool(self.fallback_path) and os.path.exists(self.fallback_path))
+
+    def _replay_safely(self) -> None:
+        self._last_replay = time.monotonic()
+        try:
+            self._replay_fallback()
+        except Exception as e:
+            logging.exception(f"Erreur lors du rejeu du fichier de secours des recherches : {str(e)}")
+
+    def _collect(self) -> List[Dict[str, Any]]:
+        """Attend au plus flush_interval secondes et au plus batch_size lignes"""
+        rows = []
+        deadline = time.monotonic() + self.flush_interval
+        while len(rows) < self.batch_size:
+            remaining = deadline - time.monotonic()
+            if remaining <= 0:
+                break
+            try:
+                rows.append(self._queue.get(timeout=remaining))
+            except queue.Empty:
+                break
+        return rows
+
+    def _drain(self, limit: int) -> List[Dict[str, Any]]:
+        rows = []
+        if self._queue is None:
+            return rows
+        while len(rows) < limit:
+            try:
+                rows.append(self._queue.get_nowait())
+            except queue.Empty:
+                break
+        return rows
+
+    def _flush(self, rows: List[Dict[str, Any]]) -> bool:
+        """
+        Insère un lot en une seule requête
+
+        Si la base est injoignable, le lot part dans le fichier de secours. Si elle refuse
+        le lot, les lignes sont réessayées une à une et seules les lignes refusées partent
+        dans le fichier de rejets.
+
+        Returns:
+            bool: True si tout le lot a été écrit
+        """
+        error = self._insert(rows)
+        if error is None:
+            self._count('written', len(rows))
+            self._count('batches')
+            return True
+
+        self._count('failures')
+        logging.error(f"Erreur lors de l'enregistrement différé de {len(rows)} recherches : {str(error)}")
+        if _is_transient(error):
+            self._spill(rows)
+            return False
+
+        rejected = []
+        for index, row in enumerate(rows):
+            error = self._insert([row])
+            if error is None:
+                self._count('written')
+            elif _is_transient(error):
+                # La base est tombée pendant les essais : le reste sera rejoué plus tard
+                self._spill(rows[index:])
+                break
+            else:
+                rejected.append((row, str(error)))
+
+        for row, reason in rejected:
+            self._dead_letter([row], reason)
+        return False
+
+    def _insert(self, rows: List[Dict[str, Any]]) -> Optional[SQLAlchemyError]:
+        """INSERT multi-lignes dans sa propre transaction ; retourne l'erreur éventuelle"""
+        # Import local : les modèles dépendent de app.extensions, qui instancie cette file
+        from ..extensions import db
+        from ..models.recherche_model import Recherche
+
+        with self._app.app_context():
+            try:
+                db.session.execute(Recherche.__table__.insert(), rows)
+                db.session.commit()
+                return None
+            except SQLAlchemyError as e:
+                db.session.rollback()
+                return e
+            finally:
+                db.session.remove()
+
+    def _spill(self, rows: List[Dict[str, Any]]) -> None:
+        """Ajoute des lignes non écrites au fichier de secours, rejoué au prochain démarrage"""
+        if self._append(self.fallback_path, [json.dumps(self._serializable(row), default=str) for row in rows]):
+            self._count('spilled', len(rows))
+        else:
+            logging.error(f"Perte de {len(rows)} recherches, fichier de secours inaccessible")
+
+    def _dead_letter(self, rows: List[Any], reason: str) -> None:
+        """Met de côté des lignes refusées par la base, avec la raison du refus, pour examen manuel"""
+        lines = [json.dumps({'row': self._serializable(row) if isinstance(row, dict) else row, 'error': reason},
+                            default=str) for row in rows]
+        if self._append(self.dead_letter_path, lines):
+            self._count('dead_lettered', len(rows))
+            logging.error(f"{len(rows)} recherches refusées écrites dans {self.dead_letter_path} : {reason}")
+        else:
+            logging.error(f"Perte de {len(rows)} recherches refusées, fichier de rejets inaccessible : {reason}")
+
+    @staticmethod
+    def _serializable(row: Dict[str, Any]) -> Dict[str, Any]:
+        """Ligne prête pour json.dumps (date au format ISO 8601)"""
+        created_at = row.get('created_at')
+        if isinstance(created_at, datetime):
+            return dict(row, created_at=created_at.isoformat())
+        return row
+
+    @staticmethod
+    def _append(path: Optional[str], lines: List[str]) -> bool:
+        """Ajoute des lignes JSON (une par recherche) à un fichier et les force sur disque"""
+        if not path:
+            return False
+        try:
+            os.makedirs(os.path.dirname(path) or '.', exist_ok=True)
+            with open(path, 'a', encoding='utf-8') as f:
+                for line in lines:
+                    f.write(line + '\n')
+                f.flush()
+                os.fsync(f.fileno())
+            return True
+        except OSError as e:
+            logging.error(f"Fichier {path} inaccessible : {str(e)}")
+            return False
+
+    def _replay_fallback(self) -> None:
+        """Réinsère les recherches laissées dans le fichier de secours (panne de la base ou arrêt précédent)"""
+        if not self.fallback_path or not os.path.exists(self.fallback_path):
+            return
+
+        # Renommer d'abord : un seul processus rejoue le fichier, les nouveaux échecs repartent dans un fichier neuf
+        replay_path = f"{self.fallback_path}.{os.getpid()}"
+        try:
+            os.replace(self.fallback_path, replay_path)
+        except OSError:
+            return
+
+        rows = []
+        with open(replay_path, encoding='utf-8') as f:
+            for line in f:
+                if not line.strip():
+                    continue
+                try:
+                    row = json.loads(line)
+                    row['created_at'] = datetime.fromisoformat(row['created_at'])
+                    rows.append(row)
+                except (ValueError, TypeError, KeyError) as e:
+                    # Ligne illisible : mise de côté telle quelle plutôt que rejouée à chaque démarrage
+                    self._dead_letter([line.rstrip('\n')], f"Ligne illisible : {str(e)}")
+
+        # Les lignes refusées par la base vont dans le fichier de rejets ; celles d'une nouvelle
+        # panne repartent dans un nouveau fichier de secours
+        self._count('replayed', len(rows))
+        for start in range(0, len(rows), self.batch_size):
+            self._flush_safely(rows[start:start + self.batch_size])
+        os.remove(replay_path)
@@ -1,14 +1,27 @@
 from sqlalchemy.exc import SQLAlchemyError
 from typing import Tuple, Dict, Any
-from ..extensions import db
+from ..extensions import db, upstream, station_catalogue, geocode_cache, search_history
 from ..models.recherche_model import Recherche
 from ..models.station_model import Station
 from ..models.recherche_vue_model import RechercheVue  # Assuming RechercheVue is defined in recherche_vue_model
+from .metrics import DB_COMMIT_DURATION
+from .pagination import after_cursor, encode_cursor
 import re
-import requests
+import logging
+from concurrent.futures import ThreadPoolExecutor, TimeoutError as FutureTimeoutError
+from flask import current_app
 from typing import Optional
 import os
 
+# Threads des géocodages spéculatifs : ils peuvent survivre à la requête qui les a lancés
+_geocode_executor = ThreadPoolExecutor(max_workers=4, thread_name_prefix='geocode')
+
+
+def _run_in_app_context(app, function, *args):
+    """Exécute une fonction dans un contexte d'application (et une session SQLAlchemy) qui lui est propre"""
+    with app.app_context():
+        return function(*args)
+
 
 class SearchService:
     """Service pour gérer les opérations liées aux recherches"""
@@ -76,17 +89,24 @@ class SearchService:
             # Nettoyer la recherche
             search_term = re.sub(r'\s+', ' ', search_term.strip())
             
+            values = {
+                'client_id': user_id,
+                'recherche': search_term,
+                'station_id': station_id,
+                'resultat': bool(result)  # Convertir l'entier en booléen pour le champ resultat
+            }
+
+            # Mode différé : la ligne sera insérée par lot ; si la file est pleine, écrire tout de suite
+            if search_history.enqueue(values):
+                return True, "Recherche mise en file d'enregistrement", {}, 200
+
             # Créer une nouvelle instance du modèle Recherche
-            new_search = Recherche(
-                client_id=user_id,
-                recherche=search_term,
-                station_id=station_id,
-                resultat=bool(result)  # Convertir l'entier en booléen pour le champ resultat
-            )
+            new_search = Recherche(**values)
             
             # Ajouter l'objet à la session et effectuer le commit
             db.session.add(new_search)
-            db.session.commit()
+            with DB_COMMIT_DURATION.time('save_search'):
+                db.session.commit()
             
             return True, "Recherche enregistrée avec succès", {}, 200
                 
@@ -111,6 +131,10 @@ class SearchService:
         """
         Recherche une station via l'API Velib, puis Google Maps si non trouvée
         
+        Si SEARCH_SPECULATIVE_GEOCODE est actif, le géocodage Nominatim est lancé en même
+        temps sur un thread dédié ; quand une station est trouvée il se termine en
+        arrière-plan et ne sert qu'à remplir le cache de géocodage.
+        
         Args:
             search_term (str): Terme de recherche
             
@@ -121,76 +145,27 @@ class SearchService:
             # Nettoyer la recherche
             search_term = re.sub(r'\s+', ' ', search_term.strip())
             
-            # 1. Recherche dans l'API Velib
-            url = "https://velib-metropole-opendata.smovengo.cloud/opendata/Velib_Metropole/station_information.json"
-            response = requests.get(url)
+            speculative = None
+            if current_app.config['SEARCH_SPECULATIVE_GEOCODE']:
+                app = current_app._get_current_object()
+                speculative = _geocode_executor.submit(_run_in_app_context, app, SearchService.locate_address, search_term)
             
-            if not response.ok:
-                return False, "Erreur lors de l'appel à l'API Velib", {
-                    'error': "Le serveur n'a pas pu traiter votre demande",
-                    'error_code': 'API_ERROR',
-                    'token': False
-                }, 500
-                
-            data = response.json()
-            stations = data.get("data", {}).get("stations", [])
-            
-            # Rechercher la station dans Velib
-            matched_station = None
-            for station in stations:
-                if search_term.lower() in station.get("name", "").lower():
-                    matched_station = station
-                    break
-            
-            if matched_station:
-                return True, "Station trouvée!", {
-                    'lat': matched_station.get("lat"),
-                    'lon': matched_station.get("lon"),
-                    'station_id': matched_station.get("station_id"),
-                    'message': "Station trouvée!",
-                    'should_save': True
-                }, 200
+            # 1. Recherche dans le catalogue Vélib (cache partagé)
+            result = SearchService.match_station(search_term)
+            if result is not None:
+                return result
             
-            # 2. Si pas trouvé dans Vélib, chercher dans Nominatim
-            nominatim_url = f"https://nominatim.openstreetmap.org/search?q={requests.utils.quote(search_term)}&format=json&limit=1"
-
-            try:
-                nominatim_response = requests.get(nominatim_url, headers={'User-Agent': 'VelibSearchApp/1.0'})
-
-                if nominatim_response.ok:
-                    nominatim_data = nominatim_response.json()
-                    if nominatim_data:
-                        location = nominatim_data[0]
-                        lat = location.get("lat")
-                        lon = location.get("lon")
-
-                        if lat and lon:
-                            return True, "Localisation trouvée!", {
-                                'lat': lat,
-                                'lon': lon,
-                                'station_id': None,
-                                'message': "Localisation trouvée via Nominatim",
-                                'should_save': True
-                            }, 200
-
-            except Exception as e:
-                print(f"Erreur lors de la requête Nominatim : {e}")
-                return False, "Erreur de recherche externe", {
-                    'lat': None,
-                    'lon': None,
-                    'station_id': None,
-                    'message': "Erreur interne ou réseau avec Nominatim",
-                    'should_save': False
-                }, 500            
-
-            # 3. Si rien n'est trouvé
-            return True, "Aucune station ni adresse n'a été trouvée", {
-                'lat': None,
-                'lon': None,
-                'station_id': None,
-                'message': "Aucune station ni adresse n'a été trouvée",
-                'should_save': False
-            }, 201
+            # 2. Si pas trouvé dans Vélib, attendre le géocodage déjà lancé ou chercher dans le cache puis dans Nominatim
+            if speculative is not None:
+                # Même borne que l'appel Nominatim (connexion + lecture) : un thread de géocodage
+                # bloqué ne doit pas retenir la requête au-delà
+                timeout = current_app.config['UPSTREAM_CONNECT_TIMEOUT'] + current_app.config['NOMINATIM_HTTP_TIMEOUT']
+                try:
+                    return speculative.result(timeout=timeout)
+                except FutureTimeoutError:
+                    logging.warning(f"Géocodage spéculatif de '{search_term}' non terminé après {timeout:g}s")
+                    return SearchService.address_not_found()
+            return SearchService.locate_address(search_term)
             
         except Exception as e:
             return False, f"Erreur inattendue: {str(e)}", {
@@ -198,39 +173,220 @@ class SearchService:
                 'error_code': 'UNKNOWN_ERROR',
                 'token': False
             }, 500
+
+    @staticmethod
+    def match_station(search_term: str) -> Optional[Tuple[bool, str, Dict[str, Any], int]]:
+        """
+        Cherche le terme dans les noms des stations du catalogue Vélib
         
+        Args:
+            search_term (str): Terme de recherche nettoyé
+            
+        Returns:
+            tuple: (success, message, response_data, status_code), ou None si aucune station ne correspond
+        """
+        snapshot = station_catalogue.get()
+        
+        if snapshot is None:
+            return False, "Erreur lors de l'appel à l'API Velib", {
+                'error': "Le serveur n'a pas pu traiter votre demande",
+                'error_code': 'API_ERROR',
+                'token': False
+            }, 500
+            
+        # Rechercher les stations les plus proches du terme dans l'index des noms
+        matches = snapshot.match(search_term, current_app.config['SEARCH_CANDIDATES'])
+        candidates = [{
+            'station_id': station.get("station_id"),
+            'name': station.get("name"),
+            'lat': station.get("lat"),
+            'lon': station.get("lon")
+        } for station, score, contained in matches]
+        
+        # Retenir la meilleure station si elle contient le terme ou en est assez proche
+        matched_station = None
+        if matches:
+            station, score, contained = matches[0]
+            if contained or score >= current_app.config['SEARCH_FUZZY_THRESHOLD']:
+                matched_station = station
+        
+        if matched_station:
+            return True, "Station trouvée!", {
+                'lat': matched_station.get("lat"),
+                'lon': matched_station.get("lon"),
+                'station_id': matched_station.get("station_id"),
+                'message': "Station trouvée!",
+                'candidates': candidates,
+                'should_save': True
+            }, 200
+        
+        return None
+
     @staticmethod
-    def get_searches_by_user(user_id: int) -> Tuple[bool, str, Any, int]:
+    def locate_address(search_term: str) -> Tuple[bool, str, Dict[str, Any], int]:
         """
-        Récupère toutes les recherches d'un utilisateur donné
+        Géocode le terme comme une adresse (cache de géocodage puis Nominatim)
+        
+        Args:
+            search_term (str): Terme de recherche nettoyé
+            
+        Returns:
+            tuple: (success, message, response_data, status_code)
+        """
+        try:
+            cached, location = geocode_cache.get(search_term)
+            if not cached:
+                responded, location = SearchService.geocode(search_term)
+                # Ne mettre en cache que les réponses effectives de Nominatim
+                if responded:
+                    geocode_cache.set(search_term, location)
+
+            if location:
+                lat, lon = location
+                return True, "Localisation trouvée!", {
+                    'lat': lat,
+                    'lon': lon,
+                    'station_id': None,
+                    'message': "Localisation trouvée via Nominatim",
+                    'should_save': True
+                }, 200
+
+        except Exception as e:
+            print(f"Erreur lors de la requête Nominatim : {e}")
+            return False, "Erreur de recherche externe", {
+                'lat': None,
+                'lon': None,
+                'station_id': None,
+                'message': "Erreur interne ou réseau avec Nominatim",
+                'should_save': False
+            }, 500            
+
+        # 3. Si rien n'est trouvé
+        return SearchService.address_not_found()
+
+    @staticmethod
+    def address_not_found() -> Tuple[bool, str, Dict[str, Any], int]:
+        """
+        Réponse renvoyée quand ni station ni adresse ne correspond au terme
+        
+        Returns:
+            tuple: (success, message, response_data, status_code)
+        """
+        return True, "Aucune station ni adresse n'a été trouvée", {
+            'lat': None,
+            'lon': None,
+            'station_id': None,
+            'message': "Aucune station ni adresse n'a été trouvée",
+            'should_save': False
+        }, 201
+
+    @staticmethod
+    def geocode(search_term: str) -> Tuple[bool, Optional[Tuple[float, float]]]:
+        """
+        Géocode une adresse via Nominatim
+
+        Args:
+            search_term (str): Adresse recherchée
+
+        Returns:
+            tuple: (nominatim_a_répondu, (lat, lon) ou None si l'adresse est introuvable)
+        """
+        nominatim_response = upstream.get(
+            current_app.config['NOMINATIM_URL'],
+            params={'q': search_term, 'format': 'json', 'limit': 1}
+        )
+
+        if not nominatim_response.ok:
+            return False, None
+
+        nominatim_data = nominatim_response.json()
+        if nominatim_data:
+            location = nominatim_data[0]
+            lat = location.get("lat")
+            lon = location.get("lon")
+
+            if lat and lon:
+                return True, (float(lat), float(lon))
+
+        return True, None
+
+    @staticmethod
+    def history_query(user_id: int, limit: int, cursor: Optional[str] = None):
+        """
+        Requête d'une page de l'historique des recherches (vérifiée par python -m migrations check)
 
         Args:
             user_id (int): ID de l'utilisateur
+            limit (int): Nombre de recherches par page
+            cursor (Optional[str]): Curseur renvoyé par la page précédente
 
         Returns:
-            tuple: (success, message, data, status_code)
+            Query: limit + 1 lignes, pour savoir s'il existe une page suivante
+
+        Raises:
+            ValueError: Si le curseur est mal formé
+        """
+        # Seules les colonnes affichées sont lues, sous forme de tuples (pas d'objets ORM)
+        query = db.session.query(
+            RechercheVue.id,
+            RechercheVue.recherche,
+            RechercheVue.created_at,
+            RechercheVue.resultat,
+            RechercheVue.station_id,
+            RechercheVue.lat,
+            RechercheVue.lon,
+            RechercheVue.station
+        ).filter(RechercheVue.client_id == user_id)
+
+        if cursor:
+            query = query.filter(after_cursor(RechercheVue.created_at, RechercheVue.id, cursor))
+
+        return query.order_by(RechercheVue.created_at.desc(), RechercheVue.id.desc()).limit(limit + 1)
+
+    @staticmethod
+    def get_searches_by_user(user_id: int, cursor: Optional[str] = None, limit: Optional[int] = None) -> Tuple[bool, str, Any, int]:
         """
+        Récupère une page des recherches d'un utilisateur, des plus récentes aux plus anciennes
+
+        Args:
+            user_id (int): ID de l'utilisateur
+            cursor (Optional[str]): Curseur renvoyé par la page précédente (None pour la première page)
+            limit (Optional[int]): Nombre de recherches par page
+
+        Returns:
+            tuple: (success, message, data, status_code) où data vaut {'items': [...], 'next_cursor': str ou None}
+        """
+        max_limit = current_app.config['SEARCH_HISTORY_MAX_PAGE_SIZE']
+        if limit is None:
+            limit = current_app.config['SEARCH_HISTORY_PAGE_SIZE']
+        if limit < 1 or limit > max_limit:
+            return False, f"Le paramètre 'limit' doit être compris entre 1 et {max_limit}", {
+                'error_code': 'INVALID_PARAMETER'
+            }, 400
+
         try:
-            # Utilisation du modèle ORM pour récupérer les recherches
-            # Note: Comme la vue 'recherches_vue' était utilisée auparavant, nous devons joindre
-            # les tables nécessaires pour obtenir les mêmes informations
-            searches = RechercheVue.query.filter_by(client_id=user_id).order_by(RechercheVue.created_at.desc()).all()
-            
-            data = []
-            for search in searches:
-                search_item = search.to_dict()
-                
-                # Déterminer la valeur de resultat_recherche en fonction de resultat et station_id
-                if not search_item.get('resultat') and search_item.get('station_id') is None:
-                    search_item['resultat_recherche'] = "Pas de resultat de recherche"
-                elif search_item.get('resultat') and search_item.get('station_id') is None:
-                    search_item['resultat_recherche'] = "Adresse trouvée"
-                else:
-                    search_item['resultat_recherche'] = "Station trouvée"
-                    
-                data.append(search_item)
-            
-            return True, "Recherches récupérées avec succès", data, 200
+            rows = SearchService.history_query(user_id, limit, cursor).all()
+            has_more = len(rows) > limit
+            rows = rows[:limit]
+
+            items = [{
+                'id': row.id,
+                'client_id': user_id,
+                'recherche': row.recherche,
+                'created_at': row.created_at,
+                'resultat': row.resultat,
+                'station_id': row.station_id,
+                'lat': row.lat,
+                'lon': row.lon,
+                'station': row.station,
+                'resultat_recherche': RechercheVue.resultat_label(row.resultat, row.station_id)
+            } for row in rows]
+
+            next_cursor = encode_cursor(rows[-1].created_at, rows[-1].id) if has_more else None
+            return True, "Recherches récupérées avec succès", {'items': items, 'next_cursor': next_cursor}, 200
+
+        except ValueError as e:
+            return False, str(e), {'error_code': 'INVALID_PARAMETER'}, 400
 
         except SQLAlchemyError as e:
             print(f"[ERROR] SQLAlchemy: {str(e)}")
@@ -240,3 +396,39 @@ class SearchService:
             print(f"[ERROR] Exception: {str(e)}")
             return False, "Erreur inconnue", {'error': str(e)}, 500
 
+    @staticmethod
+    def suggest_stations(prefix: str, limit: int) -> Tuple[bool, str, Any, int]:
+        """
+        Propose des noms de stations pour l'autocomplétion de la saisie
+
+        N'utilise que le catalogue en mémoire : ni base de données ni API externe.
+
+        Args:
+            prefix (str): Début de saisie de l'utilisateur
+            limit (int): Nombre maximal de propositions
+
+        Returns:
+            tuple: (success, message, data, status_code)
+        """
+        max_limit = current_app.config['SEARCH_SUGGEST_MAX']
+        if limit < 1 or limit > max_limit:
+            return False, "Paramètre invalide", {
+                'error': f"Le paramètre 'limit' doit être compris entre 1 et {max_limit}",
+                'error_code': 'INVALID_PARAMETER'
+            }, 400
+
+        snapshot = station_catalogue.get()
+        if snapshot is None:
+            return False, "Erreur lors de l'appel à l'API Velib", {
+                'error': "Le serveur n'a pas pu traiter votre demande",
+                'error_code': 'API_ERROR'
+            }, 502
+
+        suggestions = [{
+            'station_id': station.get("station_id"),
+            'name': station.get("name"),
+            'lat': station.get("lat"),
+            'lon': station.get("lon")
+        } for station in snapshot.suggest(prefix, limit)]
+
+        return True, "Suggestions récupérées avec succès", suggestions, 200
@@ -0,0 +1,140 @@
+"""
+Index spatial en grille pour les stations Vélib
+
+Les coordonnées sont réparties dans des cellules d'environ 500 m de côté, ce qui
+permet de répondre aux requêtes « stations proches » et « stations dans la zone
+affichée » sans parcourir tout le réseau.
+"""
+import heapq
+import math
+from typing import Dict, List, Optional, Sequence, Tuple
+
+# Rayon moyen de la Terre en mètres
+EARTH_RADIUS = 6371000.0
+
+
+def valid_position(lat: float, lon: float) -> bool:
+    """Vrai si lat et lon sont des nombres finis dans [-90, 90] et [-180, 180]"""
+    return (math.isfinite(lat) and math.isfinite(lon)
+            and -90.0 <= lat <= 90.0 and -180.0 <= lon <= 180.0)
+
+
+class GridIndex:
+    """
+    Grille régulière de positions (indices dans la liste des stations du catalogue).
+
+    Les cellules font cell_size degrés de latitude et sont élargies en longitude
+    pour rester à peu près carrées à la latitude moyenne du réseau.
+    """
+
+    def __init__(self, coordinates: Sequence[Tuple[float, float]], cell_size: float = 0.005):
+        self.coordinates = tuple(coordinates)
+        self.cell_size = cell_size
+
+        latitudes = [lat for lat, lon in self.coordinates]
+        self.ref_lat = sum(latitudes) / len(latitudes) if latitudes else 0.0
+        self._cos_ref = math.cos(math.radians(self.ref_lat))
+        self.lon_cell_size = cell_size / self._cos_ref
+        # Côté d'une cellule en mètres (utilisé pour borner la recherche en anneaux)
+        self.cell_meters = math.radians(cell_size) * EARTH_RADIUS
+
+        self.cells: Dict[Tuple[int, int], List[int]] = {}
+        for position, (lat, lon) in enumerate(self.coordinates):
+            self.cells.setdefault(self._cell(lat, lon), []).append(position)
+
+        if self.cells:
+            rows = [cell[0] for cell in self.cells]
+            cols = [cell[1] for cell in self.cells]
+            self._bounds = (min(rows), min(cols), max(rows), max(cols))
+        else:
+            self._bounds = (0, 0, -1, -1)
+        # Au-delà de ce rayon, les anneaux parcourus comptent plus de cellules que le réseau
+        # n'a de stations : un parcours linéaire coûte alors moins cher
+        self._max_scan_ring = int(math.sqrt(len(self.coordinates))) + 1
+
+    @classmethod
+    def build(cls, coordinates: Sequence[Tuple[float, float]], previous: Optional['GridIndex'] = None) -> 'GridIndex':
+        """Réutilise l'index précédent si les positions des stations n'ont pas changé"""
+        coordinates = tuple(coordinates)
+        if previous is not None and previous.coordinates == coordinates:
+            return previous
+        return cls(coordinates)
+
+    def _cell(self, lat: float, lon: float) -> Tuple[int, int]:
+        return int(math.floor(lat / self.cell_size)), int(math.floor(lon / self.lon_cell_size))
+
+    def distance(self, lat1: float, lon1: float, lat2: float, lon2: float) -> float:
+        """Distance approchée en mètres (projection équirectangulaire, précise à l'échelle d'une ville)"""
+        x = math.radians(lon2 - lon1) * self._cos_ref
+        y = math.radians(lat2 - lat1)
+        return math.hypot(x, y) * EARTH_RADIUS
+
+    def nearest(self, lat: float, lon: float, k: int = 10) -> List[Tuple[int, float]]:
+        """
+        Recherche les k positions les plus proches d'un point
+
+        Returns:
+            List[Tuple[int, float]]: (position, distance en mètres) triés par distance croissante
+        """
+        if not self.cells or k <= 0 or not (math.isfinite(lat) and math.isfinite(lon)):
+            return []
+
+        row, col = self._cell(lat, lon)
+        min_row, min_col, max_row, max_col = self._bounds
+        max_ring = max(abs(row - min_row), abs(row - max_row), abs(col - min_col), abs(col - max_col))
+
+        found: List[Tuple[float, int]] = []
+        ring = 0
+        while ring <= max_ring:
+            if ring > self._max_scan_ring:
+                # Point éloigné du réseau : les anneaux seraient presque tous vides
+                found = [(self.distance(lat, lon, p_lat, p_lon), position)
+                         for position, (p_lat, p_lon) in enumerate(self.coordinates)]
+                break
+
+            for cell in self._ring_cells(row, col, ring):
+                for position in self.cells.get(cell, ()):
+                    p_lat, p_lon = self.coordinates[position]
+                    found.append((self.distance(lat, lon, p_lat, p_lon), position))
+
+            # Tout point hors des anneaux parcourus est à plus de ring * cell_meters
+            if len(found) >= k:
+                found.sort()
+                if found[k - 1][0] <= ring * self.cell_meters:
+                    break
+            ring += 1
+
+        return [(position, dist) for dist, position in heapq.nsmallest(k, found)]
+
+    def within(self, min_lat: float, min_lon: float, max_lat: float, max_lon: float) -> List[int]:
+        """Retourne les positions situées dans le rectangle donné"""
+        if not self.cells or not all(math.isfinite(v) for v in (min_lat, min_lon, max_lat, max_lon)):
+            return []
+
+        min_row, min_col = self._cell(min_lat, min_lon)
+        max_row, max_col = self._cell(max_lat, max_lon)
+        b_min_row, b_min_col, b_max_row, b_max_col = self._bounds
+        min_row, min_col = max(min_row, b_min_row), max(min_col, b_min_col)
+        max_row, max_col = min(max_row, b_max_row), min(max_col, b_max_col)
+
+        positions = []
+        for cell_row in range(min_row, max_row + 1):
+            for cell_col in range(min_col, max_col + 1):
+                for position in self.cells.get((cell_row, cell_col), ()):
+                    p_lat, p_lon = self.coordinates[position]
+                    if min_lat <= p_lat <= max_lat and min_lon <= p_lon <= max_lon:
+                        positions.append(position)
+        return positions
+
+    @staticmethod
+    def _ring_cells(row: int, col: int, ring: int):
+        """Cellules situées exactement à la distance de Tchebychev ring de (row, col)"""
+        if ring == 0:
+            yield row, col
+            return
+        for c in range(col - ring, col + ring + 1):
+            yield row - ring, c
+            yield row + ring, c
+        for r in range(row - ring + 1, row + ring):
+            yield r, col - ring
+            yield r, col + ring
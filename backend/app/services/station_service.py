@@ -0,0 +1,159 @@
+"""
+Service pour les données des stations Vélib
+"""
+from typing import Tuple, Dict, Any, List, Optional
+from flask import current_app
+from ..extensions import station_catalogue, station_status
+from .spatial_index import valid_position
+
+
+class StationService:
+    """Service pour gérer les opérations liées aux stations"""
+
+    @staticmethod
+    def get_status_batch(station_ids: Optional[List[int]] = None,
+                         bbox: Optional[List[float]] = None) -> Tuple[bool, str, Dict[str, Any], int]:
+        """
+        Récupère la disponibilité de plusieurs stations en une seule fois
+
+        Args:
+            station_ids (Optional[List[int]]): Identifiants des stations demandées
+            bbox (Optional[List[float]]): Zone [min_lat, min_lon, max_lat, max_lon] de la carte
+
+        Returns:
+            tuple: (success, message, response_data, status_code)
+        """
+        if station_ids is None and bbox is None:
+            return False, "Paramètre manquant", {
+                'error': "Paramètre 'station_ids' ou 'bbox' manquant",
+                'error_code': 'MISSING_PARAMETER'
+            }, 400
+
+        if bbox is not None:
+            # bool est une sous-classe de int : True/False ne sont pas des coordonnées
+            if (not isinstance(bbox, list) or len(bbox) != 4
+                    or not all(isinstance(v, (int, float)) and not isinstance(v, bool) for v in bbox)
+                    or not (valid_position(*bbox[:2]) and valid_position(*bbox[2:]))):
+                return False, "Paramètre invalide", {
+                    'error': "Le paramètre 'bbox' doit être [min_lat, min_lon, max_lat, max_lon]",
+                    'error_code': 'INVALID_PARAMETER'
+                }, 400
+
+            catalogue = station_catalogue.get()
+            if catalogue is None:
+                return False, "Erreur lors de l'appel à l'API Velib", {
+                    'error': station_catalogue.last_error,
+                    'error_code': 'API_ERROR'
+                }, 502
+
+            station_ids = [station['station_id'] for station in catalogue.within(*bbox)]
+
+        if not isinstance(station_ids, list) or not all(isinstance(v, int) and not isinstance(v, bool) for v in station_ids):
+            return False, "Paramètre invalide", {
+                'error': "Le paramètre 'station_ids' doit être une liste d'entiers",
+                'error_code': 'INVALID_PARAMETER'
+            }, 400
+
+        max_ids = current_app.config['STATION_BATCH_MAX_IDS']
+        if len(station_ids) > max_ids:
+            return False, "Trop de stations demandées", {
+                'error': f"Au plus {max_ids} stations peuvent être demandées à la fois",
+                'error_code': 'TOO_MANY_STATIONS'
+            }, 400
+
+        snapshot = station_status.get()
+        if snapshot is None:
+            return False, "Erreur lors de l'appel à l'API Velib", {
+                'error': station_status.last_error,
+                'error_code': 'API_ERROR'
+            }, 502
+
+        # Toutes les stations sont lues dans le même instantané du flux
+        compact_by_id = snapshot.compact_by_id
+        stations = [compact_by_id[station_id] for station_id in station_ids if station_id in compact_by_id]
+
+        return True, "Statuts récupérés avec succès", {
+            'last_updated': snapshot.last_updated,
+            'stations': stations
+        }, 200
+
+    @staticmethod
+    def get_status_changes(since: Optional[int] = None) -> Tuple[bool, str, Any, int]:
+        """
+        Récupère la disponibilité des stations modifiées depuis une version du flux
+
+        Args:
+            since (Optional[int]): Version déjà connue du client (toutes les stations si None)
+
+        Returns:
+            tuple: (success, message, data, status_code), data étant la réponse complète
+            déjà sérialisée (FrozenBody) si since est absent, inconnu ou trop ancien
+        """
+        snapshot = station_status.get()
+        if snapshot is None:
+            return False, "Erreur lors de l'appel à l'API Velib", {
+                'error': station_status.last_error,
+                'error_code': 'API_ERROR'
+            }, 502
+
+        changes = snapshot.changes_since(since) if since is not None else None
+        if changes is None:
+            return True, "Statuts récupérés avec succès", snapshot.full_body(), 200
+
+        stations, removed = changes
+        return True, "Modifications récupérées avec succès", {
+            'version': snapshot.version,
+            'last_updated': snapshot.last_updated,
+            'full': False,
+            'stations': stations,
+            'removed': removed
+        }, 200
+
+    @staticmethod
+    def get_nearby(lat: float, lon: float, k: int) -> Tuple[bool, str, Any, int]:
+        """
+        Récupère les stations les plus proches d'une position
+
+        Args:
+            lat (float): Latitude de la position
+            lon (float): Longitude de la position
+            k (int): Nombre de stations à retourner
+
+        Returns:
+            tuple: (success, message, data, status_code)
+        """
+        max_k = current_app.config['STATION_NEARBY_MAX_K']
+        if k < 1 or k > max_k:
+            return False, "Paramètre invalide", {
+                'error': f"Le paramètre 'k' doit être compris entre 1 et {max_k}",
+                'error_code': 'INVALID_PARAMETER'
+            }, 400
+
+        catalogue = station_catalogue.get()
+        if catalogue is None:
+            return False, "Erreur lors de l'appel à l'API Velib", {
+                'error': station_catalogue.last_error,
+                'error_code': 'API_ERROR'
+            }, 502
+
+        return True, "Stations récupérées avec succès", catalogue.nearby(lat, lon, k), 200
+
+    @staticmethod
+    def get_in_bbox(min_lat: float, min_lon: float, max_lat: float, max_lon: float) -> Tuple[bool, str, Any, int]:
+        """
+        Récupère les stations situées dans la zone affichée sur la carte
+
+        Args:
+            min_lat, min_lon, max_lat, max_lon (float): Bornes de la zone
+
+        Returns:
+            tuple: (success, message, data, status_code)
+        """
+        catalogue = station_catalogue.get()
+        if catalogue is None:
+            return False, "Erreur lors de l'appel à l'API Velib", {
+                'error': station_catalogue.last_error,
+                'error_code': 'API_ERROR'
+            }, 502
+
+        return True, "Stations récupérées avec succès", catalogue.within(min_lat, min_lon, max_lat, max_lon), 200
@@ -0,0 +1,407 @@
+"""
+Diffusion en direct de la disponibilité des stations (Server-Sent Events)
+
+Un seul thread par processus surveille l'instantané partagé station_status ; à
+chaque nouvelle version, il réveille tous les abonnés, qui reçoivent uniquement
+les stations modifiées (éventuellement restreintes à une zone ou une liste). Les
+différences sont calculées une fois par version grâce à l'historique des instantanés.
+
+Deux chemins de service :
+- ASGI (create_asgi_app) : StatusStreamASGI sert le flux sans passer par Flask,
+  un abonné inactif ne coûte qu'une coroutine ;
+- WSGI (route /api/station/stream) : chaque abonné occupe un thread du worker,
+  leur nombre est donc limité séparément.
+"""
+import asyncio
+import logging
+import os
+import threading
+import time
+from typing import Any, AsyncIterator, Dict, Iterator, List, Mapping, Optional, Tuple
+from urllib.parse import parse_qsl
+
+from ..json_provider import encode
+from .metrics import STREAM_CONNECTION_DURATION
+from .spatial_index import valid_position
+
+HEARTBEAT = b': keep-alive\n\n'
+
+
+class Subscription:
+    """Abonné au flux : stations suivies (None pour toutes) et dernière version envoyée"""
+
+    __slots__ = ('station_ids', 'version', 'threaded', 'active')
+
+    def __init__(self, station_ids: Optional[frozenset], version: Optional[int], threaded: bool):
+        self.station_ids = station_ids
+        self.version = version
+        self.threaded = threaded
+        self.active = True
+
+
+def format_event(event: str, version: int, data: Dict[str, Any]) -> bytes:
+    """Message SSE ; l'id permet au client de reprendre avec l'en-tête Last-Event-ID"""
+    return b'id: %d\nevent: %s\ndata: %s\n\n' % (version, event.encode(), encode(data))
+
+
+class StatusBroadcaster:
+    """Surveille les versions du flux de disponibilité et les diffuse aux abonnés du processus"""
+
+    def __init__(self, status, catalogue, heartbeat: float = 15, poll_interval: float = 1,
+                 max_subscribers: int = 5000, max_threaded_subscribers: int = 2, max_station_ids: int = 2000):
+        self.status = status
+        self.catalogue = catalogue
+        self.heartbeat = heartbeat
+        self.poll_interval = poll_interval
+        self.max_subscribers = max_subscribers
+        self.max_threaded_subscribers = max_threaded_subscribers
+        self.max_station_ids = max_station_ids
+        self._snapshot = None
+        self._poller_pid = None
+        self._lock = threading.Lock()
+        self._condition = threading.Condition(self._lock)
+        self._loop_events: Dict[asyncio.AbstractEventLoop, asyncio.Event] = {}
+        # Différences déjà calculées pour l'instantané courant : version de départ -> (stations, retirées, message)
+        self._changes_cache: Tuple[Optional[int], Dict[int, Tuple[List, List, Optional[bytes]]]] = (None, {})
+        self._counters = {'subscribed': 0, 'rejected': 0, 'published': 0, 'events': 0}
+        self._subscribers = {'async': 0, 'threaded': 0}
+
+    def init_app(self, app) -> None:
+        """Lit l'intervalle des messages de maintien, la surveillance et les limites d'abonnés depuis la configuration"""
+        self.heartbeat = app.config.get('STATUS_STREAM_HEARTBEAT', self.heartbeat)
+        self.poll_interval = app.config.get('STATUS_STREAM_POLL_INTERVAL', self.poll_interval)
+        self.max_subscribers = app.config.get('STATUS_STREAM_MAX_SUBSCRIBERS', self.max_subscribers)
+        self.max_threaded_subscribers = app.config.get('STATUS_STREAM_MAX_THREADED_SUBSCRIBERS',
+                                                       self.max_threaded_subscribers)
+        self.max_station_ids = app.config.get('STATION_BATCH_MAX_IDS', self.max_station_ids)
+
+    def subscribe(self, args: Mapping[str, str], last_event_id: Optional[str] = None,
+                  threaded: bool = False) -> Tuple[Optional[Subscription], Optional[Dict[str, Any]], int]:
+        """
+        Crée un abonnement à partir des paramètres de la requête
+
+        Args:
+            args: Paramètres bbox (min_lat,min_lon,max_lat,max_lon) ou station_ids (liste séparée par des virgules)
+            last_event_id: En-tête Last-Event-ID d'une reconnexion (version déjà reçue)
+            threaded: L'abonné occupe un thread (chemin WSGI)
+
+        Returns:
+            tuple: (subscription, error_data, status_code)
+        """
+        station_ids, error, status_code = self._parse_filter(args)
+        if error is not None:
+            return None, error, status_code
+
+        snapshot = self._current()
+        if snapshot is None:
+            return None, {'error': self.status.last_error, 'error_code': 'API_ERROR'}, 502
+
+        kind = 'threaded' if threaded else 'async'
+        limit = self.max_threaded_subscribers if threaded else self.max_subscribers
+        with self._lock:
+            if self._subscribers[kind] >= limit:
+                self._counters['rejected'] += 1
+                return None, {
+                    'error': "Trop d'abonnés au flux de disponibilité, veuillez réessayer plus tard",
+                    'error_code': 'TOO_MANY_SUBSCRIBERS'
+                }, 503
+            self._subscribers[kind] += 1
+            self._counters['subscribed'] += 1
+
+        self._ensure_poller()
+        if self._snapshot is None:
+            self._publish(snapshot)
+        version = int(last_event_id) if last_event_id and last_event_id.isdigit() else None
+        return Subscription(station_ids, version, threaded), None, 200
+
+    def unsubscribe(self, subscription: Subscription) -> None:
+        """Libère la place de l'abonné (sans effet si c'est déjà fait)"""
+        with self._lock:
+            if subscription.active:
+                subscription.active = False
+                self._subscribers['threaded' if subscription.threaded else 'async'] -= 1
+
+    def events(self, subscription: Subscription) -> Iterator[bytes]:
+        """Messages SSE pour un abonné servi par un thread (réponse WSGI en streaming)"""
+        try:
+            while True:
+                event = self._next_event(subscription)
+                if event is not None:
+                    yield event
+                elif not self._wait(subscription.version, self.heartbeat):
+                    yield HEARTBEAT
+        finally:
+            self.unsubscribe(subscription)
+
+    async def events_async(self, subscription: Subscription) -> AsyncIterator[bytes]:
+        """Messages SSE pour un abonné servi par la boucle asyncio"""
+        try:
+            while True:
+                event = self._next_event(subscription)
+                if event is not None:
+                    yield event
+                elif not await self._wait_async(subscription.version, self.heartbeat):
+                    yield HEARTBEAT
+        finally:
+            self.unsubscribe(subscription)
+
+    def stats(self) -> Dict[str, Any]:
+        """Nombre d'abonnés et de versions diffusées"""
+        with self._lock:
+            stats = dict(self._counters)
+            stats['subscribers'] = self._subscribers['async']
+            stats['threaded_subscribers'] = self._subscribers['threaded']
+        snapshot = self._snapshot
+        stats['version'] = snapshot.version if snapshot is not None else None
+        return stats
+
+    def _parse_filter(self, args: Mapping[str, str]) -> Tuple[Optional[frozenset], Optional[Dict[str, Any]], int]:
+        bbox, station_ids = args.get('bbox'), args.get('station_ids')
+
+        if bbox:
+            try:
+                bounds = [float(value) for value in bbox.split(',')]
+            except ValueError:
+                bounds = []
+            if len(bounds) != 4 or not (valid_position(*bounds[:2]) and valid_position(*bounds[2:])):
+                return None, {
+                    'error': "Le paramètre 'bbox' doit être min_lat,min_lon,max_lat,max_lon (latitudes dans [-90, 90], "
+                             "longitudes dans [-180, 180])",
+                    'error_code': 'INVALID_PARAMETER'
+                }, 400
+            catalogue = self.catalogue.get()
+            if catalogue is None:
+                return None, {'error': self.catalogue.last_error, 'error_code': 'API_ERROR'}, 502
+            return frozenset(station['station_id'] for station in catalogue.within(*bounds)), None, 200
+
+        if station_ids:
+            try:
+                ids = frozenset(int(value) for value in station_ids.split(','))
+            except ValueError:
+                return None, {
+                    'error': "Le paramètre 'station_ids' doit être une liste d'entiers séparés par des virgules",
+                    'error_code': 'INVALID_PARAMETER'
+                }, 400
+            if len(ids) > self.max_station_ids:
+                return None, {
+                    'error': f"Au plus {self.max_station_ids} stations peuvent être suivies à la fois",
+                    'error_code': 'TOO_MANY_STATIONS'
+                }, 400
+            return ids, None, 200
+
+        return None, None, 200
+
+    def _current(self):
+        snapshot = self._snapshot
+        return snapshot if snapshot is not None else self.status.get()
+
+    def _next_event(self, subscription: Subscription) -> Optional[bytes]:
+        """
+        Message à envoyer pour la version courante, ou None si l'abonné est à jour
+
+        Le premier message (ou celui qui suit une version trop ancienne) contient toutes
+        les stations suivies ; les suivants, seulement les stations modifiées.
+        """
+        snapshot = self._current()
+        if snapshot is None or snapshot.version == subscription.version:
+            return None
+
+        since, subscription.version = subscription.version, snapshot.version
+        changes = self._changes(snapshot, since) if since is not None else None
+        if changes is None:
+            compact_by_id = snapshot.compact_by_id
+            ids = subscription.station_ids
+            stations = list(compact_by_id.values()) if ids is None else [
+                compact_by_id[station_id] for station_id in ids if station_id in compact_by_id
+            ]
+            self._count('events')
+            return format_event('snapshot', snapshot.version, {
+                'version': snapshot.version, 'last_updated': snapshot.last_updated, 'stations': stations
+            })
+
+        stations, removed, shared_event = changes
+        if subscription.station_ids is None:
+            event = shared_event
+        else:
+            ids = subscription.station_ids
+            stations = [station for station in stations if station['station_id'] in ids]
+            removed = [station_id for station_id in removed if station_id in ids]
+            # Aucune station suivie n'a changé : rien à envoyer
+            if not stations and not removed:
+                return None
+            event = format_event('changes', snapshot.version, {
+                'version': snapshot.version, 'last_updated': snapshot.last_updated,
+                'stations': stations, 'removed': removed
+            })
+        self._count('events')
+        return event
+
+    def _changes(self, snapshot, since: int) -> Optional[Tuple[List, List, bytes]]:
+        """Différences depuis since, calculées et sérialisées une fois par instantané pour tous les abonnés"""
+        version, cache = self._changes_cache
+        if version != snapshot.version:
+            cache = {}
+            self._changes_cache = (snapshot.version, cache)
+
+        changes = cache.get(since)
+        if changes is None:
+            result = snapshot.changes_since(since)
+            if result is None:
+                return None
+            stations, removed = result
+            changes = cache[since] = (stations, removed, format_event('changes', snapshot.version, {
+                'version': snapshot.version, 'last_updated': snapshot.last_updated,
+                'stations': stations, 'removed': removed
+            }))
+        return changes
+
+    def _wait(self, version: Optional[int], timeout: float) -> bool:
+        """Attend une nouvelle version ; False si le délai expire"""
+        with self._condition:
+            return self._condition.wait_for(lambda: self._version() != version, timeout)
+
+    async def _wait_async(self, version: Optional[int], timeout: float) -> bool:
+        loop = asyncio.get_running_loop()
+        deadline = loop.time() + timeout
+        while True:
+            with self._lock:
+                event = self._loop_events.get(loop)
+                if event is None:
+                    event = self._loop_events[loop] = asyncio.Event()
+            # Vérifier après l'inscription : une publication entre-temps réveillera l'événement
+            if self._version() != version:
+                return True
+            remaining = deadline - loop.time()
+            if remaining <= 0:
+                return False
+            try:
+                await asyncio.wait_for(event.wait(), remaining)
+            except asyncio.TimeoutError:
+                return self._version() != version
+
+    def _version(self) -> Optional[int]:
+        snapshot = self._snapshot
+        return snapshot.version if snapshot is not None else None
+
+    def _count(self, counter: str) -> None:
+        with self._lock:
+            self._counters[counter] += 1
+
+    def _ensure_poller(self) -> None:
+        """Démarre le thread de surveillance du processus courant (une fois par processus, après un fork)"""
+        if self._poller_pid == os.getpid():
+            return
+        with self._lock:
+            if self._poller_pid == os.getpid():
+                return
+            self._loop_events = {}
+            self._poller_pid = os.getpid()
+            threading.Thread(target=self._run, name='status-stream', daemon=True).start()
+
+    def _run(self) -> None:
+        while True:
+            try:
+                # get() déclenche le rafraîchissement du flux quand son TTL est écoulé
+                snapshot = self.status.get()
+                if snapshot is not None and snapshot is not self._snapshot:
+                    self._publish(snapshot)
+            except Exception as e:
+                logging.error(f"Erreur lors de la diffusion de la disponibilité: {str(e)}")
+            time.sleep(self.poll_interval)
+
+    def _publish(self, snapshot) -> None:
+        """Remplace l'instantané diffusé et réveille les abonnés (threads et boucles asyncio)"""
+        with self._condition:
+            self._snapshot = snapshot
+            self._counters['published'] += 1
+            loop_events, self._loop_events = self._loop_events, {}
+            self._condition.notify_all()
+
+        for loop, event in loop_events.items():
+            try:
+                loop.call_soon_threadsafe(event.set)
+            except RuntimeError:
+                # Boucle fermée entre-temps
+                pass
+
+
+class StatusStreamASGI:
+    """
+    Application ASGI qui sert le flux de disponibilité directement sur la boucle asyncio
+
+    Les autres chemins sont transmis à l'application Flask (WSGIMiddleware d'a2wsgi).
+    Les en-têtes CORS suivent les origines de la configuration (CORS_ORIGINS), comme
+    Flask-CORS pour les autres routes, et chaque connexion est mesurée dans
+    velib_stream_connection_duration_seconds.
+    """
+
+    def __init__(self, app, broadcaster: StatusBroadcaster, path: str, cors_origins: Optional[List[str]] = None):
+        self.app = app
+        self.broadcaster = broadcaster
+        self.path = path
+        self.cors_origins = cors_origins if cors_origins is not None else ['*']
+
+    async def __call__(self, scope, receive, send):
+        if scope['type'] != 'http' or scope['path'].rstrip('/') != self.path or scope['method'] != 'GET':
+            return await self.app(scope, receive, send)
+
+        start = time.perf_counter()
+        status_code = 500
+        try:
+            status_code = await self._serve(scope, receive, send)
+        finally:
+            STREAM_CONNECTION_DURATION.observe(time.perf_counter() - start, str(status_code))
+
+    def _cors_headers(self, origin: Optional[str]) -> List[Tuple[bytes, bytes]]:
+        """En-têtes CORS de la réponse pour l'origine de la requête"""
+        if '*' in self.cors_origins:
+            return [(b'access-control-allow-origin', b'*')]
+        if origin is not None and origin in self.cors_origins:
+            return [(b'access-control-allow-origin', origin.encode('latin-1')), (b'vary', b'Origin')]
+        return [(b'vary', b'Origin')]
+
+    async def _serve(self, scope, receive, send) -> int:
+        """Sert une connexion au flux ; retourne le statut HTTP de la réponse"""
+        args = dict(parse_qsl(scope.get('query_string', b'').decode('latin-1')))
+        headers = {name.decode('latin-1').lower(): value.decode('latin-1') for name, value in scope['headers']}
+        cors_headers = self._cors_headers(headers.get('origin'))
+        # subscribe peut télécharger le flux (premier abonné, catalogue expiré) : hors de la boucle
+        subscription, error, status_code = await asyncio.to_thread(
+            self.broadcaster.subscribe, args, headers.get('last-event-id')
+        )
+
+        if subscription is None:
+            body = encode(error)
+            await send({'type': 'http.response.start', 'status': status_code, 'headers': [
+                (b'content-type', b'application/json'), (b'content-length', str(len(body)).encode())
+            ] + cors_headers + ([(b'retry-after', b'5')] if status_code == 503 else [])})
+            await send({'type': 'http.response.body', 'body': body})
+            return status_code
+
+        await send({'type': 'http.response.start', 'status': 200, 'headers': [
+            (b'content-type', b'text/event-stream'), (b'cache-control', b'no-cache'),
+            (b'x-accel-buffering', b'no')
+        ] + cors_headers})
+
+        async def stream():
+            async for chunk in self.broadcaster.events_async(subscription):
+                await send({'type': 'http.response.body', 'body': chunk, 'more_body': True})
+
+        async def disconnected():
+            while (await receive())['type'] != 'http.disconnect':
+                pass
+
+        # S'arrêter dès que le client se déconnecte (ou que l'envoi échoue)
+        tasks = [asyncio.ensure_future(stream()), asyncio.ensure_future(disconnected())]
+        try:
+            await asyncio.wait(tasks, return_when=asyncio.FIRST_COMPLETED)
+        finally:
+            # Annuler et attendre les deux tâches (aussi si cette coroutine est annulée),
+            # ce qui récupère l'exception éventuelle de la tâche terminée
+            for task in tasks:
+                task.cancel()
+            results = await asyncio.gather(*tasks, return_exceptions=True)
+        for result in results:
+            if isinstance(result, Exception):
+                logging.warning(f"Flux de disponibilité interrompu : {str(result)}")
+        return 200
@@ -0,0 +1,80 @@
+"""
+Cache des tokens JWT déjà vérifiés
+
+Un token présenté à nouveau n'est ni redécodé ni revérifié (HMAC) : son payload
+est relu dans un LRU borné, indexé par l'empreinte SHA-256 du token et de la clé
+secrète. Une entrée n'est plus utilisée dès que le token expire, avec la même
+règle que PyJWT (exp < maintenant, à la seconde près).
+"""
+import hashlib
+import threading
+import time
+from collections import OrderedDict
+from typing import Dict, Optional, Tuple
+
+
+class VerifiedTokenCache:
+    """LRU des payloads de tokens JWT dont la signature a été vérifiée"""
+
+    def __init__(self, max_entries: int = 4096, enabled: bool = True):
+        self.max_entries = max_entries
+        self.enabled = enabled
+        self._entries: "OrderedDict[bytes, Tuple[float, dict]]" = OrderedDict()
+        self._lock = threading.Lock()
+        self._counters = {'hits': 0, 'misses': 0, 'expired': 0, 'evictions': 0}
+
+    def init_app(self, app) -> None:
+        """Lit la taille et l'activation du cache depuis la configuration"""
+        self.max_entries = app.config.get('JWT_VERIFY_CACHE_SIZE', self.max_entries)
+        self.enabled = app.config.get('JWT_VERIFY_CACHE', self.enabled) and self.max_entries > 0
+
+    @staticmethod
+    def key(token: str, secret_key: str) -> bytes:
+        """Empreinte du token ; la clé secrète en fait partie pour qu'un changement de clé invalide le cache"""
+        return hashlib.sha256(f"{secret_key}\x00{token}".encode()).digest()
+
+    def get(self, token: str, secret_key: str) -> Optional[dict]:
+        """Payload d'un token déjà vérifié et non expiré, sinon None"""
+        if not self.enabled:
+            return None
+
+        key = self.key(token, secret_key)
+        with self._lock:
+            entry = self._entries.get(key)
+            if entry is None:
+                self._counters['misses'] += 1
+                return None
+
+            expires_at, payload = entry
+            if expires_at < int(time.time()):
+                del self._entries[key]
+                self._counters['expired'] += 1
+                self._counters['misses'] += 1
+                return None
+
+            self._entries.move_to_end(key)
+            self._counters['hits'] += 1
+            return payload
+
+    def set(self, token: str, secret_key: str, payload: dict) -> None:
+        """Mémorise le payload d'un token dont la signature vient d'être vérifiée"""
+        if not self.enabled:
+            return
+
+        expires_at = int(payload['exp']) if 'exp' in payload else float('inf')
+        key = self.key(token, secret_key)
+        with self._lock:
+            self._entries[key] = (expires_at, payload)
+            self._entries.move_to_end(key)
+            while len(self._entries) > self.max_entries:
+                self._entries.popitem(last=False)
+                self._counters['evictions'] += 1
+
+    def stats(self) -> Dict[str, float]:
+        """Compteurs et taux de succès du cache"""
+        with self._lock:
+            stats = dict(self._counters)
+            stats['size'] = len(self._entries)
+        lookups = stats['hits'] + stats['misses']
+        stats['hit_rate'] = round(stats['hits'] / lookups, 4) if lookups else 0.0
+        return stats
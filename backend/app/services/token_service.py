@@ -5,6 +5,7 @@ import jwt
 from datetime import datetime, timedelta
 from typing import Optional, Tuple
 from flask import current_app
+from ..extensions import token_cache
 
 class TokenService:
     """Service pour gérer les tokens JWT"""
@@ -46,11 +47,15 @@ class TokenService:
             # Utilisation de la configuration de l'application
             secret_key = current_app.config['JWT_SECRET_KEY']
             
-            payload = jwt.decode(
-                token,
-                secret_key,
-                algorithms=['HS256']
-            )
+            # Token déjà vérifié et non expiré : pas de nouveau décodage ni de contrôle de signature
+            payload = token_cache.get(token, secret_key)
+            if payload is None:
+                payload = jwt.decode(
+                    token,
+                    secret_key,
+                    algorithms=['HS256']
+                )
+                token_cache.set(token, secret_key, payload)
             
             # Vérifier si l'ID utilisateur correspond à celui du token
             if user_id is not None and payload.get('user_id') != user_id:
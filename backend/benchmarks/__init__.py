@@ -0,0 +1,10 @@
+"""
+Banc d'essai reproductible de l'API
+
+Démarre create_app sur une base de test (SQLite temporaire ou MySQL) face à des
+flux GBFS et un géocodeur Nominatim simulés en local, rejoue un mélange de trafic
+réaliste et rapporte p50/p90/p99 et requêtes par seconde par scénario. Les
+résultats sont comparés à baseline.json pour signaler les régressions.
+
+    python -m benchmarks --help
+"""
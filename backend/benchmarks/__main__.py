@@ -0,0 +1,146 @@
+"""
+Lancement du banc d'essai
+
+    python -m benchmarks                          Application en processus, SQLite temporaire, services simulés
+    python -m benchmarks --database-url mysql+pymysql://...   Même chose sur une base MySQL de test
+    python -m benchmarks --target http://localhost:5001       Serveur déjà démarré (gunicorn, uvicorn)
+    python -m benchmarks --update-baseline        Enregistre les résultats comme nouvelle référence
+
+Le code de sortie vaut 1 si une régression est détectée par rapport à la référence.
+"""
+import argparse
+import contextlib
+import json
+import os
+import sys
+import tempfile
+
+from . import runner
+from .scenarios import select
+from .upstreams import MockUpstreams
+
+DEFAULT_BASELINE = os.path.join(os.path.dirname(__file__), 'baseline.json')
+
+
+def parse_args(argv):
+    parser = argparse.ArgumentParser(prog='python -m benchmarks', description="Banc d'essai de l'API Vélib")
+    parser.add_argument('--target', help="URL d'un serveur déjà démarré (par défaut : application en processus)")
+    parser.add_argument('--database-url', help="Base de test (par défaut : fichier SQLite temporaire)")
+    parser.add_argument('--requests', type=int, default=3000, help="Nombre total de requêtes (défaut : 3000)")
+    parser.add_argument('--duration', type=float, help="Durée en secondes (remplace --requests)")
+    parser.add_argument('--concurrency', type=int, default=8, help="Clients simultanés (défaut : 8)")
+    parser.add_argument('--warmup', type=int, default=200, help="Requêtes de préchauffage non mesurées (défaut : 200)")
+    parser.add_argument('--scenarios', help="Scénarios à rejouer, séparés par des virgules (défaut : tous)")
+    parser.add_argument('--users', type=int, default=20, help="Utilisateurs de test (défaut : 20)")
+    parser.add_argument('--history', type=int, default=200, help="Recherches par utilisateur (défaut : 200)")
+    parser.add_argument('--stations', type=int, default=1500, help="Stations simulées (défaut : 1500)")
+    parser.add_argument('--upstream-latency', type=float, default=20, help="Latence des services simulés en ms (défaut : 20)")
+    parser.add_argument('--upstream-jitter', type=float, default=5, help="Variation de la latence en ms (défaut : 5)")
+    parser.add_argument('--bcrypt-rounds', type=int, default=10, help="Coût bcrypt des comptes de test (défaut : 10)")
+    parser.add_argument('--velo-ids', default='1-50', help="Vélos existants sur la cible, par exemple 1-50 (mode --target)")
+    parser.add_argument('--seed', type=int, default=42)
+    parser.add_argument('--baseline', default=DEFAULT_BASELINE, help="Fichier de référence")
+    parser.add_argument('--update-baseline', action='store_true', help="Enregistre les résultats comme référence")
+    parser.add_argument('--tolerance', type=float, default=0.25, help="Écart toléré sur p50 et req/s (défaut : 0.25)")
+    parser.add_argument('--p99-tolerance', type=float, default=0.5, help="Écart toléré sur p99 (défaut : 0.5)")
+    parser.add_argument('--json', action='store_true', help="Affiche les résultats en JSON")
+    return parser.parse_args(argv)
+
+
+def prepare_in_process(args):
+    """Démarre les services simulés et l'application, puis remplit la base de test"""
+    upstreams = MockUpstreams(args.stations, args.upstream_latency, args.upstream_jitter, seed=args.seed).start()
+    database_url = args.database_url
+    if database_url is None:
+        database_url = 'sqlite:///' + os.path.join(tempfile.mkdtemp(prefix='velib-bench-'), 'bench.db')
+
+    app = runner.create_bench_app(upstreams, database_url, args.bcrypt_rounds)
+    seeded = runner.seed_database(app, upstreams, args.users, args.history, args.seed)
+    driver = runner.InProcessDriver(app)
+    ctx = runner.build_context(driver, seeded['users'], upstreams.stations, seeded['velo_ids'])
+    return driver, ctx, upstreams
+
+
+def prepare_remote(args):
+    """Crée les comptes de test sur le serveur cible (l'inscription échoue sans gravité s'ils existent déjà)"""
+    driver = runner.HttpDriver(args.target)
+    users = []
+    for index in range(args.users):
+        user = {'email': f"bench-{index}@example.invalid", 'password': runner.BENCH_PASSWORD}
+        driver.send(runner.BenchRequest('POST', '/api/auth/register', json={
+            'username': f"bench-{index}", **user
+        }))
+        users.append(user)
+
+    status, stations = driver.send(runner.BenchRequest('GET', '/api/station/stations'))
+    if status != 200 or not stations:
+        raise RuntimeError(f"Catalogue des stations indisponible sur la cible : {status}")
+
+    first, _, last = args.velo_ids.partition('-')
+    velo_ids = list(range(int(first), int(last or first) + 1))
+    return driver, runner.build_context(driver, users, stations, velo_ids), None
+
+
+def main(argv) -> int:
+    args = parse_args(argv)
+    try:
+        mix = select(args.scenarios.split(',') if args.scenarios else None)
+    except ValueError as e:
+        print(str(e))
+        return 2
+
+    # Les messages de l'application (préchauffage, erreurs) vont sur stderr, les résultats seuls sur stdout
+    with contextlib.redirect_stdout(sys.stderr):
+        driver, ctx, upstreams = prepare_remote(args) if args.target else prepare_in_process(args)
+        try:
+            if args.warmup:
+                runner.run_load(driver, ctx, mix, args.concurrency, args.warmup, None, args.seed + 1)
+            results, elapsed = runner.run_load(
+                driver, ctx, mix, args.concurrency, None if args.duration else args.requests, args.duration, args.seed
+            )
+        finally:
+            if upstreams is not None:
+                upstreams.stop()
+
+    summary = runner.summarize(results, elapsed)
+    parameters = {
+        'target': 'http' if args.target else 'in-process',
+        'database': 'custom' if args.database_url else 'sqlite',
+        'requests': None if args.duration else args.requests,
+        'duration': args.duration,
+        'concurrency': args.concurrency,
+        'scenarios': args.scenarios,
+        'users': args.users,
+        'history': args.history,
+        'stations': args.stations,
+        'upstream_latency': args.upstream_latency,
+        'seed': args.seed
+    }
+
+    if args.update_baseline:
+        runner.write_baseline(args.baseline, summary, parameters)
+
+    baseline = None if args.update_baseline else runner.load_baseline(args.baseline)
+    regressions = []
+    if baseline is not None:
+        if baseline.get('parameters') != parameters:
+            print("Attention : paramètres différents de ceux de la référence, comparaison indicative", file=sys.stderr)
+        regressions = runner.compare(summary, baseline, args.tolerance, args.p99_tolerance)
+
+    if args.json:
+        print(json.dumps({'parameters': parameters, 'results': summary, 'regressions': regressions},
+                         ensure_ascii=False, indent=2))
+    else:
+        print(runner.format_table(summary, baseline))
+        if args.update_baseline:
+            print(f"\nRéférence enregistrée dans {args.baseline}")
+        elif baseline is None:
+            print(f"\nAucune référence ({args.baseline}) : relancer avec --update-baseline pour en créer une")
+        for regression in regressions:
+            print(f"RÉGRESSION {regression}")
+
+    return 1 if regressions else 0
+
+
+if __name__ == '__main__':
+    sys.exit(main(sys.argv[1:]))
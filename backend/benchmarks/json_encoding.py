@@ -0,0 +1,126 @@
+"""
+Temps d'encodage JSON par endpoint : fournisseur par défaut de Flask contre FastJSONProvider
+
+    python -m benchmarks.json_encoding [--repeat 200]
+
+Les réponses sont reproduites à partir des données simulées (catalogue de 1500
+stations, pages d'historique). Pour le fournisseur par défaut, la mesure inclut la
+conversion des dates en chaînes que faisaient les to_dict des modèles.
+Les corps de /api/station/stations et de /api/station/status complet ne sont
+encodés qu'une fois par instantané du flux ; leur ligne donne ce coût unitaire.
+"""
+import argparse
+import random
+import sys
+import time
+from datetime import datetime, timedelta
+from typing import Any, Callable, Dict, List
+
+from flask import Flask
+from flask.json.provider import DefaultJSONProvider
+
+from app.json_provider import FastJSONProvider, orjson
+from app.services.feed_cache import compact_status
+
+from .upstreams import MockUpstreams
+
+
+def build_payloads(seed: int = 42) -> Dict[str, Any]:
+    """Corps de réponse représentatifs des routes les plus appelées"""
+    rng = random.Random(seed)
+    upstreams = MockUpstreams(seed=seed)
+    stations = upstreams.stations
+    status = [compact_status(station) for station in upstreams.station_status(1)['data']['stations']]
+    now = datetime.utcnow()
+
+    def search_page(size: int) -> Dict[str, Any]:
+        items = []
+        for index in range(size):
+            station = rng.choice(stations)
+            items.append({
+                'id': 10000 - index, 'client_id': 1, 'recherche': station['name'],
+                'created_at': now - timedelta(minutes=7 * index, microseconds=rng.randint(0, 999999)),
+                'resultat': True, 'station_id': station['station_id'], 'lat': station['lat'], 'lon': station['lon'],
+                'station': station['name'], 'resultat_recherche': 'Station trouvée'
+            })
+        return {'success': True, 'message': "Recherches récupérées avec succès", 'data': items, 'next_cursor': 'MjAyNnwx'}
+
+    def reservation_page(size: int) -> Dict[str, Any]:
+        items = []
+        for index in range(size):
+            station = rng.choice(stations)
+            items.append({
+                'id': 5000 - index, 'confirmationID': f"RES-{index:06d}", 'id_velo': rng.randint(1, 50),
+                'client_id': 1, 'create_time': now - timedelta(hours=5 * index), 'station_id': station['station_id'],
+                'lat': station['lat'], 'lon': station['lon'], 'station': station['name'], 'type_velo': 'mechanical'
+            })
+        return {'success': True, 'message': "Réservations récupérées avec succès", 'data': items, 'next_cursor': None}
+
+    return {
+        'GET /api/station/stations': stations,
+        'GET /api/station/status (complet)': {'version': 1, 'last_updated': 0, 'full': True, 'stations': status, 'removed': []},
+        'POST /api/station/stations/status (bbox)': {'last_updated': 0, 'stations': status[:120]},
+        'GET /api/station/nearby': [dict(station, distance=rng.randint(50, 900)) for station in stations[:10]],
+        'GET /api/search/ (50)': search_page(50),
+        'GET /api/search/ (200)': search_page(200),
+        'GET /api/reservation/ (50)': reservation_page(50)
+    }
+
+
+def _with_iso_dates(obj: Any) -> Any:
+    """Chaînes ISO 8601 à la place des datetime, comme les anciens to_dict"""
+    if isinstance(obj, dict):
+        return {key: _with_iso_dates(value) for key, value in obj.items()}
+    if isinstance(obj, list):
+        return [_with_iso_dates(value) for value in obj]
+    if isinstance(obj, datetime):
+        return obj.isoformat()
+    return obj
+
+
+def _timed(func: Callable[[], Any], repeat: int) -> float:
+    """Meilleur temps d'un appel sur repeat essais, en microsecondes"""
+    best = float('inf')
+    for _ in range(repeat):
+        start = time.perf_counter()
+        func()
+        best = min(best, time.perf_counter() - start)
+    return best * 1e6
+
+
+def run(repeat: int) -> List[Dict[str, Any]]:
+    app = Flask(__name__)
+    default, fast = DefaultJSONProvider(app), FastJSONProvider(app)
+    default.compact = fast.compact = True
+
+    results = []
+    with app.app_context():
+        for endpoint, payload in build_payloads().items():
+            # Les dates du fournisseur par défaut sont converties à chaque réponse, comme avant
+            default_us = _timed(lambda: default.response(_with_iso_dates(payload)).get_data(), repeat)
+            fast_us = _timed(lambda: fast.response(payload).get_data(), repeat)
+            results.append({
+                'endpoint': endpoint,
+                'bytes': len(fast.response(payload).get_data()),
+                'default_us': round(default_us, 1),
+                'fast_us': round(fast_us, 1),
+                'speedup': round(default_us / fast_us, 1) if fast_us else None
+            })
+    return results
+
+
+def main(argv) -> int:
+    parser = argparse.ArgumentParser(prog='python -m benchmarks.json_encoding')
+    parser.add_argument('--repeat', type=int, default=200, help="Essais par endpoint (défaut : 200)")
+    args = parser.parse_args(argv)
+
+    print(f"Encodeur : {'orjson ' + orjson.__version__ if orjson is not None else 'json (orjson absent)'}")
+    print(f"{'endpoint':<42} {'octets':>9} {'défaut µs':>10} {'rapide µs':>10} {'gain':>6}")
+    for result in run(args.repeat):
+        print(f"{result['endpoint']:<42} {result['bytes']:>9} {result['default_us']:>10} "
+              f"{result['fast_us']:>10} {result['speedup']:>5}x")
+    return 0
+
+
+if __name__ == '__main__':
+    sys.exit(main(sys.argv[1:]))
@@ -0,0 +1,341 @@
+"""
+Exécution du banc d'essai : préparation, rejeu du trafic, statistiques et comparaison à la référence
+"""
+import json
+import math
+import os
+import random
+import threading
+import time
+from collections import defaultdict
+from datetime import datetime, timedelta
+from typing import Any, Dict, List, Optional, Tuple
+
+from .scenarios import BenchContext, BenchRequest, pick
+from .upstreams import STREETS, MockUpstreams
+
+BENCH_PASSWORD = 'bench-password'
+
+
+class InProcessDriver:
+    """Envoie les requêtes à l'application Flask sans passer par le réseau (un test_client par thread)"""
+
+    def __init__(self, app):
+        self.app = app
+        self._local = threading.local()
+
+    def send(self, request: BenchRequest) -> Tuple[int, Any]:
+        client = getattr(self._local, 'client', None)
+        if client is None:
+            client = self._local.client = self.app.test_client()
+        response = client.open(request.path, method=request.method, query_string=request.params,
+                               json=request.json, headers=request.headers)
+        return response.status_code, response.get_json(silent=True)
+
+
+class HttpDriver:
+    """Envoie les requêtes à un serveur déjà démarré (gunicorn, uvicorn), une session par thread"""
+
+    def __init__(self, base_url: str):
+        import requests
+
+        self.base_url = base_url.rstrip('/')
+        self._requests = requests
+        self._local = threading.local()
+
+    def send(self, request: BenchRequest) -> Tuple[int, Any]:
+        session = getattr(self._local, 'session', None)
+        if session is None:
+            session = self._local.session = self._requests.Session()
+        response = session.request(request.method, self.base_url + request.path, params=request.params,
+                                   json=request.json, headers=request.headers, timeout=30)
+        try:
+            return response.status_code, response.json()
+        except ValueError:
+            return response.status_code, None
+
+
+def create_bench_app(upstreams: MockUpstreams, database_url: str, bcrypt_rounds: int):
+    """
+    Crée l'application dirigée vers les services simulés
+
+    La configuration étant lue à l'import de app.config, les variables d'environnement
+    sont fixées avant d'importer le serveur.
+    """
+    os.environ.update(upstreams.env())
+    os.environ['DATABASE_URL'] = database_url
+    os.environ['BCRYPT_ROUNDS'] = str(bcrypt_rounds)
+    os.environ.setdefault('JWT_SECRET_KEY', 'benchmark-secret')
+
+    from server import create_app, warm_up
+
+    app = create_app()
+    warm_up(app)
+    return app
+
+
+def seed_database(app, upstreams: MockUpstreams, user_count: int, history_size: int, seed: int) -> Dict[str, Any]:
+    """
+    Crée les utilisateurs, stations, vélos et historiques du banc d'essai
+
+    Avec SQLite, les vues recherches_vue et reservations_vue sont recréées comme en production ;
+    avec MySQL, le schéma (vues comprises) doit déjà exister.
+
+    Returns:
+        dict: users (id, email, password) et velo_ids
+    """
+    from sqlalchemy import text
+    from app.extensions import db, password_hasher
+    from app.models import Recherche, Reservation, Station, User, Velo
+
+    rng = random.Random(seed)
+    with app.app_context():
+        db.create_all()
+        if db.engine.dialect.name == 'sqlite':
+            _create_sqlite_views(db)
+
+        password_hash = password_hasher.hash(BENCH_PASSWORD)
+        users = []
+        for index in range(user_count):
+            email = f"bench-{index}@example.invalid"
+            user = User.query.filter_by(email=email).first()
+            if user is None:
+                user = User(username=f"bench-{index}", email=email, password=password_hash)
+                db.session.add(user)
+                db.session.flush()
+            users.append({'id': user.id, 'email': email, 'password': BENCH_PASSWORD})
+
+        known_stations = {row[0] for row in db.session.query(Station.station_id)}
+        db.session.bulk_insert_mappings(Station, [
+            {'station_id': station['station_id'], 'lat': station['lat'], 'lon': station['lon'], 'station': station['name']}
+            for station in upstreams.stations if station['station_id'] not in known_stations
+        ])
+        velo_ids = list(range(1, 51))
+        known_velos = {row[0] for row in db.session.query(Velo.id_velo)}
+        db.session.bulk_insert_mappings(Velo, [
+            {'id_velo': velo_id, 'type': 'ebike' if velo_id % 3 == 0 else 'mechanical'}
+            for velo_id in velo_ids if velo_id not in known_velos
+        ])
+
+        # Historiques déjà remplis : la pagination lit une page parmi plusieurs centaines de lignes
+        now = datetime.utcnow()
+        searches, reservations = [], []
+        for user in users:
+            if db.session.query(Recherche.id).filter_by(client_id=user['id']).first() is not None:
+                continue
+            for index in range(history_size):
+                station = rng.choice(upstreams.stations)
+                found = rng.random() < 0.8
+                searches.append({
+                    'client_id': user['id'], 'recherche': station['name'], 'resultat': found,
+                    'station_id': station['station_id'] if found else None,
+                    'created_at': now - timedelta(minutes=index * 7)
+                })
+            for index in range(history_size // 4):
+                reservations.append({
+                    'confirmationID': f"SEED-{user['id']}-{index}", 'id_velo': rng.choice(velo_ids),
+                    'client_id': user['id'], 'station_id': rng.choice(upstreams.stations)['station_id'],
+                    'create_time': now - timedelta(hours=index * 5)
+                })
+        db.session.bulk_insert_mappings(Recherche, searches)
+        db.session.bulk_insert_mappings(Reservation, reservations)
+        db.session.commit()
+
+        # Rendre les index disponibles (bases créées avant leur déclaration dans les modèles)
+        if db.engine.dialect.name == 'sqlite':
+            db.session.execute(text('ANALYZE'))
+            db.session.commit()
+
+    return {'users': users, 'velo_ids': velo_ids}
+
+
+def _create_sqlite_views(db) -> None:
+    """Remplace les tables créées par create_all pour les modèles de vues par de vraies vues"""
+    from sqlalchemy import inspect, text
+
+    views = {
+        'recherches_vue': (
+            "SELECT r.id, r.client_id, r.recherche, r.created_at, r.resultat, r.station_id, s.lat, s.lon, s.station "
+            "FROM recherches r LEFT JOIN stations s ON s.station_id = r.station_id"
+        ),
+        'reservations_vue': (
+            "SELECT r.id, r.confirmationID, r.id_velo, r.client_id, r.create_time, r.station_id, "
+            "s.lat, s.lon, s.station, v.type "
+            "FROM reservations r LEFT JOIN stations s ON s.station_id = r.station_id "
+            "LEFT JOIN velo v ON v.id_velo = r.id_velo"
+        )
+    }
+    existing_tables = set(inspect(db.engine).get_table_names())
+    for name, query in views.items():
+        if name in existing_tables:
+            db.session.execute(text(f"DROP TABLE {name}"))
+            db.session.execute(text(f"CREATE VIEW {name} AS {query}"))
+    db.session.commit()
+
+
+def build_context(driver, users: List[Dict[str, Any]], stations: List[Dict[str, Any]],
+                  velo_ids: List[int]) -> BenchContext:
+    """Connecte chaque utilisateur du banc d'essai pour obtenir son token"""
+    for user in users:
+        status, body = driver.send(BenchRequest('POST', '/api/auth/login', json={
+            'email': user['email'], 'password': user['password']
+        }))
+        if status != 200:
+            raise RuntimeError(f"Connexion impossible pour {user['email']} : {status} {body}")
+        user['token'] = body['data']['token']
+        user['id'] = body['data']['id']
+
+    addresses = [f"{number} {street}, Paris" for street in STREETS for number in (1, 12, 25, 48)]
+    addresses += ["8 impasse inconnue, Paris", "3 allée introuvable, Paris"]
+    return BenchContext(users=users, stations=stations, velo_ids=velo_ids, street_addresses=addresses)
+
+
+def run_load(driver, ctx: BenchContext, mix: List[tuple], concurrency: int, total_requests: Optional[int],
+             duration: Optional[float], seed: int) -> Tuple[Dict[str, Dict[str, Any]], float]:
+    """
+    Rejoue le mélange de trafic sur concurrency threads
+
+    S'arrête après total_requests requêtes ou duration secondes. Chaque thread a sa
+    propre graine : à paramètres égaux, la suite des requêtes est identique.
+
+    Returns:
+        tuple: (mesures par scénario, durée totale en secondes)
+    """
+    results: Dict[str, Dict[str, Any]] = defaultdict(lambda: {'latencies': [], 'errors': 0, 'statuses': defaultdict(int)})
+    lock = threading.Lock()
+    sent = [0]
+    deadline = time.perf_counter() + duration if duration else None
+
+    def worker(index: int) -> None:
+        rng = random.Random(seed * 1000 + index)
+        while True:
+            with lock:
+                if total_requests is not None and sent[0] >= total_requests:
+                    return
+                sent[0] += 1
+            if deadline is not None and time.perf_counter() >= deadline:
+                return
+
+            name, _, scenario = pick(rng, mix)
+            request = scenario(rng, ctx)
+            start = time.perf_counter()
+            try:
+                status, _ = driver.send(request)
+            except Exception:
+                status = None
+            latency = time.perf_counter() - start
+
+            with lock:
+                entry = results[name]
+                entry['latencies'].append(latency)
+                entry['statuses'][status] += 1
+                if status is None or status >= 500:
+                    entry['errors'] += 1
+
+    threads = [threading.Thread(target=worker, args=(index,), name=f"bench-{index}") for index in range(concurrency)]
+    start = time.perf_counter()
+    for thread in threads:
+        thread.start()
+    for thread in threads:
+        thread.join()
+    return dict(results), time.perf_counter() - start
+
+
+def percentile(sorted_values: List[float], rank: float) -> float:
+    """Percentile par rang le plus proche"""
+    if not sorted_values:
+        return 0.0
+    index = max(math.ceil(rank / 100 * len(sorted_values)) - 1, 0)
+    return sorted_values[index]
+
+
+def summarize(results: Dict[str, Dict[str, Any]], elapsed: float) -> Dict[str, Dict[str, Any]]:
+    """Nombre, erreurs, débit et percentiles (ms) par scénario, plus le total"""
+    summary = {}
+    all_latencies = []
+    for name, entry in sorted(results.items()):
+        latencies = sorted(entry['latencies'])
+        all_latencies.extend(latencies)
+        summary[name] = _stats(latencies, entry['errors'], elapsed)
+        summary[name]['statuses'] = {str(status): count for status, count in sorted(entry['statuses'].items(), key=str)}
+    summary['total'] = _stats(sorted(all_latencies), sum(entry['errors'] for entry in results.values()), elapsed)
+    return summary
+
+
+def _stats(latencies: List[float], errors: int, elapsed: float) -> Dict[str, Any]:
+    return {
+        'count': len(latencies),
+        'errors': errors,
+        'rps': round(len(latencies) / elapsed, 1) if elapsed else 0.0,
+        'p50_ms': round(percentile(latencies, 50) * 1000, 3),
+        'p90_ms': round(percentile(latencies, 90) * 1000, 3),
+        'p99_ms': round(percentile(latencies, 99) * 1000, 3),
+        'max_ms': round(latencies[-1] * 1000, 3) if latencies else 0.0
+    }
+
+
+# En dessous, le p99 n'est qu'une des toutes dernières valeurs et varie trop d'une exécution à l'autre
+MIN_P99_SAMPLES = 1000
+# Écart absolu ignoré sur les endpoints de l'ordre de la milliseconde
+MIN_DELTA_MS = 2.0
+
+
+def compare(summary: Dict[str, Dict[str, Any]], baseline: Dict[str, Any], tolerance: float,
+            p99_tolerance: float) -> List[str]:
+    """
+    Liste les régressions par rapport à la référence
+
+    Une latence est en régression si elle dépasse la référence de plus de tolerance
+    (p50) ou p99_tolerance (p99, seulement à partir de MIN_P99_SAMPLES mesures) et
+    d'au moins MIN_DELTA_MS ; le débit, s'il baisse de plus de tolerance.
+    """
+    def slower(current: float, reference: float, margin: float) -> bool:
+        return current > reference * (1 + margin) and current - reference >= MIN_DELTA_MS
+
+    regressions = []
+    for name, reference in baseline.get('results', {}).items():
+        current = summary.get(name)
+        if current is None or not current['count']:
+            continue
+        if slower(current['p50_ms'], reference['p50_ms'], tolerance):
+            regressions.append(f"{name}: p50 {current['p50_ms']} ms > {reference['p50_ms']} ms (+{tolerance:.0%})")
+        if current['count'] >= MIN_P99_SAMPLES and slower(current['p99_ms'], reference['p99_ms'], p99_tolerance):
+            regressions.append(f"{name}: p99 {current['p99_ms']} ms > {reference['p99_ms']} ms (+{p99_tolerance:.0%})")
+        if current['rps'] < reference['rps'] * (1 - tolerance):
+            regressions.append(f"{name}: {current['rps']} req/s < {reference['rps']} req/s (-{tolerance:.0%})")
+        if current['errors'] > reference.get('errors', 0):
+            regressions.append(f"{name}: {current['errors']} erreurs (référence : {reference.get('errors', 0)})")
+    return regressions
+
+
+def format_table(summary: Dict[str, Dict[str, Any]], baseline: Optional[Dict[str, Any]] = None) -> str:
+    """Tableau texte des résultats, avec la variation du p50 par rapport à la référence"""
+    reference = (baseline or {}).get('results', {})
+    header = f"{'scénario':<20} {'requêtes':>8} {'erreurs':>7} {'req/s':>8} {'p50 ms':>9} {'p90 ms':>9} {'p99 ms':>9} {'max ms':>9} {'Δ p50':>7}"
+    lines = [header, '-' * len(header)]
+    for name, stats in summary.items():
+        delta = ''
+        if name in reference and reference[name]['p50_ms']:
+            delta = f"{(stats['p50_ms'] / reference[name]['p50_ms'] - 1):+.0%}"
+        lines.append(
+            f"{name:<20} {stats['count']:>8} {stats['errors']:>7} {stats['rps']:>8} {stats['p50_ms']:>9} "
+            f"{stats['p90_ms']:>9} {stats['p99_ms']:>9} {stats['max_ms']:>9} {delta:>7}"
+        )
+    return '\n'.join(lines)
+
+
+def load_baseline(path: str) -> Optional[Dict[str, Any]]:
+    if not os.path.exists(path):
+        return None
+    with open(path, encoding='utf-8') as f:
+        return json.load(f)
+
+
+def write_baseline(path: str, summary: Dict[str, Dict[str, Any]], parameters: Dict[str, Any]) -> None:
+    results = {
+        name: {key: stats[key] for key in ('count', 'errors', 'rps', 'p50_ms', 'p99_ms')}
+        for name, stats in summary.items()
+    }
+    with open(path, 'w', encoding='utf-8') as f:
+        json.dump({'parameters': parameters, 'results': results}, f, ensure_ascii=False, indent=2)
+        f.write('\n')
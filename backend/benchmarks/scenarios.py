@@ -0,0 +1,127 @@
+"""
+Mélange de trafic rejoué par le banc d'essai
+
+Chaque scénario construit une requête à partir d'un générateur aléatoire à
+graine fixe et du contexte (utilisateurs, stations) ; le poids fixe la part du
+scénario dans le trafic.
+"""
+import random
+from dataclasses import dataclass, field
+from typing import Any, Dict, List, Optional
+
+
+@dataclass
+class BenchRequest:
+    method: str
+    path: str
+    params: Optional[Dict[str, Any]] = None
+    json: Optional[Dict[str, Any]] = None
+    headers: Dict[str, str] = field(default_factory=dict)
+
+
+@dataclass
+class BenchContext:
+    users: List[Dict[str, Any]]  # id, email, password, token
+    stations: List[Dict[str, Any]]
+    velo_ids: List[int]
+    street_addresses: List[str]
+
+
+def _auth(user: Dict[str, Any]) -> Dict[str, str]:
+    return {'Authorization': f"Bearer {user['token']}"}
+
+
+def map_load(rng: random.Random, ctx: BenchContext) -> BenchRequest:
+    return BenchRequest('GET', '/api/station/stations')
+
+
+def stations_status(rng: random.Random, ctx: BenchContext) -> BenchRequest:
+    # Stations visibles sur une carte zoomée : une emprise d'environ 1,5 km
+    center = rng.choice(ctx.stations)
+    return BenchRequest('POST', '/api/station/stations/status', json={
+        'bbox': [center['lat'] - 0.007, center['lon'] - 0.01, center['lat'] + 0.007, center['lon'] + 0.01]
+    })
+
+
+def nearby(rng: random.Random, ctx: BenchContext) -> BenchRequest:
+    station = rng.choice(ctx.stations)
+    return BenchRequest('GET', '/api/station/nearby', params={
+        'lat': station['lat'] + rng.uniform(-0.003, 0.003), 'lon': station['lon'] + rng.uniform(-0.003, 0.003), 'k': 10
+    })
+
+
+def suggest(rng: random.Random, ctx: BenchContext) -> BenchRequest:
+    name = rng.choice(ctx.stations)['name']
+    return BenchRequest('GET', '/api/search/suggest', params={'q': name[:rng.randint(2, 6)], 'limit': 8})
+
+
+def search_station(rng: random.Random, ctx: BenchContext) -> BenchRequest:
+    user = rng.choice(ctx.users)
+    name = rng.choice(ctx.stations)['name']
+    # Un tiers des saisies sont approximatives (minuscules, sans accents, tronquées)
+    if rng.random() < 0.33:
+        name = name.lower().replace('é', 'e').replace('è', 'e')[:max(len(name) - 3, 4)]
+    return BenchRequest('POST', '/api/search/', json={'user_id': user['id'], 'search': name}, headers=_auth(user))
+
+
+def search_address(rng: random.Random, ctx: BenchContext) -> BenchRequest:
+    user = rng.choice(ctx.users)
+    return BenchRequest('POST', '/api/search/', json={
+        'user_id': user['id'], 'search': rng.choice(ctx.street_addresses)
+    }, headers=_auth(user))
+
+
+def search_history(rng: random.Random, ctx: BenchContext) -> BenchRequest:
+    user = rng.choice(ctx.users)
+    return BenchRequest('GET', '/api/search/', params={'user_id': user['id']}, headers=_auth(user))
+
+
+def reservation_history(rng: random.Random, ctx: BenchContext) -> BenchRequest:
+    user = rng.choice(ctx.users)
+    return BenchRequest('GET', '/api/reservation/', params={'user_id': user['id']}, headers=_auth(user))
+
+
+def reservation_create(rng: random.Random, ctx: BenchContext) -> BenchRequest:
+    user = rng.choice(ctx.users)
+    return BenchRequest('POST', '/api/reservation/', json={
+        'user_id': user['id'],
+        'confirmationID': f"BENCH-{rng.getrandbits(40):010x}",
+        'id_velo': rng.choice(ctx.velo_ids),
+        'station_id': rng.choice(ctx.stations)['station_id']
+    }, headers=_auth(user))
+
+
+def login(rng: random.Random, ctx: BenchContext) -> BenchRequest:
+    user = rng.choice(ctx.users)
+    return BenchRequest('POST', '/api/auth/login', json={'email': user['email'], 'password': user['password']})
+
+
+# (nom, poids, scénario) : ouverture de l'application, recherches, historiques, réservations, connexions
+TRAFFIC_MIX: List[tuple] = [
+    ('map_load', 15, map_load),
+    ('stations_status', 20, stations_status),
+    ('nearby', 10, nearby),
+    ('suggest', 12, suggest),
+    ('search_station', 15, search_station),
+    ('search_address', 5, search_address),
+    ('search_history', 8, search_history),
+    ('reservation_history', 6, reservation_history),
+    ('reservation_create', 4, reservation_create),
+    ('login', 5, login)
+]
+
+
+def pick(rng: random.Random, mix: List[tuple]) -> tuple:
+    """Tire un scénario selon les poids du mélange"""
+    return rng.choices(mix, weights=[weight for _, weight, _ in mix])[0]
+
+
+def select(names: Optional[List[str]]) -> List[tuple]:
+    """Restreint le mélange aux scénarios nommés (tous si names est vide)"""
+    if not names:
+        return TRAFFIC_MIX
+    unknown = set(names) - {name for name, _, _ in TRAFFIC_MIX}
+    if unknown:
+        raise ValueError(f"Scénarios inconnus : {', '.join(sorted(unknown))}")
+    return [scenario for scenario in TRAFFIC_MIX if scenario[0] in names]
+
@@ -0,0 +1,176 @@
+"""
+Services externes simulés : flux GBFS Vélib et géocodage Nominatim
+
+Les données sont déterministes (graine fixe) et chaque réponse peut être retardée
+d'une latence configurable, pour reproduire des appels réseau sans dépendre des
+hôtes réels.
+"""
+import json
+import random
+import threading
+import time
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+from typing import Dict, List, Optional
+from urllib.parse import parse_qs, urlsplit
+
+PLACES = [
+    "Gare de Lyon", "Bastille", "République", "Châtelet", "Saint-Michel", "Odéon", "Nation", "Place d'Italie",
+    "Montparnasse", "Gare du Nord", "Gare de l'Est", "Opéra", "Trocadéro", "Denfert-Rochereau", "Bercy",
+    "Belleville", "Pigalle", "Invalides", "Alésia", "Porte de Versailles", "Jussieu", "Concorde", "Oberkampf",
+    "Ménilmontant", "Parmentier", "Voltaire", "Daumesnil", "Tolbiac", "Convention", "Vaugirard"
+]
+STREETS = [
+    "Rue de Rivoli", "Boulevard Voltaire", "Avenue de la République", "Rue de la Roquette", "Rue Oberkampf",
+    "Boulevard Saint-Germain", "Rue de Vaugirard", "Avenue d'Italie", "Rue de Charonne", "Boulevard Magenta",
+    "Rue du Faubourg Saint-Antoine", "Avenue des Gobelins", "Rue de Belleville", "Quai de la Loire", "Rue Lecourbe"
+]
+
+
+def build_stations(count: int, seed: int = 42) -> List[Dict]:
+    """Stations fictives réparties sur Paris, avec des noms uniques de la forme « Lieu - Rue »"""
+    rng = random.Random(seed)
+    stations = []
+    for index in range(count):
+        place = PLACES[index % len(PLACES)]
+        street = STREETS[(index // len(PLACES)) % len(STREETS)]
+        suffix = index // (len(PLACES) * len(STREETS))
+        stations.append({
+            'station_id': 100000 + index,
+            'stationCode': str(10000 + index),
+            'name': f"{place} - {street}" + (f" {suffix + 1}" if suffix else ''),
+            'lat': round(48.815 + rng.random() * 0.085, 6),
+            'lon': round(2.255 + rng.random() * 0.16, 6),
+            'capacity': rng.choice((20, 25, 30, 35, 40))
+        })
+    return stations
+
+
+class MockUpstreams:
+    """Serveur HTTP local qui sert /station_information.json, /station_status.json et /search"""
+
+    def __init__(self, station_count: int = 1500, latency_ms: float = 0, jitter_ms: float = 0,
+                 status_interval: float = 30, change_ratio: float = 0.1, seed: int = 42):
+        self.stations = build_stations(station_count, seed)
+        self.latency_ms = latency_ms
+        self.jitter_ms = jitter_ms
+        self.status_interval = status_interval
+        # Une station change de compteurs une version sur change_every
+        self.change_every = max(round(1 / change_ratio), 1) if change_ratio > 0 else None
+        self.hits: Dict[str, int] = {}
+        self._rng = random.Random(seed)
+        self._started_at = time.time()
+        self._server: Optional[ThreadingHTTPServer] = None
+        self._lock = threading.Lock()
+
+    @property
+    def base_url(self) -> str:
+        host, port = self._server.server_address[:2]
+        return f"http://{host}:{port}"
+
+    def env(self) -> Dict[str, str]:
+        """Variables d'environnement qui dirigent l'application vers ces services"""
+        return {
+            'VELIB_STATION_INFORMATION_URL': f"{self.base_url}/station_information.json",
+            'VELIB_STATION_STATUS_URL': f"{self.base_url}/station_status.json",
+            'NOMINATIM_URL': f"{self.base_url}/search"
+        }
+
+    def start(self, host: str = '127.0.0.1', port: int = 0) -> 'MockUpstreams':
+        upstreams = self
+
+        class Handler(BaseHTTPRequestHandler):
+            protocol_version = 'HTTP/1.1'
+
+            def log_message(self, *args):
+                pass
+
+            def do_GET(self):
+                upstreams.handle(self)
+
+        self._server = ThreadingHTTPServer((host, port), Handler)
+        self._server.daemon_threads = True
+        threading.Thread(target=self._server.serve_forever, name='mock-upstreams', daemon=True).start()
+        return self
+
+    def stop(self) -> None:
+        if self._server is not None:
+            self._server.shutdown()
+            self._server.server_close()
+
+    def version(self) -> int:
+        """Numéro de l'état courant du flux de disponibilité (change toutes les status_interval secondes)"""
+        return int((time.time() - self._started_at) // self.status_interval)
+
+    def station_information(self) -> Dict:
+        return {'last_updated': int(self._started_at), 'ttl': 3600, 'data': {'stations': self.stations}}
+
+    def station_status(self, version: int) -> Dict:
+        """Disponibilité à une version donnée : environ change_ratio des stations diffèrent de la version précédente"""
+        stations = []
+        for index, station in enumerate(self.stations):
+            period = (version + index) // self.change_every if self.change_every else 0
+            rng = random.Random(station['station_id'] * 1000003 + period)
+            mechanical = rng.randint(0, station['capacity'] // 2)
+            ebike = rng.randint(0, station['capacity'] // 4)
+            stations.append({
+                'station_id': station['station_id'],
+                'stationCode': station['stationCode'],
+                'num_bikes_available': mechanical + ebike,
+                'num_bikes_available_types': [{'mechanical': mechanical}, {'ebike': ebike}],
+                'num_docks_available': station['capacity'] - mechanical - ebike,
+                'is_installed': 1,
+                'is_renting': 1,
+                'is_returning': 1,
+                'last_reported': int(self._started_at) + version * int(self.status_interval)
+            })
+        return {
+            'last_updated': int(self._started_at) + version * int(self.status_interval),
+            'ttl': int(self.status_interval),
+            'data': {'stations': stations}
+        }
+
+    def geocode(self, query: str) -> List[Dict]:
+        """Une adresse est trouvée si elle contient un nom de rue connu, sinon aucun résultat"""
+        lowered = query.lower()
+        for index, street in enumerate(STREETS):
+            if street.lower() in lowered:
+                return [{'lat': str(48.83 + index * 0.004), 'lon': str(2.30 + index * 0.005), 'display_name': query}]
+        return []
+
+    def handle(self, handler: BaseHTTPRequestHandler) -> None:
+        url = urlsplit(handler.path)
+        with self._lock:
+            self.hits[url.path] = self.hits.get(url.path, 0) + 1
+            delay = max(self.latency_ms + self._rng.uniform(-self.jitter_ms, self.jitter_ms), 0) / 1000
+        if delay:
+            time.sleep(delay)
+
+        etag = None
+        if url.path == '/station_information.json':
+            body, etag = self.station_information(), '"info"'
+        elif url.path == '/station_status.json':
+            version = self.version()
+            body, etag = self.station_status(version), f'"status-{version}"'
+        elif url.path == '/search':
+            body = self.geocode(parse_qs(url.query).get('q', [''])[0])
+        else:
+            handler.send_response(404)
+            handler.send_header('Content-Length', '0')
+            handler.end_headers()
+            return
+
+        if etag is not None and handler.headers.get('If-None-Match') == etag:
+            handler.send_response(304)
+            handler.send_header('ETag', etag)
+            handler.send_header('Content-Length', '0')
+            handler.end_headers()
+            return
+
+        payload = json.dumps(body).encode()
+        handler.send_response(200)
+        handler.send_header('Content-Type', 'application/json')
+        if etag is not None:
+            handler.send_header('ETag', etag)
+        handler.send_header('Content-Length', str(len(payload)))
+        handler.end_headers()
+        handler.wfile.write(payload)
@@ -0,0 +1,130 @@
+"""
+Débit et reprise après panne de l'écriture différée de l'historique des recherches
+
+    python -m benchmarks.write_behind [--rows 5000] [--outage-rows 500]
+
+Mesure le débit de la file (enqueue) et de l'écriture par lots sur une base SQLite
+temporaire, puis simule une panne de la base : la table recherches est supprimée,
+ce qui fait répondre SQLite par une OperationalError comme une base injoignable.
+Les lignes reçues pendant la panne doivent partir dans le fichier de secours, puis
+être rejouées sans redémarrage dès que la table est recréée et qu'un lot est de
+nouveau écrit. Le code de sortie vaut 1 si une ligne est perdue ou rejetée, ou si
+le fichier de secours n'est pas rejoué.
+"""
+import argparse
+import contextlib
+import os
+import sys
+import tempfile
+import time
+from typing import Any, Callable, Dict
+
+
+def wait_until(condition: Callable[[], bool], timeout: float) -> bool:
+    """Attend que condition() soit vraie ; False si le délai expire"""
+    deadline = time.monotonic() + timeout
+    while not condition():
+        if time.monotonic() >= deadline:
+            return False
+        time.sleep(0.01)
+    return True
+
+
+def run(rows: int, outage_rows: int, timeout: float) -> Dict[str, Any]:
+    """Exécute les trois phases (débit, panne, reprise) et renvoie les mesures et les problèmes constatés"""
+    directory = tempfile.mkdtemp(prefix='velib-write-behind-')
+    fallback_path = os.path.join(directory, 'pending.jsonl')
+    # La configuration est lue à l'import de app.config : variables fixées avant d'importer le serveur
+    os.environ['DATABASE_URL'] = 'sqlite:///' + os.path.join(directory, 'bench.db')
+    os.environ['SEARCH_WRITE_BEHIND'] = 'true'
+    os.environ['SEARCH_WRITE_BEHIND_FALLBACK_PATH'] = fallback_path
+    os.environ['SEARCH_WRITE_BEHIND_DEAD_LETTER_PATH'] = os.path.join(directory, 'rejected.jsonl')
+    os.environ.setdefault('JWT_SECRET_KEY', 'benchmark-secret')
+
+    from server import create_app
+    from app.extensions import db, search_history
+    from app.models import User
+    from app.models.recherche_model import Recherche
+
+    app = create_app()
+    with app.app_context():
+        db.create_all()
+        db.session.add(User(id=1, username='bench', email='bench@example.invalid', password='x'))
+        db.session.commit()
+
+    def row(index: int) -> Dict[str, Any]:
+        return {'client_id': 1, 'recherche': f"recherche {index}", 'station_id': None, 'resultat': True}
+
+    def stored() -> int:
+        with app.app_context():
+            try:
+                return Recherche.query.count()
+            finally:
+                db.session.remove()
+
+    problems = []
+    results: Dict[str, Any] = {}
+
+    # 1. Débit : file puis écriture par lots
+    start = time.perf_counter()
+    for index in range(rows):
+        if not search_history.enqueue(row(index)):
+            problems.append(f"ligne {index} refusée par la file")
+            break
+    results['enqueue_per_s'] = round(rows / (time.perf_counter() - start))
+    if not wait_until(lambda: search_history.stats()['written'] >= rows, timeout):
+        problems.append(f"écriture incomplète : {search_history.stats()['written']}/{rows}")
+    results['written_per_s'] = round(rows / (time.perf_counter() - start))
+
+    # 2. Panne : les lignes partent dans le fichier de secours
+    with app.app_context():
+        Recherche.__table__.drop(db.engine)
+    for index in range(outage_rows):
+        search_history.enqueue(row(rows + index))
+    if not wait_until(lambda: search_history.stats()['spilled'] >= outage_rows, timeout):
+        problems.append(f"lignes non mises de côté : {search_history.stats()['spilled']}/{outage_rows}")
+
+    # 3. Reprise : le prochain lot écrit déclenche le rejeu, sans redémarrer le processus
+    with app.app_context():
+        Recherche.__table__.create(db.engine)
+    search_history.replay_interval = 0
+    start = time.perf_counter()
+    search_history.enqueue(row(rows + outage_rows))
+    expected = outage_rows + 1
+    if not wait_until(lambda: stored() >= expected and not os.path.exists(fallback_path), timeout):
+        problems.append(f"fichier de secours non rejoué : {stored()}/{expected} lignes en base")
+    results['replay_ms'] = round((time.perf_counter() - start) * 1000, 1)
+
+    search_history.close()
+    stats = search_history.stats()
+    results.update({key: stats[key] for key in ('written', 'spilled', 'replayed', 'dead_lettered', 'failures')})
+    results['stored_after_outage'] = stored()
+    if stats['dead_lettered']:
+        problems.append(f"{stats['dead_lettered']} lignes rejetées")
+    if results['stored_after_outage'] != expected:
+        problems.append(f"{results['stored_after_outage']} lignes en base après la reprise, {expected} attendues")
+    results['problems'] = problems
+    return results
+
+
+def main(argv) -> int:
+    parser = argparse.ArgumentParser(prog='python -m benchmarks.write_behind')
+    parser.add_argument('--rows', type=int, default=5000, help="Lignes écrites avant la panne (défaut : 5000)")
+    parser.add_argument('--outage-rows', type=int, default=500, help="Lignes reçues pendant la panne (défaut : 500)")
+    parser.add_argument('--timeout', type=float, default=30, help="Délai maximal de chaque phase en secondes (défaut : 30)")
+    args = parser.parse_args(argv)
+
+    # Les messages de l'application (erreurs de la panne simulée) vont sur stderr, les résultats seuls sur stdout
+    with contextlib.redirect_stdout(sys.stderr):
+        results = run(args.rows, args.outage_rows, args.timeout)
+
+    for key, value in results.items():
+        if key != 'problems':
+            print(f"{key:<22} {value}")
+    for problem in results['problems']:
+        print(f"ÉCHEC {problem}")
+    return 1 if results['problems'] else 0
+
+
+if __name__ == '__main__':
+    sys.exit(main(sys.argv[1:]))
@@ -0,0 +1,38 @@
+"""
+Configuration gunicorn pour la production
+
+Exemple : gunicorn -c gunicorn.conf.py wsgi:app
+"""
+import multiprocessing
+import os
+
+bind = f"0.0.0.0:{os.environ.get('PORT', 5001)}"
+
+# Workers pré-forkés, chacun avec quelques threads pour les appels en attente d'E/S
+workers = int(os.environ.get('WEB_CONCURRENCY', multiprocessing.cpu_count() * 2 + 1))
+worker_class = 'gthread'
+threads = int(os.environ.get('GUNICORN_THREADS', 4))
+
+# Charger l'application (et préchauffer les caches) une seule fois dans le processus maître
+preload_app = True
+
+timeout = int(os.environ.get('GUNICORN_TIMEOUT', 30))
+keepalive = 5
+max_requests = int(os.environ.get('GUNICORN_MAX_REQUESTS', 0))
+max_requests_jitter = int(os.environ.get('GUNICORN_MAX_REQUESTS_JITTER', 0))
+
+
+def post_fork(server, worker):
+    """Abandonne les connexions MySQL héritées du maître : chaque worker ouvre les siennes"""
+    from wsgi import app
+    from app.extensions import db
+
+    with app.app_context():
+        db.engine.dispose(close=False)
+
+
+def worker_exit(server, worker):
+    """Écrit les recherches encore en file d'attente avant l'arrêt du worker"""
+    from app.extensions import search_history
+
+    search_history.close()
@@ -0,0 +1,95 @@
+"""
+Migrations versionnées du schéma de la base de données
+
+Chaque module de migrations/versions (v0001_..., v0002_...) définit VERSION,
+DESCRIPTION, upgrade(connection) et downgrade(connection). Les versions
+appliquées sont enregistrées dans la table schema_migrations.
+
+Exemple : python -m migrations upgrade
+"""
+import importlib
+import pkgutil
+from datetime import datetime
+from types import ModuleType
+from typing import List, Optional
+
+from sqlalchemy import Column, DateTime, MetaData, String, Table, inspect
+
+from . import versions as versions_package
+
+metadata = MetaData()
+
+schema_migrations = Table(
+    'schema_migrations', metadata,
+    Column('version', String(32), primary_key=True),
+    Column('description', String(255)),
+    Column('applied_at', DateTime, default=datetime.utcnow)
+)
+
+
+def available_versions() -> List[ModuleType]:
+    """Modules de migration triés par numéro de version"""
+    modules = [
+        importlib.import_module(f"{versions_package.__name__}.{info.name}")
+        for info in pkgutil.iter_modules(versions_package.__path__)
+        if info.name.startswith('v')
+    ]
+    return sorted(modules, key=lambda module: module.VERSION)
+
+
+def applied_versions(connection) -> List[str]:
+    """Versions déjà appliquées à la base"""
+    schema_migrations.create(bind=connection, checkfirst=True)
+    return [row.version for row in connection.execute(schema_migrations.select().order_by(schema_migrations.c.version))]
+
+
+def upgrade(engine, target: Optional[str] = None) -> List[str]:
+    """
+    Applique les migrations manquantes, jusqu'à target inclus
+
+    Returns:
+        List[str]: Versions appliquées par cet appel
+    """
+    done = []
+    with engine.begin() as connection:
+        applied = set(applied_versions(connection))
+
+    for module in available_versions():
+        if target is not None and module.VERSION > target:
+            break
+        if module.VERSION in applied:
+            continue
+
+        # Une transaction par version (MySQL valide de toute façon chaque DDL immédiatement)
+        with engine.begin() as connection:
+            module.upgrade(connection)
+            connection.execute(schema_migrations.insert().values(version=module.VERSION, description=module.DESCRIPTION))
+        done.append(module.VERSION)
+    return done
+
+
+def downgrade(engine, target: str) -> List[str]:
+    """
+    Annule les migrations appliquées postérieures à target
+
+    Returns:
+        List[str]: Versions annulées par cet appel
+    """
+    done = []
+    with engine.begin() as connection:
+        applied = set(applied_versions(connection))
+
+    for module in reversed(available_versions()):
+        if module.VERSION <= target or module.VERSION not in applied:
+            continue
+
+        with engine.begin() as connection:
+            module.downgrade(connection)
+            connection.execute(schema_migrations.delete().where(schema_migrations.c.version == module.VERSION))
+        done.append(module.VERSION)
+    return done
+
+
+def index_exists(connection, table_name: str, index_name: str) -> bool:
+    """Indique si l'index existe déjà (par exemple créé par db.create_all)"""
+    return any(index['name'] == index_name for index in inspect(connection).get_indexes(table_name))
@@ -0,0 +1,59 @@
+"""
+Commandes des migrations
+
+    python -m migrations upgrade [version]     Applique les migrations manquantes
+    python -m migrations downgrade <version>   Revient à la version indiquée
+    python -m migrations status                Versions disponibles et appliquées
+    python -m migrations check                 Vérifie par EXPLAIN les plans des requêtes d'historique
+"""
+import sys
+
+from server import create_app
+from app.extensions import db
+
+from . import applied_versions, available_versions, downgrade, upgrade
+from .explain import check_history_plans
+
+
+def main(argv) -> int:
+    if not argv or argv[0] not in ('upgrade', 'downgrade', 'status', 'check'):
+        print(__doc__)
+        return 2
+
+    command, args = argv[0], argv[1:]
+    app = create_app()
+    with app.app_context():
+        engine = db.engine
+
+        if command == 'upgrade':
+            done = upgrade(engine, args[0] if args else None)
+            print(f"Migrations appliquées : {', '.join(done) or 'aucune'}")
+
+        elif command == 'downgrade':
+            if not args:
+                print("Version cible manquante")
+                return 2
+            done = downgrade(engine, args[0])
+            print(f"Migrations annulées : {', '.join(done) or 'aucune'}")
+
+        elif command == 'status':
+            with engine.begin() as connection:
+                applied = set(applied_versions(connection))
+            for module in available_versions():
+                state = 'appliquée' if module.VERSION in applied else 'en attente'
+                print(f"{module.VERSION}  {state:<10}  {module.DESCRIPTION}")
+
+        else:
+            reports = check_history_plans(engine)
+            for report in reports:
+                print(f"[{'OK' if report['ok'] else 'ÉCHEC'}] {report['query']}")
+                print(f"    {report['plan']}")
+                for problem in report['problems']:
+                    print(f"    - {problem}")
+            return 0 if all(report['ok'] for report in reports) else 1
+
+    return 0
+
+
+if __name__ == '__main__':
+    sys.exit(main(sys.argv[1:]))
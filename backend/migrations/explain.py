@@ -0,0 +1,173 @@
+"""
+Vérification par EXPLAIN des plans d'exécution des requêtes d'historique
+
+Les requêtes vérifiées sont celles que construisent SearchService et
+ReservationService (vues recherches_vue et reservations_vue, filtre sur
+l'utilisateur, curseur, tri par date puis id), compilées pour le dialecte de la
+base. Le plan attendu lit la table d'historique par l'index composite, sans tri
+(filesort) ni table temporaire, et lit les tables jointes par clé : aucune table
+n'est parcourue en entier. Avec un curseur ou une date since, la borne sur la date
+doit faire partie de la recherche dans l'index (parcours d'intervalle sur
+(client_id, date)) : un filtre appliqué ligne à ligne après la recherche sur
+client_id relirait tout l'historique qui précède la page.
+"""
+import json
+from datetime import datetime
+from typing import Any, Dict, List, Optional, Tuple
+
+from flask import current_app
+from sqlalchemy import bindparam, text
+
+from app.services.pagination import encode_cursor
+from app.services.reservation_service import ReservationService
+from app.services.search_service import SearchService
+
+CURSOR_DATE = datetime(2024, 1, 1)
+
+
+def history_queries() -> List[Tuple[str, str, Any, Optional[Tuple[str, str]]]]:
+    """
+    Requêtes des services, avec la taille de page par défaut (contexte d'application requis)
+
+    Returns:
+        List[Tuple[str, str, Any, Optional[Tuple[str, str]]]]: (description, index attendu,
+        instruction SELECT, borne attendue dans l'index sous la forme (colonne, opérateur) ou None)
+    """
+    search_limit = current_app.config['SEARCH_HISTORY_PAGE_SIZE']
+    reservation_limit = current_app.config['RESERVATION_HISTORY_PAGE_SIZE']
+    cursor = encode_cursor(CURSOR_DATE, 1000)
+    return [
+        (
+            "Historique des recherches, première page",
+            'ix_recherches_client_created',
+            SearchService.history_query(1, search_limit).statement,
+            None
+        ),
+        (
+            "Historique des recherches, page suivante",
+            'ix_recherches_client_created',
+            SearchService.history_query(1, search_limit, cursor).statement,
+            ('created_at', '<')
+        ),
+        (
+            "Historique des réservations, première page",
+            'ix_reservations_client_create_time',
+            ReservationService.history_query(1, reservation_limit).statement,
+            None
+        ),
+        (
+            "Historique des réservations, page suivante",
+            'ix_reservations_client_create_time',
+            ReservationService.history_query(1, reservation_limit, cursor).statement,
+            ('create_time', '<')
+        ),
+        (
+            "Nouvelles réservations (paramètre since)",
+            'ix_reservations_client_create_time',
+            ReservationService.history_query(1, reservation_limit, since=CURSOR_DATE).statement,
+            ('create_time', '>')
+        )
+    ]
+
+
+def check_history_plans(engine) -> List[Dict[str, Any]]:
+    """
+    Exécute EXPLAIN sur chaque requête d'historique
+
+    Returns:
+        List[Dict[str, Any]]: Un rapport par requête (ok, plan, problems)
+    """
+    reports = []
+    with engine.connect() as connection:
+        for description, index_name, statement, bound in history_queries():
+            sql, binds = _compile(statement, engine.dialect)
+            if engine.dialect.name == 'sqlite':
+                plan, problems = _explain_sqlite(connection, index_name, sql, binds, bound)
+            else:
+                plan, problems = _explain_mysql(connection, index_name, sql, binds, bound)
+            reports.append({'query': description, 'ok': not problems, 'plan': plan, 'problems': problems})
+    return reports
+
+
+def _compile(statement, dialect):
+    """SQL de l'instruction pour ce dialecte, avec des paramètres nommés typés (réutilisables par text())"""
+    compiled = statement.compile(dialect=type(dialect)(paramstyle='named'))
+    binds = [bindparam(name, value, type_=compiled.binds[name].type) for name, value in compiled.params.items()]
+    return str(compiled), binds
+
+
+def _explain_mysql(connection, index_name: str, sql: str, binds, bound: Optional[Tuple[str, str]]):
+    rows = [dict(row._mapping) for row in connection.execute(text(f"EXPLAIN {sql}").bindparams(*binds))]
+    problems = []
+    history = [row for row in rows if row.get('key') == index_name]
+    if not history:
+        problems.append(f"index {index_name} non utilisé")
+    elif bound is None:
+        if history[0].get('type') not in ('ref', 'range'):
+            problems.append(f"type d'accès {history[0].get('type')} sur {index_name} (ref attendu)")
+    elif history[0].get('type') != 'range':
+        problems.append(f"type d'accès {history[0].get('type')} sur {index_name} (range sur {bound[0]} attendu)")
+    else:
+        # key_len ne nomme pas les colonnes : EXPLAIN FORMAT=JSON donne les parties de l'index utilisées
+        document = connection.execute(text(f"EXPLAIN FORMAT=JSON {sql}").bindparams(*binds)).scalar()
+        key_parts = _used_key_parts(json.loads(document), index_name)
+        if bound[0] not in key_parts:
+            problems.append(
+                f"borne sur {bound[0]} hors de l'index {index_name} "
+                f"(parties utilisées : {', '.join(key_parts) or 'aucune'}, key_len={history[0].get('key_len')})"
+            )
+    for row in rows:
+        extra = row.get('Extra') or ''
+        if 'Using filesort' in extra:
+            problems.append(f"tri supplémentaire sur {row.get('table')} (Using filesort)")
+        if 'Using temporary' in extra:
+            problems.append(f"table temporaire pour {row.get('table')} (Using temporary)")
+        if row.get('type') in ('ALL', 'index'):
+            problems.append(f"parcours complet de {row.get('table')} (type={row.get('type')})")
+    plan = ' | '.join(
+        f"{row.get('table')}: type={row.get('type')} key={row.get('key')} key_len={row.get('key_len')} "
+        f"rows={row.get('rows')} extra={row.get('Extra') or ''}"
+        for row in rows
+    )
+    return plan, problems
+
+
+def _used_key_parts(node, index_name: str) -> List[str]:
+    """Colonnes de index_name utilisées par l'accès, dans le plan EXPLAIN FORMAT=JSON"""
+    if isinstance(node, dict):
+        if node.get('key') == index_name:
+            return list(node.get('used_key_parts', []))
+        children = node.values()
+    elif isinstance(node, list):
+        children = node
+    else:
+        return []
+    for child in children:
+        key_parts = _used_key_parts(child, index_name)
+        if key_parts:
+            return key_parts
+    return []
+
+
+def _explain_sqlite(connection, index_name: str, sql: str, binds, bound: Optional[Tuple[str, str]]):
+    details = [row.detail for row in connection.execute(text(f"EXPLAIN QUERY PLAN {sql}").bindparams(*binds))]
+    plan = ' | '.join(details)
+    problems = []
+    searches = [
+        detail for detail in details
+        if detail.startswith('SEARCH') and (f"USING INDEX {index_name} " in detail
+                                            or f"USING COVERING INDEX {index_name} " in detail)
+    ]
+    if not searches:
+        problems.append(f"recherche par l'index {index_name} attendue")
+    elif bound is not None:
+        # SQLite affiche < pour < comme pour <= (et > pour >=)
+        expected = f"(client_id=? AND {bound[0]}{bound[1]}?)"
+        if not any(expected in detail for detail in searches):
+            problems.append(f"borne sur {bound[0]} hors de la recherche dans l'index : {expected} attendu")
+    if 'TEMP B-TREE' in plan:
+        problems.append("tri supplémentaire (USE TEMP B-TREE)")
+    for detail in details:
+        if detail.startswith('SCAN'):
+            problems.append(f"parcours complet ({detail})")
+    return plan, problems
@@ -0,0 +1,3 @@
+"""
+Versions des migrations (un module par version, appliquées dans l'ordre)
+"""
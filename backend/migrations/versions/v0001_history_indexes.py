@@ -0,0 +1,37 @@
+"""
+Index composites des historiques de recherches et de réservations
+
+Les historiques sont filtrés par utilisateur et triés par date puis par id
+(pagination par curseur) : l'index (client_id, date) permet un parcours
+d'intervalle dans l'ordre, sans tri. InnoDB ajoute la clé primaire id à chaque
+index secondaire, ce qui rend l'index couvrant pour la recherche de la page.
+"""
+from sqlalchemy import Column, Index, MetaData, Table
+
+from .. import index_exists
+
+VERSION = '0001'
+DESCRIPTION = "Index des historiques de recherches et de réservations"
+
+# Tables réduites aux colonnes indexées : la migration ne dépend pas de l'état futur des modèles
+metadata = MetaData()
+recherches = Table('recherches', metadata, Column('client_id'), Column('created_at'))
+reservations = Table('reservations', metadata, Column('client_id'), Column('create_time'), Column('confirmationID'))
+
+INDEXES = [
+    Index('ix_recherches_client_created', recherches.c.client_id, recherches.c.created_at),
+    Index('ix_reservations_client_create_time', reservations.c.client_id, reservations.c.create_time),
+    Index('ix_reservations_confirmation', reservations.c.confirmationID)
+]
+
+
+def upgrade(connection) -> None:
+    for index in INDEXES:
+        if not index_exists(connection, index.table.name, index.name):
+            index.create(bind=connection)
+
+
+def downgrade(connection) -> None:
+    for index in reversed(INDEXES):
+        if index_exists(connection, index.table.name, index.name):
+            index.drop(bind=connection)
@@ -0,0 +1,31 @@
+"""
+Table geocodes du cache persistant des géocodages Nominatim
+
+Une ligne par terme de recherche normalisé (ou empreinte du terme brut) ; lat et
+lon NULL pour une adresse introuvable. Les lignes expirées sont ignorées à la
+lecture et remplacées à la prochaine écriture.
+"""
+from sqlalchemy import Column, DateTime, Float, MetaData, String, Table
+
+VERSION = '0002'
+DESCRIPTION = "Table du cache des géocodages"
+
+# Définition figée de la table : la migration ne dépend pas de l'état futur du modèle Geocode
+metadata = MetaData()
+geocodes = Table(
+    'geocodes', metadata,
+    Column('terme', String(255), primary_key=True),
+    Column('lat', Float, nullable=True),
+    Column('lon', Float, nullable=True),
+    Column('created_at', DateTime),
+    Column('expires_at', DateTime, nullable=False)
+)
+
+
+def upgrade(connection) -> None:
+    # checkfirst : la table a pu être créée par db.create_all ou par une version précédente du cache
+    geocodes.create(bind=connection, checkfirst=True)
+
+
+def downgrade(connection) -> None:
+    geocodes.drop(bind=connection, checkfirst=True)
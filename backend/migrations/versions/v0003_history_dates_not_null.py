@@ -0,0 +1,52 @@
+"""
+Dates des historiques de recherches et de réservations obligatoires
+
+La pagination par curseur filtre sur (date, id) : une date NULL imposerait une
+condition IS NULL qui empêche le parcours d'intervalle de l'index (client_id,
+date). Les lignes sans date reçoivent une date antérieure à toutes les autres,
+ce qui conserve leur place en fin d'historique, puis la colonne devient NOT NULL.
+
+SQLite ne sait pas modifier une colonne existante : seul le remplissage y est
+appliqué (les bases créées par db.create_all ont déjà la contrainte).
+"""
+from datetime import datetime
+
+from sqlalchemy import Column, Integer, MetaData, Table, text
+
+VERSION = '0003'
+DESCRIPTION = "Dates des historiques NOT NULL"
+
+# Date des lignes sans date (dans les bornes d'un TIMESTAMP MySQL quel que soit le fuseau)
+MISSING_DATE = datetime(1970, 1, 2)
+
+# Tables réduites aux colonnes modifiées : la migration ne dépend pas de l'état futur des modèles
+metadata = MetaData()
+recherches = Table('recherches', metadata, Column('id', Integer, primary_key=True), Column('created_at'))
+reservations = Table('reservations', metadata, Column('id', Integer, primary_key=True), Column('create_time'))
+
+# (table, colonne, type MySQL)
+COLUMNS = [
+    (recherches, 'created_at', 'TIMESTAMP'),
+    (reservations, 'create_time', 'DATETIME')
+]
+
+
+def upgrade(connection) -> None:
+    for table, column, mysql_type in COLUMNS:
+        connection.execute(
+            table.update().where(table.c[column].is_(None)).values({column: MISSING_DATE})
+        )
+        if connection.dialect.name == 'mysql':
+            connection.execute(text(
+                f"ALTER TABLE {table.name} MODIFY {column} {mysql_type} NOT NULL DEFAULT CURRENT_TIMESTAMP"
+            ))
+
+
+def downgrade(connection) -> None:
+    # Les dates de remplissage sont conservées : seule la contrainte est retirée
+    if connection.dialect.name != 'mysql':
+        return
+    for table, column, mysql_type in COLUMNS:
+        connection.execute(text(
+            f"ALTER TABLE {table.name} MODIFY {column} {mysql_type} NULL DEFAULT CURRENT_TIMESTAMP"
+        ))
@@ -2,8 +2,9 @@
 Point d'entrée principal pour le serveur Flask avec architecture modulaire
 """
 import os
+import time
 import pymysql
-from flask import Flask
+from flask import Flask, Response
 from flask_cors import CORS
 from dotenv import load_dotenv
 
@@ -22,17 +23,37 @@ def create_app():
     """Crée et configure l'application Flask"""
     # Créer l'instance Flask
     app = Flask(__name__)
+
+    # Sérialisation JSON rapide (orjson) pour jsonify et request.get_json
+    from app.json_provider import FastJSONProvider
+    app.json = FastJSONProvider(app)
     
     # Configurer l'application depuis config.py
     from app.config import Config
     app.config.from_object(Config)
     
-    # Activer CORS
-    CORS(app)
+    # Activer CORS pour les origines configurées
+    CORS(app, origins=app.config['CORS_ORIGINS'])
     
     # Initialiser les extensions
-    from app.extensions import db
+    from app.extensions import db, db_pool, upstream, station_catalogue, station_status, status_stream, geocode_cache, search_history, token_cache, password_hasher, request_profiler, response_compressor
+    db_pool.init_app(app)
     db.init_app(app)
+    upstream.init_app(app)
+    station_catalogue.init_app(app)
+    station_status.init_app(app)
+    status_stream.init_app(app)
+    geocode_cache.init_app(app)
+    search_history.init_app(app)
+    token_cache.init_app(app)
+    password_hasher.init_app(app)
+
+    # Mesures de latence et état des caches (endpoint /metrics)
+    from app.services import metrics
+    metrics.init_app(app)
+    request_profiler.init_app(app)
+    # Enregistré en dernier : la compression s'exécute avant les mesures de durée (after_request en ordre inverse)
+    response_compressor.init_app(app)
     
     # Enregistrer les blueprints
     from app.routes.auth_routes import auth_bp
@@ -40,25 +61,90 @@ def create_app():
     from app.routes.search_routes import search_bp
     from app.routes.reservation_routes import reservation_bp
     from app.routes.station_routes import station_bp
+    from app.routes.monitoring_routes import monitoring_bp
     
     app.register_blueprint(auth_bp, url_prefix='/api/auth')
     app.register_blueprint(hello_bp, url_prefix='/api/hello')
     app.register_blueprint(search_bp, url_prefix='/api/search')
     app.register_blueprint(reservation_bp, url_prefix='/api/reservation')
     app.register_blueprint(station_bp, url_prefix='/api/station')
+    app.register_blueprint(monitoring_bp, url_prefix='/api/monitoring')
 
     # Route racine
     @app.route('/')
     def index():
         return "API Flask en cours d'exécution. Consultez la documentation pour les endpoints disponibles."
+
+    if metrics.registry.enabled:
+        from app.decorators import monitoring_access_required
+
+        @app.route('/metrics')
+        @monitoring_access_required
+        def get_metrics():
+            # Format texte d'exposition Prometheus
+            return Response(metrics.registry.render(), mimetype='text/plain; version=0.0.4')
     
     return app
 
+def warm_up(app):
+    """
+    Préchauffe les flux Vélib et la connexion à la base avant d'accepter du trafic
+
+    Returns:
+        dict: Durée de chaque étape en millisecondes
+    """
+    from sqlalchemy import text
+    from sqlalchemy.exc import SQLAlchemyError
+    from app.extensions import db, station_catalogue, station_status
+
+    timings = {}
+    start = time.perf_counter()
+
+    # Télécharger les flux et construire les index (catalogue, statut)
+    for name, cache in (('station_catalogue', station_catalogue), ('station_status', station_status)):
+        step = time.perf_counter()
+        if cache.refresh(force=True) is None:
+            print(f"Préchauffage de {name} impossible : {cache.last_error}")
+        timings[name] = round((time.perf_counter() - step) * 1000, 1)
+
+    # Ouvrir une première connexion du pool SQLAlchemy
+    step = time.perf_counter()
+    with app.app_context():
+        try:
+            db.session.execute(text('SELECT 1'))
+        except SQLAlchemyError as e:
+            print(f"Préchauffage de la base de données impossible : {str(e)}")
+        finally:
+            db.session.remove()
+    timings['database'] = round((time.perf_counter() - step) * 1000, 1)
+
+    timings['total'] = round((time.perf_counter() - start) * 1000, 1)
+    print("Préchauffage terminé : " + ", ".join(f"{name}={duration} ms" for name, duration in timings.items()))
+    return timings
+
+def create_asgi_app():
+    """
+    Crée l'application pour un serveur ASGI (uvicorn, hypercorn)
+    Exemple : uvicorn server:create_asgi_app --factory --port 5001
+
+    Seul le flux de disponibilité est servi sur la boucle asyncio. Les vues Flask
+    restent synchrones : chaque requête occupe un thread (ASGI_THREADS par processus),
+    comme avec gunicorn gthread, qui reste le mode de production pour la recherche.
+    """
+    from a2wsgi import WSGIMiddleware
+    from app.extensions import status_stream
+    from app.services.status_stream import StatusStreamASGI
+    app = create_app()
+    warm_up(app)
+    # Le flux de disponibilité n'occupe pas de thread par abonné
+    wsgi = WSGIMiddleware(app, workers=app.config['ASGI_THREADS'])
+    return StatusStreamASGI(wsgi, status_stream, path='/api/station/stream', cors_origins=app.config['CORS_ORIGINS'])
+
 if __name__ == '__main__':
     # Créer l'application
     app = create_app()
     
-    # Démarrer le serveur
+    # Démarrer le serveur de développement (en production : gunicorn -c gunicorn.conf.py wsgi:app)
     port = int(os.environ.get('PORT', 5001))
     print(f"Démarrage du serveur sur le port {port}...")
     print("N'OUBLIEZ PAS DE VÉRIFIER LA CONNEXION MYSQL DANS LES PARAMÈTRES DE CONFIGURATION!")
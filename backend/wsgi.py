@@ -0,0 +1,18 @@
+"""
+Point d'entrée WSGI pour la production
+
+Exemple : gunicorn -c gunicorn.conf.py wsgi:app
+"""
+import gc
+
+from server import create_app, warm_up
+
+app = create_app()
+
+# Préchauffer les caches avant que le serveur n'accepte des connexions
+warm_up_timings = warm_up(app)
+
+# Avec preload_app, les objets créés jusqu'ici (catalogue, index) sont partagés entre
+# les workers en copie sur écriture : les exclure du ramasse-miettes évite que ses
+# passages ne touchent leurs pages mémoire et ne les dupliquent dans chaque worker
+gc.freeze()
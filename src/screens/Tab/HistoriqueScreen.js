@@ -1,4 +1,4 @@
-import React, { useState, useEffect } from "react";
+import React, { useState, useEffect, useRef } from "react";
 import {
   StyleSheet,
   View,
@@ -113,18 +113,45 @@ const SectionHeader = ({ title, count }) => (
   </View>
 );
 
+// Bouton de chargement de la page suivante de l'historique
+const LoadMoreButton = ({ onPress, loading }) => (
+  <TouchableOpacity
+    style={styles.loadMoreButton}
+    onPress={onPress}
+    disabled={loading}
+  >
+    {loading ? (
+      <ActivityIndicator size="small" color="#4dabf7" />
+    ) : (
+      <Text style={styles.loadMoreText}>Voir plus</Text>
+    )}
+  </TouchableOpacity>
+);
+
+// Distance au bas de la liste (en pixels) à partir de laquelle la page suivante est chargée
+const LOAD_MORE_THRESHOLD = 200;
+
+const isCloseToBottom = ({ layoutMeasurement, contentOffset, contentSize }) =>
+  layoutMeasurement.height + contentOffset.y >=
+  contentSize.height - LOAD_MORE_THRESHOLD;
+
 export default function HistoriqueScreen() {
   const [activeTab, setActiveTab] = useState("recherche");
   const [apiReservations, setApiReservations] = useState([]);
+  const [reservationCursor, setReservationCursor] = useState(null); // Curseur de la page suivante des réservations
   const [apiSearchHistory, setApiSearchHistory] = useState([]);
+  const [searchCursor, setSearchCursor] = useState(null); // Curseur de la page suivante des recherches
   const [loading, setLoading] = useState(false);
+  const [loadingMore, setLoadingMore] = useState(false); // Chargement d'une page suivante
+  // Garde synchrone : plusieurs événements de défilement peuvent arriver avant la mise à jour de loadingMore
+  const loadingMoreRef = useRef(false);
   const [refreshing, setRefreshing] = useState(false); // État pour le pull to refresh
   const [deletingId, setDeletingId] = useState(null); // ID de la recherche en cours de suppression
   const [error, setError] = useState(null);
   // Récupérer l'état d'authentification depuis Redux
   const authState = useSelector((state) => state.auth);
 
-  // Fonction pour charger les réservations de l'utilisateur
+  // Fonction pour charger la première page des réservations de l'utilisateur
   const loadReservations = async () => {
     // Vérifier si l'utilisateur est connecté
     if (!authState?.user?.id || !authState?.token) {
@@ -142,12 +169,13 @@ export default function HistoriqueScreen() {
       setLoading(true);
       setError(null);
 
-      const reservationsList = await reservationService.getReservations(
+      const { items, nextCursor } = await reservationService.getReservations(
         authState.user.id,
         authState.token
       );
 
-      setApiReservations(reservationsList || []);
+      setApiReservations(items);
+      setReservationCursor(nextCursor);
     } catch (err) {
       console.error("Erreur lors du chargement des réservations:", err);
       setError("Impossible de charger vos réservations");
@@ -163,7 +191,7 @@ export default function HistoriqueScreen() {
     }
   };
 
-  // Fonction pour charger l'historique des recherches
+  // Fonction pour charger la première page de l'historique des recherches
   const loadSearchHistory = async () => {
     // Vérifier si l'utilisateur est connecté
     if (!authState?.user?.id || !authState?.token) {
@@ -176,12 +204,13 @@ export default function HistoriqueScreen() {
       setLoading(true);
       setError(null);
 
-      const searchHistoryList = await searchService.getSearchHistory(
+      const { items, nextCursor } = await searchService.getSearchHistory(
         authState.user.id,
         authState.token
       );
 
-      setApiSearchHistory(searchHistoryList || []);
+      setApiSearchHistory(items);
+      setSearchCursor(nextCursor);
     } catch (err) {
       console.error("Erreur lors du chargement de l'historique:", err);
       setError("Impossible de charger votre historique de recherche");
@@ -197,6 +226,73 @@ export default function HistoriqueScreen() {
     }
   };
 
+  // Fonction pour charger la page suivante de l'historique des recherches
+  const loadMoreSearchHistory = async () => {
+    if (!searchCursor || loadingMoreRef.current) {
+      return;
+    }
+
+    try {
+      loadingMoreRef.current = true;
+      setLoadingMore(true);
+
+      const { items, nextCursor } = await searchService.getSearchHistory(
+        authState.user.id,
+        authState.token,
+        searchCursor
+      );
+
+      setApiSearchHistory((prevHistory) => [...prevHistory, ...items]);
+      setSearchCursor(nextCursor);
+    } finally {
+      loadingMoreRef.current = false;
+      setLoadingMore(false);
+    }
+  };
+
+  // Fonction pour charger la page suivante des réservations
+  const loadMoreReservations = async () => {
+    if (!reservationCursor || loadingMoreRef.current) {
+      return;
+    }
+
+    try {
+      loadingMoreRef.current = true;
+      setLoadingMore(true);
+
+      const { items, nextCursor } = await reservationService.getReservations(
+        authState.user.id,
+        authState.token,
+        reservationCursor
+      );
+
+      setApiReservations((prevReservations) => [...prevReservations, ...items]);
+      setReservationCursor(nextCursor);
+    } finally {
+      loadingMoreRef.current = false;
+      setLoadingMore(false);
+    }
+  };
+
+  // Charger la page suivante de l'onglet actif
+  const handleLoadMore = () => {
+    if (loading) {
+      return;
+    }
+    if (activeTab === "recherche") {
+      loadMoreSearchHistory();
+    } else {
+      loadMoreReservations();
+    }
+  };
+
+  // Charger la page suivante lorsque l'utilisateur approche du bas de la liste
+  const handleScroll = ({ nativeEvent }) => {
+    if (isCloseToBottom(nativeEvent)) {
+      handleLoadMore();
+    }
+  };
+
   // Fonction pour gérer le pull to refresh
   const handleRefresh = async () => {
     setRefreshing(true);
@@ -340,6 +436,8 @@ export default function HistoriqueScreen() {
             style={styles.content}
             showsVerticalScrollIndicator={false}
             contentContainerStyle={styles.contentContainer}
+            onScroll={handleScroll}
+            scrollEventThrottle={200}
             refreshControl={
               <RefreshControl
                 refreshing={refreshing}
@@ -395,6 +493,12 @@ export default function HistoriqueScreen() {
                       </Text>
                     </View>
                   )}
+                  {!loading && !error && searchCursor && (
+                    <LoadMoreButton
+                      onPress={handleLoadMore}
+                      loading={loadingMore}
+                    />
+                  )}
                 </View>
               </>
             ) : (
@@ -440,6 +544,12 @@ export default function HistoriqueScreen() {
                       </Text>
                     </View>
                   )}
+                  {!loading && !error && reservationCursor && (
+                    <LoadMoreButton
+                      onPress={handleLoadMore}
+                      loading={loadingMore}
+                    />
+                  )}
                 </View>
               </>
             )}
@@ -663,6 +773,19 @@ const styles = StyleSheet.create({
     fontWeight: "600",
     marginLeft: 6,
   },
+  loadMoreButton: {
+    alignItems: "center",
+    justifyContent: "center",
+    backgroundColor: "rgba(77, 171, 247, 0.1)",
+    paddingVertical: 12,
+    borderRadius: 8,
+    marginTop: 4,
+  },
+  loadMoreText: {
+    color: "#4dabf7",
+    fontSize: 14,
+    fontWeight: "600",
+  },
   emptyState: {
     alignItems: "center",
     justifyContent: "center",
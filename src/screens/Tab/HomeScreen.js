@@ -43,6 +43,14 @@ const PARIS_REGION = {
   longitudeDelta: 0.0421,
 };
 
+// Zone [min_lat, min_lon, max_lat, max_lon] affichée par une région de la carte (bornée aux coordonnées valides)
+const regionToBbox = (region) => [
+  Math.max(region.latitude - region.latitudeDelta / 2, -90),
+  Math.max(region.longitude - region.longitudeDelta / 2, -180),
+  Math.min(region.latitude + region.latitudeDelta / 2, 90),
+  Math.min(region.longitude + region.longitudeDelta / 2, 180),
+];
+
 export default function HomeScreen() {
   const authState = useSelector((state) => state.auth);
   const [searchQuery, setSearchQuery] = useState("");
@@ -55,7 +63,37 @@ export default function HomeScreen() {
   const [detailsLoading, setDetailsLoading] = useState(false); // État de chargement des détails
   const [modalVisible, setModalVisible] = useState(false); // Visibilité du modal
   const [searchLoading, setSearchLoading] = useState(false); // État de chargement de la recherche
+  const [stationsStatus, setStationsStatus] = useState({}); // Disponibilité des stations visibles, par station_id
   const mapRef = useRef(null);
+  const visibleRegionRef = useRef(PARIS_REGION); // Dernière région affichée par la carte
+  const statusRequestRef = useRef(0); // Numéro de la dernière requête de disponibilité
+
+  // Charger en un seul appel la disponibilité de toutes les stations de la zone affichée
+  const loadStationsStatus = async (region = visibleRegionRef.current) => {
+    const requestId = ++statusRequestRef.current;
+    try {
+      const { stations: statuses } = await StationService.getStationsStatus({
+        bbox: regionToBbox(region),
+      });
+      // Ignorer la réponse d'une zone déjà quittée
+      if (requestId !== statusRequestRef.current) {
+        return;
+      }
+      const byId = {};
+      statuses.forEach((status) => {
+        byId[status.station_id] = status;
+      });
+      setStationsStatus(byId);
+    } catch (error) {
+      console.error("Erreur lors du chargement des disponibilités:", error);
+    }
+  };
+
+  // Mettre à jour les disponibilités lorsque l'utilisateur déplace la carte
+  const handleRegionChangeComplete = (region) => {
+    visibleRegionRef.current = region;
+    loadStationsStatus(region);
+  };
 
   useEffect(() => {
     console.log("============= CONTENU DU SLICE AUTH =============");
@@ -94,6 +132,7 @@ export default function HomeScreen() {
           console.log(
             `Stations chargées avec succès: ${stationsData.length} stations`
           );
+          loadStationsStatus();
         },
         onError: (error) => {
           console.error("Erreur gérée dans le composant:", error);
@@ -349,6 +388,7 @@ export default function HomeScreen() {
               );
 
               // Rafraîchissement des stations pour mettre à jour les disponibilités
+              loadStationsStatus();
             } catch (error) {
               setLoading(false);
               Alert.alert(
@@ -422,23 +462,32 @@ export default function HomeScreen() {
             style={styles.map}
             region={mapRegion}
             // onRegionChangeComplete={setMapRegion}
+            onRegionChangeComplete={handleRegionChangeComplete}
             showsUserLocation={true}
             showsMyLocationButton={false}
             zoomEnabled={true}
             zoomControlEnabled={true}
           >
             {/* Afficher les marqueurs des stations */}
-            {stations.map((station) => (
-              <Marker
-                key={station.station_id}
-                coordinate={{
-                  latitude: station.lat,
-                  longitude: station.lon,
-                }}
-                onPress={() => handleStationPress(station)}
-                pinColor="#8E54E9" // Couleur violette pour les marqueurs natifs de la map
-              />
-            ))}
+            {stations.map((station) => {
+              const status = stationsStatus[station.station_id];
+              return (
+                <Marker
+                  key={station.station_id}
+                  coordinate={{
+                    latitude: station.lat,
+                    longitude: station.lon,
+                  }}
+                  onPress={() => handleStationPress(station)}
+                  // Violet pour les marqueurs natifs de la map, gris pour une station sans vélo disponible
+                  pinColor={
+                    status && status.num_bikes_available === 0
+                      ? "#8E8E93"
+                      : "#8E54E9"
+                  }
+                />
+              );
+            })}
             {/* Le marqueur de recherche a été supprimé */}
           </MapView>
           <TouchableOpacity
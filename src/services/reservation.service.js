@@ -49,12 +49,13 @@ class ReservationService {
     }
   }
   /**
-   * Récupère les réservations d'un utilisateur
+   * Récupère une page des réservations d'un utilisateur
    * @param {number} user_id - ID de l'utilisateur
    * @param {string} token - Token d'authentification JWT
-   * @returns {Promise<Array>} Liste des réservations
+   * @param {string|null} cursor - Curseur de la page suivante (null pour la première page)
+   * @returns {Promise<{items: Array, nextCursor: string|null}>} Réservations de la page et curseur de la suivante
    */
-  async getReservations(user_id, token) {
+  async getReservations(user_id, token, cursor = null) {
     try {
       const headers = {
         "Content-Type": "application/json",
@@ -66,16 +67,19 @@ class ReservationService {
 
       const response = await axios.get(`${API_URL}/api/reservation/`, {
         headers,
-        params: { user_id: userId },
+        params: cursor ? { user_id: userId, cursor } : { user_id: userId },
       });
 
-      return response.data.data;
+      return {
+        items: response.data.data || [],
+        nextCursor: response.data.next_cursor || null,
+      };
     } catch (error) {
       console.error("Erreur lors de la récupération des réservations:", error);
       console.error("Status:", error.response?.status);
       console.error("Message:", error.response?.data);
       handleApiError(error);
-      return [];
+      return { items: [], nextCursor: null };
     }
   }
 }
@@ -6,11 +6,12 @@ import { API_URL, DEFAULT_HEADERS, handleApiError } from "./api.config";
  */
 class SearchService {
   /**
-   * Récupère l'historique des recherches d'un utilisateur
+   * Récupère une page de l'historique des recherches d'un utilisateur
    * @param {number} user_id - ID de l'utilisateur
    * @param {string} token - Token d'authentification JWT
-   * @returns {Promise<Array>} Liste des recherches
-   */ async getSearchHistory(user_id, token) {
+   * @param {string|null} cursor - Curseur de la page suivante (null pour la première page)
+   * @returns {Promise<{items: Array, nextCursor: string|null}>} Recherches de la page et curseur de la suivante
+   */ async getSearchHistory(user_id, token, cursor = null) {
     try {
       // Log pour le débogage
       console.log(`Récupération de l'historique pour l'utilisateur ${user_id}`);
@@ -27,17 +28,20 @@ class SearchService {
       // Utiliser l'option params au lieu de les mettre dans l'URL pour éviter la redirection 308
       const response = await axios.get(`${API_URL}/api/search/`, {
         headers,
-        params: { user_id: userId },
+        params: cursor ? { user_id: userId, cursor } : { user_id: userId },
       });
 
       console.log("Réponse API historique de recherche:", response.status);
-      return response.data.data;
+      return {
+        items: response.data.data || [],
+        nextCursor: response.data.next_cursor || null,
+      };
     } catch (error) {
       console.error("Erreur lors de la récupération de l'historique:", error);
       console.error("Status:", error.response?.status);
       console.error("Message:", error.response?.data);
       handleApiError(error);
-      return [];
+      return { items: [], nextCursor: null };
     }
   }
 
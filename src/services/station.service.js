@@ -38,6 +38,29 @@ class StationService {
       throw error;
     }
   }
+
+  /**
+   * Récupère la disponibilité de plusieurs stations en un seul appel
+   * @param {Object} options - Stations demandées
+   * @param {Array<number>} [options.stationIds] - IDs des stations
+   * @param {Array<number>} [options.bbox] - Zone [min_lat, min_lon, max_lat, max_lon] (remplace stationIds)
+   * @returns {Promise<Object>} { last_updated, stations }
+   */
+  async getStationsStatus({ stationIds, bbox }) {
+    try {
+      const response = await axios.post(
+        `${API_URL}/api/station/stations/status`,
+        bbox ? { bbox } : { station_ids: stationIds }
+      );
+      return response.data;
+    } catch (error) {
+      console.error(
+        "Erreur lors de la récupération du statut des stations:",
+        error
+      );
+      throw error;
+    }
+  }
 }
 
 // Exporter une instance du service